@@ -0,0 +1,296 @@
+"""
+<Program Name>
+  batch.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Runs a manifest of build/test commands concurrently, each through its own
+  main.py process, so that a many-core build host can be kept busy from a
+  single invocation. At most --max-jobs commands run at a time; as soon as one
+  finishes the next one is started. Each job writes its in, out, err and signed
+  metadata.json to its own directory under the output root, along with a
+  toto.log holding anything main.py itself printed. This script is called as
+  below:
+
+  usage: batch.py [-h] [--max-jobs N] [--output-root DIR] MANIFEST
+
+  The manifest is a JSON file of the following form, in which only "command"
+  is required for each job:
+
+    {
+      "jobs": [
+        {"name": "build", "command": "make", "policy": "build_policy.json"},
+        {"name": "test", "command": "make test", "input": "test_in.txt"}
+      ]
+    }
+
+  Jobs without a name are named after their position ("job-1", "job-2", ...).
+  Every job runs in the current directory, and relative paths in the manifest
+  are resolved against it.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import multiprocessing
+import multiprocessing.pool
+
+MAIN_FILEPATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "main.py")
+DEFAULT_OUTPUT_ROOT = "toto-batch"
+JOB_LOG_FILENAME = "toto.log"
+
+# The optional fields of a job and the main.py option each is passed as
+JOB_OPTIONS = [
+  ("input", "--input"),
+  ("policy", "--policy"),
+  ("instances", "--instances"),
+  ("scan_jobs", "--scan-jobs")
+]
+
+
+class ManifestError(Exception):
+  """This exception indicates that the batch manifest is not valid"""
+
+  def __init__(self, value):
+    self.value = value
+
+
+  def __str__(self):
+    return repr(self.value)
+
+
+def load_manifest(manifest_filepath):
+  """
+  <Purpose>
+    Reads in the manifest and checks each of its jobs.
+
+  <Arguments>
+    manifest_filepath:
+      The path of the JSON manifest file.
+
+  <Exceptions>
+    ManifestError, if the manifest is not valid JSON, has no jobs, or a job
+    has no command or shares its name with another job.
+
+    IOError, if the manifest cannot be read.
+
+  <Return>
+    A list of job dictionaries, each with its "name" filled in.
+  """
+
+  fileobj = open(manifest_filepath, "r")
+  try:
+    try:
+      manifest = json.load(fileobj)
+    except ValueError as e:
+      raise ManifestError("ERROR: manifest is not valid JSON: " + str(e))
+  finally:
+    fileobj.close()
+
+  if not isinstance(manifest, dict) or not manifest.get("jobs"):
+    raise ManifestError("ERROR: manifest has no \"jobs\"")
+
+  jobs = []
+  names = set()
+  for index, job in enumerate(manifest["jobs"]):
+    if not isinstance(job, dict) or not job.get("command"):
+      raise ManifestError("ERROR: job " + str(index + 1) + " has no \"command\"")
+    job = dict(job)
+    job.setdefault("name", "job-" + str(index + 1))
+    name = job["name"]
+    if name in names:
+      raise ManifestError("ERROR: job name \"" + name + "\" is used more than once")
+    if not name or os.sep in name or name in (os.curdir, os.pardir):
+      raise ManifestError("ERROR: job name \"" + name + "\" cannot be used as a directory name")
+    names.add(name)
+    jobs.append(job)
+  return jobs
+
+
+def job_command_line(job, output_dir):
+  """
+  <Purpose>
+    Builds the main.py command line which runs a job.
+
+  <Arguments>
+    job:
+      A job dictionary, as returned by load_manifest().
+
+    output_dir:
+      The directory to which the job's files are written.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    A list of arguments for subprocess.
+  """
+
+  args = [sys.executable, MAIN_FILEPATH, "--output-dir", output_dir]
+  for field, option in JOB_OPTIONS:
+    if job.get(field) is not None:
+      args.extend([option, str(job[field])])
+  args.append(job["command"])
+  return args
+
+
+def run_job(job, output_root):
+  """
+  <Purpose>
+    Runs a single job through main.py, waiting for it to finish.
+
+  <Arguments>
+    job:
+      A job dictionary, as returned by load_manifest().
+
+    output_root:
+      The directory under which the job's own output directory is created.
+
+  <Exceptions>
+    None; failures are reported in the result.
+
+  <Return>
+    A tuple (name, exit_status, output_dir, seconds), where 'exit_status' is
+    that of main.py: 0 once the job's metadata has been written, non-zero if
+    e.g. a policy constraint was not met.
+  """
+
+  output_dir = os.path.abspath(os.path.join(output_root, job["name"]))
+  if not os.path.isdir(output_dir):
+    os.makedirs(output_dir)
+
+  start = time.time()
+  log_fileobj = open(os.path.join(output_dir, JOB_LOG_FILENAME), "wb")
+  try:
+    exit_status = subprocess.call(job_command_line(job, output_dir),
+      stdout=log_fileobj, stderr=subprocess.STDOUT)
+  except OSError as e:
+    log_fileobj.write(str(e).encode("utf-8"))
+    exit_status = -1
+  finally:
+    log_fileobj.close()
+  return job["name"], exit_status, output_dir, time.time() - start
+
+
+def run_batch(jobs, output_root=DEFAULT_OUTPUT_ROOT, max_jobs=None, report=None):
+  """
+  <Purpose>
+    Runs the given jobs with at most 'max_jobs' of them at a time.
+
+  <Arguments>
+    jobs:
+      A list of job dictionaries, as returned by load_manifest().
+
+    output_root:
+      The directory under which each job's output directory is created.
+
+    max_jobs:
+      The maximum number of jobs run at once; defaults to the number of CPUs.
+
+    report:
+      An optional function called with the result of each job as soon as it
+      finishes.
+
+  <Exceptions>
+    None; failures are reported in the results.
+
+  <Return>
+    A list of (name, exit_status, output_dir, seconds) tuples, as returned by
+    run_job(), in the order of 'jobs'.
+  """
+
+  _prepare_signing_key()
+
+  # Each job spends its time in its own processes, so threads are enough to
+  # wait on them
+  pool = multiprocessing.pool.ThreadPool(max_jobs or multiprocessing.cpu_count())
+  try:
+    results = dict()
+    tasks = [(job, output_root) for job in jobs]
+    for result in pool.imap_unordered(_run_job_task, tasks):
+      results[result[0]] = result
+      if report is not None:
+        report(result)
+  finally:
+    pool.close()
+    pool.join()
+  return [results[job["name"]] for job in jobs]
+
+
+def print_result(result, fileobj=sys.stdout):
+  """
+  <Purpose>
+    Prints one line for a finished job: "OK" or "FAIL", the time taken, its
+    name and its output directory.
+
+  <Arguments>
+    result:
+      A result as returned by run_job().
+
+    fileobj:
+      The file to which the line is written.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    None.
+  """
+
+  name, exit_status, output_dir, seconds = result
+  status = exit_status == 0 and "OK" or "FAIL"
+  fileobj.write("%-4s %9.2fs %s %s\n" % (status, seconds, name, output_dir))
+  fileobj.flush()
+
+
+def _run_job_task(task):
+  # Unpacks a (job, output_root) pair for the pool.
+  return run_job(*task)
+
+
+def _prepare_signing_key():
+  # Concurrent jobs which each found no keystore would all create one; it is
+  # created once up front instead, unless the signer daemon will sign for them.
+  import signerd
+  if os.path.exists(signerd.get_socket_path()):
+    return
+  import signing
+  signing.load_or_create_key()
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='batch.py', description='Runs a manifest of build/test commands concurrently.')
+  parser.add_argument('--max-jobs', metavar='N', type=int, default=None, help='the maximum number of commands run at once; defaults to the number of CPUs')
+  parser.add_argument('--output-root', metavar='DIR', default=DEFAULT_OUTPUT_ROOT, help='the directory under which each job\'s output directory is created')
+  parser.add_argument('manifest', metavar='MANIFEST', help='the JSON file listing the commands to run')
+  args = parser.parse_args()
+
+  try:
+    jobs = load_manifest(args.manifest)
+  except ManifestError as e:
+    sys.stderr.write(e.value + "\n")
+    sys.exit(2)
+
+  results = run_batch(jobs, args.output_root, args.max_jobs, print_result)
+  failed = len([result for result in results if result[1] != 0])
+  sys.stdout.write("%d jobs, %d succeeded, %d failed\n" % (len(results), len(results) - failed, failed))
+  sys.exit(failed and 1 or 0)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,111 @@
+"""
+<Program Name>
+  bench_signing.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Benchmarks the per-run latency of signing a metadata document. Three cases
+  are timed:
+
+    fresh key    - the original behaviour: a new RSA key is generated,
+                   encrypted and written to the keystore on every run.
+    stored key   - a new process: the key is loaded from the keystore and
+                   decrypted once, then used to sign.
+    cached key   - a later signature within the same process.
+
+  This script is called as below:
+
+  usage: bench_signing.py [-h] [--runs N]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import tuf.keys
+import tuf.sig
+import signing
+
+SAMPLE_METADATA = {
+  "application": {"command": "make", "return_code": 0},
+  "variables": {"hostname": "build01", "cpu_arch": "x86_64"}
+}
+
+
+def sign_with_fresh_key(data, keystore_filepath):
+  # The original sign_json(): a new key for every signature.
+  rsakey_dict = tuf.keys.generate_rsa_key()
+  rsa_signature = tuf.sig.generate_rsa_signature(data, rsakey_dict)
+  encrypted_keys = tuf.keys.encrypt_key(rsakey_dict, signing.KEYSTORE_PASSWORD)
+  fileobj = open(keystore_filepath, 'w')
+  fileobj.write(encrypted_keys)
+  fileobj.close()
+  return rsa_signature
+
+
+def sign_with_stored_key(data, keystore_filepath):
+  # The first signature of a new process, which must load the stored key.
+  signing._cached_keys.clear()
+  return signing.sign_json(data, keystore_filepath)
+
+
+def sign_with_cached_key(data, keystore_filepath):
+  return signing.sign_json(data, keystore_filepath)
+
+
+def time_runs(function, keystore_filepath, runs):
+  # Returns the mean and best latency, in seconds, of 'runs' signatures.
+  timings = []
+  for i in range(runs):
+    data = dict(SAMPLE_METADATA)
+    start = time.time()
+    function(data, keystore_filepath)
+    timings.append(time.time() - start)
+  return sum(timings) / len(timings), min(timings)
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='bench_signing.py', description='Benchmarks per-run metadata signing latency.')
+  parser.add_argument('--runs', metavar='N', type=int, default=5, help='the number of signatures timed for each case')
+  args = parser.parse_args()
+
+  temp_dir = tempfile.mkdtemp(prefix="toto-bench-")
+  keystore_filepath = os.path.join(temp_dir, signing.KEYSTORE_FILENAME)
+  try:
+    cases = [("fresh key", sign_with_fresh_key), ("stored key", sign_with_stored_key),
+        ("cached key", sign_with_cached_key)]
+    results = []
+    for name, function in cases:
+      # Every case but the first relies on the keystore existing already
+      if name != "fresh key":
+        signing.load_or_create_key(keystore_filepath)
+      results.append((name,) + time_runs(function, keystore_filepath, args.runs))
+  finally:
+    shutil.rmtree(temp_dir)
+
+  print("%-12s %10s %10s" % ("case", "mean ms", "best ms"))
+  for name, mean, best in results:
+    print("%-12s %10.1f %10.1f" % (name, mean * 1000, best * 1000))
+  print("speedup of a stored key over a fresh key: %.1fx" % (results[0][1] / results[1][1]))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,124 @@
+"""
+<Program Name>
+  bench_startup.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Benchmarks the fixed cost every run of main.py pays before it gets to the
+  command: starting the interpreter and importing main. Three cases are timed,
+  each in a fresh interpreter:
+
+    interpreter - "python -c pass", the floor no change to toto can lower.
+    import main - importing main.py and everything it imports up front.
+    --version   - a complete "main.py --version" run.
+
+  The median of each case is printed, together with the cost on top of the
+  bare interpreter. If the "--version" run costs more than --budget-ms on top
+  of the interpreter the exit status is non-zero, so that the startup budget
+  can be held in place by CI. With --importtime, the slowest imports of main
+  are listed as well (Python 3.7 and later). This script is called as below:
+
+  usage: bench_startup.py [-h] [--runs N] [--budget-ms MS] [--importtime]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+BENCHMARK_DIR = os.path.dirname(os.path.realpath(__file__))
+PACKAGE_DIR = os.path.dirname(BENCHMARK_DIR)
+MAIN_FILEPATH = os.path.join(PACKAGE_DIR, "main.py")
+
+CASES = [
+  ("interpreter", ["-c", "pass"]),
+  ("import main", ["-c", "import main"]),
+  ("--version", [MAIN_FILEPATH, "--version"])
+]
+
+
+def time_case(args, runs):
+  # Returns the median wall-clock time, in seconds, of running the
+  # interpreter with the given arguments.
+  env = _child_env()
+  timings = []
+  devnull = open(os.devnull, "w")
+  try:
+    for i in range(runs):
+      start = time.time()
+      subprocess.check_call([sys.executable] + args, stdout=devnull, env=env, cwd=PACKAGE_DIR)
+      timings.append(time.time() - start)
+  finally:
+    devnull.close()
+  timings.sort()
+  return timings[len(timings) // 2]
+
+
+def slowest_imports(count):
+  # Returns the 'count' imports of main with the highest cumulative time, as
+  # (microseconds, module) pairs.
+  process = subprocess.Popen([sys.executable, "-X", "importtime", "-c", "import main"],
+      stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=_child_env(), cwd=PACKAGE_DIR)
+  stdout, stderr = process.communicate()
+  imports = []
+  for line in stderr.decode("utf-8").splitlines():
+    fields = line.split("|")
+    if len(fields) != 3 or not fields[1].strip().isdigit():
+      continue
+    imports.append((int(fields[1]), fields[2].rstrip()))
+  imports.sort(reverse=True)
+  return imports[:count]
+
+
+def _child_env():
+  env = dict(os.environ)
+  env["PYTHONPATH"] = os.pathsep.join([PACKAGE_DIR] + [path for path in
+      [os.environ.get("PYTHONPATH")] if path])
+  return env
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='bench_startup.py', description='Benchmarks the startup cost of main.py.')
+  parser.add_argument('--runs', metavar='N', type=int, default=21, help='the number of runs of each case; the median is kept')
+  parser.add_argument('--budget-ms', metavar='MS', type=float, default=75.0, help='the most a --version run may cost on top of the bare interpreter')
+  parser.add_argument('--importtime', action='store_true', help='also list the slowest imports of main')
+  args = parser.parse_args()
+
+  medians = dict()
+  print("%-12s %10s %10s" % ("case", "median ms", "over ms"))
+  for name, case_args in CASES:
+    medians[name] = time_case(case_args, args.runs)
+    print("%-12s %10.1f %10.1f" % (name, medians[name] * 1000,
+        (medians[name] - medians["interpreter"]) * 1000))
+
+  if args.importtime:
+    if sys.version_info < (3, 7):
+      print("\n-X importtime needs Python 3.7 or later")
+    else:
+      print("\nslowest imports of main (cumulative us):")
+      for microseconds, module in slowest_imports(15):
+        print("%10d %s" % (microseconds, module))
+
+  overhead_ms = (medians["--version"] - medians["interpreter"]) * 1000
+  if overhead_ms > args.budget_ms:
+    print("\nOVER BUDGET: --version costs %.1f ms over the interpreter, budget %.1f ms"
+        % (overhead_ms, args.budget_ms))
+    sys.exit(1)
+  print("\nwithin budget: %.1f ms of %.1f ms" % (overhead_ms, args.budget_ms))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,404 @@
+"""
+<Program Name>
+  bench_suite.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  A reproducible benchmark of the whole pipeline at scale. For every
+  combination of log size (e.g. 1M to several G) and match density, a
+  synthetic build log is generated and the following are measured:
+
+    exec_cmd                     - capturing the log through "cat" into the
+                                   out/err files and hashing sinks.
+    get_hash                     - hashing the log with utils.get_hash().
+    check_file_against_wordlists - scanning the log against the word lists.
+    sign_json                    - signing the metadata of the scan.
+    gen_json                     - writing the signed metadata to disk.
+
+  Each case runs in a fresh process, so that its peak memory can be measured,
+  and the best of --repeat runs is kept, along with the standard deviation of
+  the runs. The results are written as JSON with --output; given a --baseline
+  saved from an earlier run, every case which is slower or uses more memory
+  than the baseline by more than --tolerance, and by more than the run-to-run
+  noise of either run (NOISE_SIGMAS standard deviations, and at least
+  NOISE_FLOOR), is flagged, and the exit status is non-zero. This script is
+  called as below:
+
+  usage: bench_suite.py [-h] [--sizes SIZES] [--densities DENSITIES]
+                        [--repeat N] [--output FILE] [--baseline FILE]
+                        [--tolerance T] [--cases CASES]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import multiprocessing
+
+BENCHMARK_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import utils
+import wordlists
+import main as toto_main
+from bench_wordlists import FILLER_WORDS, DEFAULT_POLICY_FILEPATH
+
+CASES = ["exec_cmd", "get_hash", "check_file_against_wordlists", "sign_json", "gen_json"]
+
+# The size of the block of log lines which is repeated to build large logs
+LOG_BLOCK_SIZE = 1024 * 1024
+
+# Differences smaller than these are noise, however large relative to the
+# baseline they are
+NOISE_FLOOR = {"seconds": 0.005, "peak_rss_kb": 1024}
+
+# Differences within this many standard deviations of the runs of a case, in
+# the baseline or in the new results, are noise too
+NOISE_SIGMAS = 3
+
+SIZE_SUFFIXES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(size_string):
+  # Converts a size such as "512K", "16M" or "2G" into bytes.
+  size_string = size_string.strip().upper()
+  if size_string[-1:] in SIZE_SUFFIXES:
+    return int(float(size_string[:-1]) * SIZE_SUFFIXES[size_string[-1]])
+  return int(size_string)
+
+
+def generate_log(filename, word_lists, size, density, seed=0):
+  """
+  <Purpose>
+    Writes a synthetic build log of about 'size' bytes in which roughly
+    'density' of the lines contain a word-list term. A block of random lines
+    is generated once and repeated, so that multi-gigabyte logs are quick to
+    write while remaining reproducible.
+
+  <Arguments>
+    filename:
+      The path of the log to be written.
+
+    word_lists:
+      A dictionary storing the wordlists for success, failure and warning.
+
+    size:
+      The number of bytes to be written, rounded up to a whole line.
+
+    density:
+      A float between 0 and 1 for the fraction of lines with a match.
+
+    seed:
+      The seed for the random generator.
+
+  <Exceptions>
+    IOError, if the file cannot be written.
+
+  <Return>
+    None.
+  """
+
+  generator = random.Random(seed)
+  match_words = []
+  for category in wordlists.CATEGORIES:
+    match_words.extend(word_lists[category])
+
+  lines = []
+  block_size = 0
+  while block_size < min(size, LOG_BLOCK_SIZE):
+    words = [generator.choice(FILLER_WORDS) for i in range(generator.randint(4, 14))]
+    if generator.random() < density:
+      words.insert(generator.randint(0, len(words)), generator.choice(match_words) + ":")
+    line = " ".join(words) + "\n"
+    lines.append(line)
+    block_size += len(line)
+  block = "".join(lines).encode("ascii")
+
+  fileobj = open(filename, "wb")
+  written = 0
+  while written < size:
+    fileobj.write(block)
+    written += len(block)
+  fileobj.close()
+
+
+def run_case(case, context):
+  """
+  <Purpose>
+    Runs a single benchmark case once, in the current process.
+
+  <Arguments>
+    case:
+      One of CASES.
+
+    context:
+      A dictionary with the "log" path, the "metadata" path of the scan
+      results, the "word_lists", a scratch "temp_dir" and the "keystore".
+
+  <Exceptions>
+    Any exception raised by the code under test.
+
+  <Return>
+    The number of bytes the case processed.
+  """
+
+  if case == "exec_cmd":
+    stdout_hasher = utils.HashingSink()
+    stderr_hasher = utils.HashingSink()
+    toto_main.exec_cmd("cat '" + context["log"] + "'", None,
+        os.path.join(context["temp_dir"], "out"), os.path.join(context["temp_dir"], "err"),
+        [stdout_hasher], [stderr_hasher])
+    return stdout_hasher.bytes_written
+
+  if case == "get_hash":
+    utils.get_hash(context["log"])
+    return os.path.getsize(context["log"])
+
+  if case == "check_file_against_wordlists":
+    metadata = dict()
+    matcher = wordlists.WordListMatcher(context["word_lists"])
+    toto_main.check_file_against_wordlists(metadata, matcher, context["log"], "output_data")
+    return os.path.getsize(context["log"])
+
+  # The remaining cases work on the metadata of the scan, which is loaded
+  # first since they need it in memory anyway
+  fileobj = open(context["metadata"])
+  metadata = json.load(fileobj)
+  fileobj.close()
+
+  if case == "sign_json":
+    import signing
+    signing.sign_json(metadata, context["keystore"])
+    return os.path.getsize(context["metadata"])
+
+  if case == "gen_json":
+    metadata_name = os.path.join(context["temp_dir"], "metadata")
+    utils.gen_json(metadata, metadata_name)
+    return os.path.getsize(metadata_name + ".json")
+
+  raise ValueError("unknown benchmark case " + case)
+
+
+def measure_case(case, context, repeat):
+  """
+  <Purpose>
+    Runs a benchmark case 'repeat' times, each in a fresh process, and keeps
+    the best time and the highest peak memory, along with how much each
+    varied between the runs.
+
+  <Arguments>
+    case:
+      One of CASES.
+
+    context:
+      See run_case().
+
+    repeat:
+      The number of runs.
+
+  <Exceptions>
+    RuntimeError, if a run fails.
+
+  <Return>
+    A tuple (bytes, seconds, peak_rss_kb, spread), where 'spread' maps
+    "seconds" and "peak_rss_kb" to the standard deviation of the runs.
+  """
+
+  runs = []
+  processed = 0
+  for i in range(repeat):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure_case_process, args=(case, context, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if "error" in result:
+      raise RuntimeError(case + " failed: " + result["error"])
+    processed = result["bytes"]
+    runs.append(result)
+  seconds = [run["seconds"] for run in runs]
+  peaks = [run["peak_rss_kb"] for run in runs]
+  spread = {"seconds": _stdev(seconds), "peak_rss_kb": _stdev(peaks)}
+  return processed, min(seconds), max(peaks), spread
+
+
+def find_regressions(results, baseline, tolerance):
+  """
+  <Purpose>
+    Compares results against a baseline run of the same cases.
+
+  <Arguments>
+    results:
+      A list of result dictionaries, as written to the --output file.
+
+    baseline:
+      A list of result dictionaries from an earlier run.
+
+    tolerance:
+      The fraction by which a case may be slower, or use more memory, than
+      its baseline before it is flagged; differences within NOISE_FLOOR, or
+      within NOISE_SIGMAS standard deviations of the runs of either side,
+      are never flagged.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    A list of messages, one per regression.
+  """
+
+  baseline_by_key = dict()
+  for result in baseline:
+    baseline_by_key[_result_key(result)] = result
+
+  regressions = []
+  for result in results:
+    previous = baseline_by_key.get(_result_key(result))
+    if previous is None:
+      continue
+    for field in ["seconds", "peak_rss_kb"]:
+      # Baselines saved before the spread was recorded have none
+      noise = NOISE_SIGMAS * max(result.get("spread", {}).get(field, 0),
+          previous.get("spread", {}).get(field, 0))
+      if (result[field] > previous[field] * (1 + tolerance) and
+          result[field] - previous[field] > max(NOISE_FLOOR[field], noise)):
+        regressions.append("REGRESSION: %s size %d density %g: %s %s -> %s" % (
+            result["case"], result["size"], result["density"], field,
+            _format_number(previous[field]), _format_number(result[field])))
+  return regressions
+
+
+def _measure_case_process(case, context, queue):
+  # Process target for measure_case(), reporting through the queue.
+  try:
+    start = time.time()
+    processed = run_case(case, context)
+    seconds = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+      peak = peak // 1024
+    queue.put({"bytes": processed, "seconds": seconds, "peak_rss_kb": peak})
+  except Exception as e:
+    queue.put({"error": repr(e)})
+
+
+def _stdev(values):
+  # The sample standard deviation of the values, or 0 for a single value.
+  if len(values) < 2:
+    return 0.0
+  mean = float(sum(values)) / len(values)
+  return (sum((value - mean) ** 2 for value in values) / (len(values) - 1)) ** 0.5
+
+
+def _result_key(result):
+  return (result["case"], result["size"], result["density"])
+
+
+def _format_number(value):
+  if isinstance(value, float):
+    return "%.4f" % value
+  return str(value)
+
+
+def _format_size(size):
+  for suffix in ["G", "M", "K"]:
+    if size >= SIZE_SUFFIXES[suffix] and size % SIZE_SUFFIXES[suffix] == 0:
+      return str(size // SIZE_SUFFIXES[suffix]) + suffix
+  return str(size)
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='bench_suite.py', description='Benchmarks capture, hashing, scanning and signing at scale.')
+  parser.add_argument('--sizes', metavar='SIZES', default='1M,16M,128M', help='comma-separated log sizes, e.g. 1M,256M,4G')
+  parser.add_argument('--densities', metavar='DENSITIES', default='0.001,0.05', help='comma-separated fractions of lines containing a word-list term')
+  parser.add_argument('--repeat', metavar='N', type=int, default=5, help='the number of runs of each case; the best is kept, and their spread is the noise against which regressions are judged')
+  parser.add_argument('--cases', metavar='CASES', default=','.join(CASES), help='comma-separated cases to run, from ' + ', '.join(CASES))
+  parser.add_argument('--output', metavar='FILE', help='write the results to FILE as JSON, e.g. to be used as a baseline')
+  parser.add_argument('--baseline', metavar='FILE', help='flag regressions against the results saved in FILE')
+  parser.add_argument('--tolerance', metavar='T', type=float, default=0.2, help='the fraction by which a case may exceed its baseline')
+  args = parser.parse_args()
+
+  sizes = [parse_size(size) for size in args.sizes.split(",")]
+  densities = [float(density) for density in args.densities.split(",")]
+  cases = args.cases.split(",")
+  for case in cases:
+    if case not in CASES:
+      parser.error("unknown case " + case)
+
+  fileobj = open(DEFAULT_POLICY_FILEPATH)
+  word_lists = json.load(fileobj)["supplied_data"]["word_lists"]
+  fileobj.close()
+
+  temp_dir = tempfile.mkdtemp(prefix="toto-bench-")
+  results = []
+  try:
+    context = {
+      "log": os.path.join(temp_dir, "log"),
+      "metadata": os.path.join(temp_dir, "scan.json"),
+      "word_lists": word_lists,
+      "temp_dir": temp_dir,
+      "keystore": os.path.join(temp_dir, "keystore.txt")
+    }
+    if "sign_json" in cases:
+      import signing
+      signing.load_or_create_key(context["keystore"])
+
+    print("%-30s %8s %8s %10s %10s %12s" % ("case", "size", "density", "seconds", "MB/s", "peak rss kb"))
+    for size in sizes:
+      for density in densities:
+        generate_log(context["log"], word_lists, size, density)
+        if "sign_json" in cases or "gen_json" in cases:
+          matcher = wordlists.WordListMatcher(word_lists)
+          utils.gen_json({"output_data": matcher.scan_file(context["log"])},
+              os.path.join(temp_dir, "scan"))
+
+        for case in cases:
+          processed, seconds, peak, spread = measure_case(case, context, args.repeat)
+          result = {"case": case, "size": size, "density": density, "bytes": processed,
+              "seconds": seconds, "mb_per_s": processed / 1e6 / max(seconds, 1e-9),
+              "peak_rss_kb": peak, "spread": spread}
+          results.append(result)
+          print("%-30s %8s %8g %10.4f %10.1f %12d" % (case, _format_size(size), density,
+              seconds, result["mb_per_s"], peak))
+          sys.stdout.flush()
+  finally:
+    shutil.rmtree(temp_dir)
+
+  if args.output:
+    fileobj = open(args.output, "w")
+    json.dump({"environment": {"python": platform.python_version(), "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count()}, "results": results}, fileobj, indent=2, sort_keys=True)
+    fileobj.close()
+
+  if args.baseline:
+    fileobj = open(args.baseline)
+    baseline = json.load(fileobj)["results"]
+    fileobj.close()
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for message in regressions:
+      print(message)
+    print("%d regressions against %s" % (len(regressions), args.baseline))
+    if regressions:
+      sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,206 @@
+"""
+<Program Name>
+  bench_wordlists.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Benchmarks the compiled wordlists.WordListMatcher against the original
+  line-by-line loop of main.check_file_against_wordlists, which ran a linear
+  scan over each word list for every token. A synthetic log is generated, both
+  implementations scan it, their results are checked to be identical and the
+  timings are printed. This script is called as below:
+
+  usage: bench_wordlists.py [-h] [--lines N] [--density D] [--repeat N]
+"""
+
+import os
+import sys
+import re
+import json
+import time
+import random
+import argparse
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import wordlists
+
+DEFAULT_POLICY_FILEPATH = os.path.join(os.path.dirname(BENCHMARK_DIR), "default_policy.json")
+
+# Filler vocabulary for lines which should not match any word list
+FILLER_WORDS = ["compiling", "module", "linking", "object", "gcc", "include",
+    "src", "build", "target", "copying", "lib", "checking", "for", "yes", "no"]
+
+
+def legacy_check_file_against_wordlists(word_lists, filename):
+  """
+  <Purpose>
+    The original implementation of main.check_file_against_wordlists, kept
+    here as the baseline for comparison.
+
+  <Arguments>
+    word_lists:
+      A dictionary storing the wordlists for success, failure and warning.
+
+    filename:
+      A string for the path to the file to be searched.
+
+  <Exceptions>
+    IOError, if the file cannot be read.
+
+  <Return>
+    A results dictionary laid out like wordlists.WordListMatcher.new_results().
+  """
+
+  success_words = word_lists["success"]
+  failure_words = word_lists["failure"]
+  warning_words = word_lists["warning"]
+  results = dict()
+  for category in wordlists.CATEGORIES:
+    results[category] = dict()
+    results[category]["instances"] = list()
+  success_list = results["success"]["instances"]
+  failure_list = results["failure"]["instances"]
+  warning_list = results["warning"]["instances"]
+
+  fileobj = open(filename, "r")
+  regexobj = re.compile('[^a-zA-Z]')
+  line_num = 0
+  success_count = 0
+  failure_count = 0
+  warning_count = 0
+  for line in fileobj:
+    line_num += 1
+    line_lower = line.lower()
+    line_lower_alpha = regexobj.sub(" ", line_lower)
+    tokens = line_lower_alpha.split()
+    dict_to_add = dict()
+    dict_to_add["line"] = line
+    dict_to_add["line_number"] = line_num
+    for token in tokens:
+      if any(word == token for word in success_words):
+        success_list.append(dict_to_add)
+        success_count += 1
+      elif any(word == token for word in failure_words):
+        failure_list.append(dict_to_add)
+        failure_count += 1
+      elif any(word == token for word in warning_words):
+        warning_list.append(dict_to_add)
+        warning_count += 1
+  fileobj.close()
+
+  results["success"]["count"] = success_count
+  results["failure"]["count"] = failure_count
+  results["warning"]["count"] = warning_count
+  return results
+
+
+def generate_log(filename, word_lists, num_lines, density, seed=0):
+  """
+  <Purpose>
+    Writes a synthetic build log in which roughly 'density' of the lines
+    contain a word-list term, in mixed case and with punctuation.
+
+  <Arguments>
+    filename:
+      The path of the log to be written.
+
+    word_lists:
+      A dictionary storing the wordlists for success, failure and warning.
+
+    num_lines:
+      The number of lines to be written.
+
+    density:
+      A float between 0 and 1 for the fraction of lines with a match.
+
+    seed:
+      The seed for the random generator, so logs are reproducible.
+
+  <Exceptions>
+    IOError, if the file cannot be written.
+
+  <Return>
+    None.
+  """
+
+  generator = random.Random(seed)
+  match_words = []
+  for category in wordlists.CATEGORIES:
+    match_words.extend(word_lists[category])
+
+  fileobj = open(filename, "w")
+  for line_number in range(num_lines):
+    words = [generator.choice(FILLER_WORDS) for i in range(generator.randint(4, 14))]
+    if generator.random() < density:
+      word = generator.choice(match_words)
+      if generator.random() < 0.5:
+        word = word.upper()
+      words.insert(generator.randint(0, len(words)), word + generator.choice([":", "", "!", ".c"]))
+    fileobj.write(" ".join(words) + "\n")
+  fileobj.close()
+
+
+def time_call(function, repeat):
+  # Returns the best wall-clock time of 'repeat' calls and the last result.
+  best = None
+  result = None
+  for i in range(repeat):
+    start = time.time()
+    result = function()
+    elapsed = time.time() - start
+    if best is None or elapsed < best:
+      best = elapsed
+  return best, result
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='bench_wordlists.py', description='Benchmarks word-list scanning of captured output.')
+  parser.add_argument('--lines', metavar='N', type=int, default=200000, help='the number of lines in the synthetic log')
+  parser.add_argument('--density', metavar='D', type=float, default=0.05, help='the fraction of lines containing a word-list term')
+  parser.add_argument('--repeat', metavar='N', type=int, default=3, help='the number of timed runs of each implementation')
+  args = parser.parse_args()
+
+  fileobj = open(DEFAULT_POLICY_FILEPATH)
+  word_lists = json.load(fileobj)["supplied_data"]["word_lists"]
+  fileobj.close()
+
+  handle, filename = tempfile.mkstemp(prefix="toto-bench-")
+  os.close(handle)
+  try:
+    generate_log(filename, word_lists, args.lines, args.density)
+    size = os.path.getsize(filename)
+
+    matcher = wordlists.WordListMatcher(word_lists)
+    legacy_time, legacy_results = time_call(
+        lambda: legacy_check_file_against_wordlists(word_lists, filename), args.repeat)
+    matcher_time, matcher_results = time_call(
+        lambda: matcher.scan_file(filename), args.repeat)
+  finally:
+    os.remove(filename)
+
+  if legacy_results != matcher_results:
+    sys.exit("ERROR: WordListMatcher results differ from the legacy loop")
+
+  print("log: %d lines, %.1f MB, density %.2f" % (args.lines, size / 1e6, args.density))
+  for name, elapsed in [("legacy loop", legacy_time), ("WordListMatcher", matcher_time)]:
+    print("%-16s %8.3f s  %8.1f MB/s" % (name, elapsed, size / 1e6 / elapsed))
+  print("speedup: %.1fx" % (legacy_time / matcher_time))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,559 @@
+"""
+<Program Name>
+  capture.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Provides the streaming capture used by main.py to record a command's stdout
+  and stderr. Rather than buffering the whole output in memory with
+  Popen.communicate(), each of the child's pipes is drained in bounded chunks
+  and every chunk is handed to a list of "sinks". A sink is any object with a
+  write() method (e.g. an open file), so peak memory stays fixed no matter how
+  much output the command produces. A sink which decides the command should
+  not continue (e.g. on too many failures) can stop it early through an Abort.
+
+  The pipes are multiplexed by a Supervisor, a select()/poll() loop in the
+  calling thread which can watch any number of processes at once without a
+  thread per pipe. It also enforces a wall-clock timeout per process: once the
+  timeout passes the process group is sent SIGTERM, and if it is still running
+  after a grace period, SIGKILL. Each process is reaped with wait4() so that
+  its resource usage (wall and CPU time, peak memory, block I/O and context
+  switches, including those of the processes it waited on) can be recorded.
+
+  For commands whose output is effectively unbounded, a HeadTailSink in place
+  of the open file keeps only the first and last bytes of a stream on disk,
+  while the other sinks (hashing, scanning) still see all of it.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import signal
+import threading
+
+# The maximum number of bytes read from a pipe at a time
+CHUNK_SIZE = 64 * 1024
+
+# The number of seconds a terminated process is given to exit before it is
+# killed
+KILL_GRACE = 5
+
+# The longest the supervisor waits between checks for the exit of processes
+# which have closed their pipes, in seconds, while it also has pipes or
+# deadlines to watch; the wait starts at MIN_POLL_INTERVAL and doubles while
+# nothing happens
+POLL_INTERVAL = 0.1
+MIN_POLL_INTERVAL = 0.001
+
+# The fields of a process' resource usage as recorded in the metadata, and the
+# rusage attribute each is read from. Times are in milliseconds and memory in
+# kilobytes, since the signed metadata may only hold integers.
+RUSAGE_FIELDS = [
+  ("user_cpu_ms", "ru_utime"),
+  ("system_cpu_ms", "ru_stime"),
+  ("max_rss_kb", "ru_maxrss"),
+  ("block_input_ops", "ru_inblock"),
+  ("block_output_ops", "ru_oublock"),
+  ("voluntary_context_switches", "ru_nvcsw"),
+  ("involuntary_context_switches", "ru_nivcsw")
+]
+
+
+class Abort(object):
+  """
+  Lets a sink stop the command whose output it is receiving. The command is
+  attached by capture_process(); once trigger() is called the command's whole
+  process group is terminated, and the first reason given is kept so that it
+  can be recorded in the metadata. For example:
+
+    abort = Abort()
+    ...
+    abort.trigger("failure limit of 3 reached")
+    abort.reason -> "failure limit of 3 reached"
+
+  If the command is stopped because its timeout passed, 'timed_out' is set.
+  """
+
+  def __init__(self):
+    self.reason = None
+    self.timed_out = False
+    self.triggered_at = None
+    self.process = None
+    self._lock = threading.Lock()
+
+
+  def attach(self, process):
+    self._lock.acquire()
+    try:
+      self.process = process
+      triggered = self.reason is not None
+    finally:
+      self._lock.release()
+    if triggered:
+      terminate_process_group(process)
+
+
+  def trigger(self, reason, timed_out=False):
+    self._lock.acquire()
+    try:
+      if self.reason is not None:
+        return
+      self.reason = reason
+      self.timed_out = timed_out
+      self.triggered_at = time.time()
+      process = self.process
+    finally:
+      self._lock.release()
+    if process is not None:
+      terminate_process_group(process)
+
+
+class HeadTailSink(object):
+  """
+  A sink which writes only the first 'head_bytes' and the last 'tail_bytes'
+  of a stream to the given file, so a command cannot fill the disk however
+  much it prints. The head is written as it arrives; the tail is kept in a
+  fixed-size ring buffer and written after it by close(). For example:
+
+    sink = HeadTailSink(stdout_fileobj, 1024 * 1024, 1024 * 1024)
+    capture.capture_process(process, [sink, hasher], [...])
+    sink.close()
+    sink.dropped_bytes -> 734003200
+  """
+
+  def __init__(self, fileobj, head_bytes, tail_bytes):
+    self.fileobj = fileobj
+    self.head_bytes = head_bytes or 0
+    self.tail_bytes = tail_bytes or 0
+    self.bytes_written = 0
+    self.dropped_bytes = 0
+    self.ring = bytearray(self.tail_bytes)
+    # The position in the ring of the oldest byte once it is full, and of the
+    # next free byte until then
+    self.ring_position = 0
+    self.ring_full = False
+
+
+  def write(self, data):
+    head_room = self.head_bytes - self.bytes_written
+    self.bytes_written += len(data)
+    if head_room > 0:
+      self.fileobj.write(data[:head_room])
+      data = data[head_room:]
+    if data:
+      self._keep_tail(data)
+
+
+  def close(self):
+    # Writes out the tail; the file itself belongs to the caller
+    if self.ring_full:
+      self.fileobj.write(bytes(self.ring[self.ring_position:]))
+      self.fileobj.write(bytes(self.ring[:self.ring_position]))
+    else:
+      self.fileobj.write(bytes(self.ring[:self.ring_position]))
+
+
+  def _keep_tail(self, data):
+    size = self.tail_bytes
+    if len(data) >= size:
+      # Whatever the ring held, and the start of the data, is dropped
+      self.dropped_bytes += (self.ring_full and size or self.ring_position) + len(data) - size
+      self.ring[:] = data[len(data) - size:]
+      self.ring_position = 0
+      self.ring_full = size > 0
+      return
+
+    end = self.ring_position + len(data)
+    if self.ring_full:
+      self.dropped_bytes += len(data)
+    elif end > size:
+      self.dropped_bytes += end - size
+    if end <= size:
+      self.ring[self.ring_position:end] = data
+    else:
+      first_part = size - self.ring_position
+      self.ring[self.ring_position:] = data[:first_part]
+      self.ring[:end - size] = data[first_part:]
+    self.ring_position = end % size
+    self.ring_full = self.ring_full or end >= size
+
+
+class SupervisedProcess(object):
+  """
+  A process watched by a Supervisor, along with where its output goes. Once
+  the supervisor has run, 'return_code' holds the process' return code,
+  'resource_usage' a dictionary of its resource usage (see RUSAGE_FIELDS, plus
+  "wall_time_ms") and 'error' the first exception raised by one of its sinks,
+  if any.
+  """
+
+  def __init__(self, process, stdout_sinks, stderr_sinks, abort, timeout, kill_grace):
+    self.process = process
+    self.abort = abort
+    self.timeout = timeout
+    self.kill_grace = kill_grace
+    self.started_at = time.time()
+    self.deadline = timeout is not None and self.started_at + timeout or None
+    self.killed = False
+    self.return_code = None
+    self.resource_usage = None
+    self.error = None
+    self.open_pipes = {
+      process.stdout.fileno(): (process.stdout, list(stdout_sinks)),
+      process.stderr.fileno(): (process.stderr, list(stderr_sinks))
+    }
+
+
+  def next_deadline(self):
+    # The next time at which this process may need to be signalled, or None.
+    if self.abort.triggered_at is not None:
+      if self.killed:
+        return None
+      return self.abort.triggered_at + self.kill_grace
+    return self.deadline
+
+
+class Supervisor(object):
+  """
+  Drains the output of any number of processes into their sinks from a single
+  thread, and enforces their timeouts. For example:
+
+    supervisor = Supervisor()
+    build = supervisor.add(build_process, [out_file], [err_file], timeout=600)
+    test = supervisor.add(test_process, [out_file2], [err_file2])
+    supervisor.run()
+    build.return_code, build.abort.timed_out -> 0, False
+  """
+
+  def __init__(self, chunk_size=CHUNK_SIZE):
+    self.chunk_size = chunk_size
+    self.supervised = []
+
+
+  def add(self, process, stdout_sinks, stderr_sinks, abort=None, timeout=None,
+      kill_grace=KILL_GRACE):
+    """
+    <Purpose>
+      Adds a running process to be supervised.
+
+    <Arguments>
+      process:
+        A subprocess.Popen object created with stdout=PIPE and stderr=PIPE,
+        as a process group leader.
+
+      stdout_sinks:
+        A list of sinks to receive the process' stdout.
+
+      stderr_sinks:
+        A list of sinks to receive the process' stderr.
+
+      abort:
+        An optional Abort through which the sinks may terminate the process;
+        one is created if none is given.
+
+      timeout:
+        The number of seconds the process may run for, or None for no limit.
+
+      kill_grace:
+        The number of seconds a terminated process is given to exit before
+        it is killed.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      The SupervisedProcess for the process.
+    """
+
+    if abort is None:
+      abort = Abort()
+    abort.attach(process)
+    supervised = SupervisedProcess(process, stdout_sinks, stderr_sinks, abort,
+        timeout, kill_grace)
+    self.supervised.append(supervised)
+    return supervised
+
+
+  def run(self):
+    """
+    <Purpose>
+      Drains every supervised process' pipes until EOF and waits for each
+      process to exit, terminating and killing those which overrun.
+
+    <Arguments>
+      None.
+
+    <Exceptions>
+      OSError, if waiting on the pipes fails.
+
+    <Return>
+      None.
+    """
+
+    pending = list(self.supervised)
+    poll_interval = MIN_POLL_INTERVAL
+    while pending:
+      now = time.time()
+      for supervised in pending:
+        _enforce_deadlines(supervised, now)
+
+      readers = dict()
+      for supervised in pending:
+        for fd in supervised.open_pipes:
+          readers[fd] = supervised
+      deadlines = [supervised.next_deadline() for supervised in pending]
+
+      # With no pipes to drain and no deadline to enforce there is nothing to
+      # do but wait for the next exit, so block until it happens
+      if not readers and not any(deadline is not None for deadline in deadlines):
+        _reap(pending[0], True)
+        pending.pop(0)
+        continue
+
+      # Sleep until output arrives or the next deadline passes; processes
+      # which have closed their pipes are polled for their exit
+      wait = _seconds_until(deadlines, now)
+      if any(not supervised.open_pipes for supervised in pending):
+        wait = wait is None and poll_interval or min(wait, poll_interval)
+        poll_interval = min(poll_interval * 2, POLL_INTERVAL)
+
+      if readers:
+        for fd in _wait_readable(list(readers), wait):
+          self._read(readers[fd], fd)
+          poll_interval = MIN_POLL_INTERVAL
+      elif wait:
+        time.sleep(wait)
+
+      for supervised in list(pending):
+        if not supervised.open_pipes and _reap(supervised):
+          pending.remove(supervised)
+          poll_interval = MIN_POLL_INTERVAL
+
+
+  def _read(self, supervised, fd):
+    # Passes one chunk from the pipe to its sinks, closing the pipe at EOF. A
+    # failing sink is recorded and the pipe's output discarded from then on,
+    # so that the child cannot block forever on a full pipe.
+    pipe, sinks = supervised.open_pipes[fd]
+    data = os.read(fd, self.chunk_size)
+    if not data:
+      pipe.close()
+      del supervised.open_pipes[fd]
+      return
+    try:
+      for sink in sinks:
+        sink.write(data)
+    except Exception as e:
+      if supervised.error is None:
+        supervised.error = e
+      supervised.open_pipes[fd] = (pipe, [])
+
+
+def terminate_process_group(process, sig=signal.SIGTERM):
+  """
+  <Purpose>
+    Sends a signal to the process group led by the given process. Commands
+    which may be terminated early are run through the shell in their own
+    process group (see main.exec_cmd), so this reaches every process the
+    command started, not just the shell. A process which does not lead its
+    own group shares it with the caller, so only that process is signalled.
+
+  <Arguments>
+    process:
+      A subprocess.Popen object started as a process group leader.
+
+    sig:
+      The signal to be sent; SIGTERM by default.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    None.
+  """
+
+  try:
+    if os.getpgid(process.pid) == process.pid:
+      os.killpg(process.pid, sig)
+    else:
+      os.kill(process.pid, sig)
+  except OSError:
+    # The process group has already exited
+    pass
+
+
+def capture_process(process, stdout_sinks, stderr_sinks, chunk_size=CHUNK_SIZE, abort=None,
+    timeout=None, kill_grace=KILL_GRACE, resource_usage=None):
+  """
+  <Purpose>
+    Drains the stdout and stderr pipes of a running process into the given
+    sinks and waits for the process to exit.
+
+  <Arguments>
+    process:
+      A subprocess.Popen object created with stdout=PIPE and stderr=PIPE.
+
+    stdout_sinks:
+      A list of sinks to receive the process' stdout.
+
+    stderr_sinks:
+      A list of sinks to receive the process' stderr.
+
+    chunk_size:
+      The maximum number of bytes to read from a pipe at a time.
+
+    abort:
+      An optional Abort through which the sinks may terminate the process, and
+      which records whether it timed out.
+
+    timeout:
+      The number of seconds the process may run for, or None for no limit.
+      The process must be a process group leader for a timeout to be used.
+
+    kill_grace:
+      The number of seconds a terminated process is given to exit before it
+      is killed.
+
+    resource_usage:
+      An optional dictionary which is filled with the resource usage of the
+      process (see SupervisedProcess).
+
+  <Exceptions>
+    OSError or IOError, if reading from a pipe or writing to a sink fails.
+
+  <Return>
+    An integer representing the return code of the process.
+  """
+
+  supervisor = Supervisor(chunk_size)
+  supervised = supervisor.add(process, stdout_sinks, stderr_sinks, abort, timeout,
+      kill_grace)
+  supervisor.run()
+
+  # Keep Popen's own view of the process consistent for the caller
+  process.wait()
+  if resource_usage is not None and supervised.resource_usage is not None:
+    resource_usage.update(supervised.resource_usage)
+
+  # Surface a failure from a sink (e.g. a full disk) to the caller
+  if supervised.error is not None:
+    raise supervised.error
+
+  return supervised.return_code
+
+
+def _enforce_deadlines(supervised, now):
+  # Terminates a process whose timeout has passed, and kills one which is
+  # still running a grace period after it was terminated.
+  abort = supervised.abort
+  if abort.triggered_at is None:
+    if supervised.deadline is not None and now >= supervised.deadline:
+      abort.trigger("timeout of " + str(supervised.timeout) + " seconds reached", True)
+  elif not supervised.killed and now >= abort.triggered_at + supervised.kill_grace:
+    if supervised.return_code is None or supervised.open_pipes:
+      terminate_process_group(supervised.process, signal.SIGKILL)
+    supervised.killed = True
+
+
+def _reap(supervised, block=False):
+  # Collects the exit status and resource usage of an exited process, waiting
+  # for it to exit if 'block' is set and otherwise returning False if it is
+  # still running. The process is reaped here rather than by Popen, which
+  # would discard its resource usage, so Popen's return code is set to match.
+  # Its wall time ends as soon as the exit is seen, which the supervisor no
+  # longer delays by a poll interval.
+  process = supervised.process
+  if not hasattr(os, "wait4"):
+    if block:
+      process.wait()
+    supervised.return_code = process.poll()
+    return supervised.return_code is not None
+
+  while True:
+    try:
+      pid, status, rusage = os.wait4(process.pid, not block and os.WNOHANG or 0)
+      ended_at = time.time()
+      break
+    except OSError as e:
+      if e.errno == errno.EINTR:
+        continue
+      if e.errno != errno.ECHILD:
+        raise
+      # The process has already been reaped elsewhere
+      supervised.return_code = process.poll()
+      return supervised.return_code is not None
+  if pid == 0:
+    return False
+
+  if os.WIFSIGNALED(status):
+    process.returncode = -os.WTERMSIG(status)
+  else:
+    process.returncode = os.WEXITSTATUS(status)
+  supervised.return_code = process.returncode
+  supervised.resource_usage = _rusage_dict(rusage, ended_at - supervised.started_at)
+  return True
+
+
+def _rusage_dict(rusage, wall_time):
+  # Converts an rusage structure and wall time into the integer fields
+  # recorded in the metadata.
+  usage = {"wall_time_ms": int(round(wall_time * 1000))}
+  for field, attribute in RUSAGE_FIELDS:
+    value = getattr(rusage, attribute)
+    if attribute in ("ru_utime", "ru_stime"):
+      value = int(round(value * 1000))
+    elif attribute == "ru_maxrss" and sys.platform == "darwin":
+      # Reported in bytes rather than kilobytes
+      value = value // 1024
+    usage[field] = int(value)
+  return usage
+
+
+def _seconds_until(deadlines, now):
+  # Returns the number of seconds until the earliest of the given deadlines
+  # (ignoring None), or None if there are none.
+  deadlines = [deadline for deadline in deadlines if deadline is not None]
+  if not deadlines:
+    return None
+  return max(0, min(deadlines) - now)
+
+
+def _wait_readable(fds, timeout):
+  # Returns the file descriptors which are readable (or at EOF), waiting up to
+  # 'timeout' seconds (forever if None). poll() is used where available since
+  # select() is limited to small descriptor numbers.
+  if hasattr(select, "poll"):
+    poller = select.poll()
+    for fd in fds:
+      poller.register(fd, select.POLLIN | select.POLLPRI)
+    if timeout is not None:
+      timeout = timeout * 1000
+    while True:
+      try:
+        events = poller.poll(timeout)
+        break
+      except (select.error, OSError) as e:
+        if e.args[0] != errno.EINTR:
+          raise
+    return [fd for fd, event in events]
+
+  while True:
+    try:
+      return select.select(fds, [], [], timeout)[0]
+    except (select.error, OSError) as e:
+      if e.args[0] != errno.EINTR:
+        raise
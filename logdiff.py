@@ -0,0 +1,389 @@
+"""
+<Program Name>
+  logdiff.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Compares the captured output of two runs, e.g. the last good run of a test
+  and the first bad one, and reports only the lines which were added or
+  removed and which hit the failure or warning word lists.
+
+  A stream whose recorded SHA-256 digest is the same in both runs is
+  identical and is not read at all. Otherwise the two files are split into
+  content-defined chunks: a chunk ends after any line whose CRC-32 has its
+  low bits clear, so chunk boundaries depend only on the lines around them
+  and line up again right after an insertion or deletion, as in rsync and
+  other rolling-hash differs. Chunks whose digest appears in the other file
+  are unchanged; only the lines of the remaining chunks are matched against
+  the word lists, and the hits on each side which have no identical
+  counterpart in the other side's changed chunks are reported. Each file is
+  streamed rather than loaded, and only word-list hits are kept in memory,
+  so multi-gigabyte logs can be compared. This script is called as below:
+
+  usage: logdiff.py [-h] [--policy FILENAME] [--stream {out,err}] [--json]
+                    OLD_METADATA NEW_METADATA
+
+  The exit status is 1 if any line is reported, and 0 otherwise.
+"""
+
+import os
+import sys
+import json
+import zlib
+import hashlib
+import argparse
+import operator
+import itertools
+import store
+import policy
+import wordlists
+
+DEFAULT_POLICY_FILENAME = "default_policy.json"
+
+# The streams which can be compared, by the metadata fields of their path
+# and digests
+STREAMS = [("out", "output_path", "output_hashes"), ("err", "err_path", "err_hashes")]
+
+# The word list categories whose lines are reported
+REPORTED_CATEGORIES = ("failure", "warning")
+
+# A chunk ends after a line whose CRC-32 has none of these bits set, so
+# chunks are 256 lines long on average
+CHUNK_MASK = 0xff
+
+# Chunks are cut after this many lines even without a boundary, which bounds
+# the lines held at once
+MAX_CHUNK_LINES = 4096
+
+# The number of bytes read at a time
+READ_SIZE = 1024 * 1024
+
+
+class LogDiffError(Exception):
+  """
+  Raised when two runs cannot be compared, e.g. because a metadata file does
+  not record a captured stream.
+  """
+
+  def __init__(self, value):
+    self.value = value
+
+  def __str__(self):
+    return repr(self.value)
+
+
+def iter_chunks(filepath):
+  """
+  <Purpose>
+    Splits a captured file into content-defined chunks of whole lines; see
+    the module docstring.
+
+  <Arguments>
+    filepath:
+      The path of the file, which may be a compressed blob of an artifact
+      store.
+
+  <Exceptions>
+    IOError, if the file cannot be read.
+
+  <Return>
+    A generator of (digest, first_line_number, offset, lines) tuples, where
+    'offset' is the byte offset of the chunk and 'lines' is the list of its
+    lines without their newlines.
+  """
+
+  fileobj = store.open_blob(filepath)
+  try:
+    line_number = 1
+    offset = 0
+    remainder = b""
+    # The lines after the last boundary, carried over to the next read so 
+    # that boundaries do not depend on where reads happen to end
+    pending = []
+    while True:
+      data = fileobj.read(READ_SIZE)
+      if data:
+        lines = (remainder + data).split(b"\n")
+        remainder = lines.pop()
+      else:
+        # The last line may lack a newline
+        lines = remainder and [remainder] or []
+      lines = pending + lines
+
+      # The boundaries are found by chaining C-level iterators, so Python 
+      # only loops over the chunks rather than over every line
+      masked_hashes = map(CHUNK_MASK.__and__, map(zlib.crc32, lines))
+      boundaries = list(itertools.compress(itertools.count(1), map(operator.not_, masked_hashes)))
+      if not data and lines and (not boundaries or boundaries[-1] != len(lines)):
+        boundaries.append(len(lines))
+      start = 0
+      for end in boundaries + [None]:
+        if end is None:
+          # Only whole chunks are cut from the carried-over lines
+          end = start + (len(lines) - start) // MAX_CHUNK_LINES * MAX_CHUNK_LINES
+        while start < end:
+          stop = min(end, start + MAX_CHUNK_LINES)
+          chunk = lines[start:stop]
+          yield hashlib.sha1(b"\n".join(chunk)).digest(), line_number, offset, chunk
+          line_number += stop - start
+          offset += sum(map(len, chunk)) + stop - start
+          start = stop
+      pending = lines[start:]
+      if not data:
+        break
+  finally:
+    fileobj.close()
+
+
+def line_categories(matcher, line):
+  """
+  <Purpose>
+    Returns the reported word list categories which a line hits.
+
+  <Arguments>
+    matcher:
+      A wordlists.WordListMatcher.
+
+    line:
+      The line, as bytes.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    A sorted list of categories from REPORTED_CATEGORIES, empty if the line
+    hits none of them.
+  """
+
+  categories = set()
+  for token in wordlists.TOKEN_REGEX.findall(line.lower()):
+    category = matcher.token_map.get(token)
+    if category in REPORTED_CATEGORIES:
+      categories.add(category)
+  return sorted(categories)
+
+
+def diff_files(old_filepath, new_filepath, matcher):
+  """
+  <Purpose>
+    Finds the word-list hits which were added or removed between two
+    captured files.
+
+  <Arguments>
+    old_filepath:
+      The path of the file of the earlier (e.g. good) run.
+
+    new_filepath:
+      The path of the file of the later (e.g. bad) run.
+
+    matcher:
+      A wordlists.WordListMatcher of the word lists to report hits of.
+
+  <Exceptions>
+    IOError, if either file cannot be read.
+
+  <Return>
+    A tuple (added, removed) of lists of {"line_number", "line",
+    "categories"} dictionaries, in file order; line numbers refer to the new
+    and the old file respectively.
+  """
+
+  # Only the position of each old chunk is kept, so that the changed ones can 
+  # be read back without chunking the old file again
+  old_chunks = []
+  for digest, line_number, offset, lines in iter_chunks(old_filepath):
+    old_chunks.append((digest, line_number, offset, len(lines)))
+  old_digests = set(chunk[0] for chunk in old_chunks)
+
+  new_digests = set()
+  new_hits = []
+  for digest, line_number, offset, lines in iter_chunks(new_filepath):
+    new_digests.add(digest)
+    if digest not in old_digests:
+      new_hits.extend(_hits(matcher, line_number, lines))
+
+  old_hits = []
+  fileobj = store.open_blob(old_filepath)
+  try:
+    for digest, line_number, offset, line_count in old_chunks:
+      if digest not in new_digests:
+        fileobj.seek(offset)
+        lines = [fileobj.readline().rstrip(b"\n") for i in range(line_count)]
+        old_hits.extend(_hits(matcher, line_number, lines))
+  finally:
+    fileobj.close()
+
+  return _unmatched(new_hits, old_hits), _unmatched(old_hits, new_hits)
+
+
+def compare(old_metadata, new_metadata, matcher, streams=None):
+  """
+  <Purpose>
+    Compares the captured streams of two runs, skipping those whose recorded
+    digests are the same.
+
+  <Arguments>
+    old_metadata:
+      The metadata dictionary of the earlier run.
+
+    new_metadata:
+      The metadata dictionary of the later run.
+
+    matcher:
+      A wordlists.WordListMatcher of the word lists to report hits of.
+
+    streams:
+      A list of the names of the streams to compare ("out", "err"); all of
+      them by default.
+
+  <Exceptions>
+    LogDiffError, if a metadata dictionary does not record a stream.
+
+    IOError, if a captured file cannot be read.
+
+  <Return>
+    A dictionary mapping each stream name to a dictionary holding whether it
+    is "identical" and the "added" and "removed" hits, as returned by
+    diff_files().
+  """
+
+  report = dict()
+  for stream, path_key, hashes_key in STREAMS:
+    if streams is not None and stream not in streams:
+      continue
+    filepaths = []
+    digests = []
+    for metadata in [old_metadata, new_metadata]:
+      application = metadata.get("application") or dict()
+      if not application.get(path_key):
+        raise LogDiffError("No " + stream + " file is recorded in the metadata")
+      filepaths.append(application[path_key])
+      digests.append((application.get(hashes_key) or dict()).get("sha256"))
+
+    if digests[0] is not None and digests[0] == digests[1]:
+      report[stream] = {"identical": True, "added": [], "removed": []}
+      continue
+    added, removed = diff_files(filepaths[0], filepaths[1], matcher)
+    report[stream] = {"identical": False, "added": added, "removed": removed}
+  return report
+
+
+def print_report(report, fileobj=sys.stdout):
+  """
+  <Purpose>
+    Prints a summary line per stream followed by its added ("+") and removed
+    ("-") lines, each with its line number and categories.
+
+  <Arguments>
+    report:
+      A report as returned by compare().
+
+    fileobj:
+      The file to which it is written.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    The number of lines reported.
+  """
+
+  reported = 0
+  for stream, path_key, hashes_key in STREAMS:
+    if stream not in report:
+      continue
+    result = report[stream]
+    if result["identical"]:
+      fileobj.write("%s: identical\n" % stream)
+      continue
+    fileobj.write("%s: %d added, %d removed\n" % (stream, len(result["added"]), len(result["removed"])))
+    for sign, hits in [("+", result["added"]), ("-", result["removed"])]:
+      for hit in hits:
+        fileobj.write("%s %d [%s] %s\n" % (sign, hit["line_number"], ",".join(hit["categories"]),
+          hit["line"].rstrip("\r")))
+      reported += len(hits)
+  return reported
+
+
+def _hits(matcher, first_line_number, lines):
+  # Returns (line, line_number, categories) for the lines of a changed chunk
+  # which hit the reported word lists.
+  hits = []
+  for index, line in enumerate(lines):
+    categories = line_categories(matcher, line)
+    if categories:
+      hits.append((line, first_line_number + index, categories))
+  return hits
+
+
+def _unmatched(hits, other_hits):
+  # Returns the hits which have no identical line among 'other_hits', each
+  # line in 'other_hits' cancelling out one occurrence.
+  remaining = dict()
+  for line, line_number, categories in other_hits:
+    remaining[line] = remaining.get(line, 0) + 1
+  unmatched = []
+  for line, line_number, categories in hits:
+    if remaining.get(line):
+      remaining[line] -= 1
+      continue
+    unmatched.append({"line_number": line_number, "line": _decode_line(line),
+      "categories": categories})
+  return unmatched
+
+
+def _decode_line(line):
+  if not isinstance(line, str):
+    return line.decode("utf-8", "replace")
+  return line
+
+
+def _load_json(filepath):
+  fileobj = open(filepath, "r")
+  try:
+    return json.load(fileobj)
+  finally:
+    fileobj.close()
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='logdiff.py', description='Reports the failure and warning lines added or removed between the captured output of two runs.')
+  parser.add_argument('--policy', metavar='FILENAME', help='the policy file whose word lists are used; default is ' + DEFAULT_POLICY_FILENAME)
+  parser.add_argument('--stream', choices=[stream for stream, path_key, hashes_key in STREAMS], action='append', help='only compare this stream; may be repeated')
+  parser.add_argument('--json', action='store_true', help='print the report as JSON')
+  parser.add_argument('old_metadata', metavar='OLD_METADATA', help='the metadata file of the earlier (e.g. good) run')
+  parser.add_argument('new_metadata', metavar='NEW_METADATA', help='the metadata file of the later (e.g. bad) run')
+  args = parser.parse_args()
+
+  policy_filepath = args.policy or os.path.join(os.path.dirname(os.path.realpath(__file__)),
+    DEFAULT_POLICY_FILENAME)
+  matcher = wordlists.WordListMatcher(policy.Policy.load(policy_filepath).word_lists)
+  try:
+    report = compare(_load_json(args.old_metadata), _load_json(args.new_metadata), matcher,
+      args.stream)
+  except (LogDiffError, IOError) as e:
+    sys.stderr.write("logdiff.py: error: %s\n" % e)
+    sys.exit(2)
+
+  if args.json:
+    print(json.dumps(report, indent=2, sort_keys=True))
+    reported = sum(len(result["added"]) + len(result["removed"]) for result in report.values())
+  else:
+    reported = print_report(report)
+  sys.exit(reported and 1 or 0)
+
+
+if __name__ == '__main__':
+  main()
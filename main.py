@@ -20,7 +20,15 @@
   development phases. This script represents the backbone of this application. 
   This script is called as below:
 
-  usage: main.py [-h] [--version] [--input FILEPATH] [--policy FILENAME] COMMAND
+  usage: main.py [-h] [--version] [--input FILEPATH] [--policy FILENAME]
+                 [--scan-jobs N] [--instances {full,reference}]
+                 [--output-dir DIR] [--store DIR] [--store-compress]
+                 [--material PATH] [--product PATH] [--hash-jobs N]
+                 [--stat-index FILEPATH] [--cache DIR]
+                 [--cache-input FILEPATH] [--cache-max-bytes N]
+                 [--cache-resign] [--profile] [--profile-output FILE]
+                 [--profile-phase PHASE]
+                 COMMAND
 
   Captures the given build/test command's I/O and relevant system details.
 
@@ -33,23 +41,71 @@
     --input FILEPATH   the path to the desired input file to be routed through
                        stdin
     --policy FILENAME  the path to the desired file specifying build/test policy
+    --scan-jobs N      the number of processes used to scan the output against
+                       the word lists
+    --instances {full,reference}
+                       how word-list matches are recorded: the full text of
+                       each matching line, or a reference to it in the out/err
+                       file
+    --output-dir DIR   the directory in which in, out, err and metadata.json are
+                       written; defaults to the current directory
+    --store DIR        keep in, out and err in a content-addressed store at DIR,
+                       shared between runs, and record their paths in it
+    --store-compress   gzip-compress files newly added to the store
+    --material PATH    a file or directory the command consumes, whose files
+                       are hashed into the "materials" section before it runs;
+                       may be repeated
+    --product PATH     a file or directory the command produces, whose files
+                       are hashed into the "products" section after it runs;
+                       may be repeated
+    --hash-jobs N      the number of threads hashing materials and products;
+                       default is the number of CPUs
+    --stat-index FILEPATH
+                       an index of file digests by path, inode, size and
+                       mtime, kept between runs so unchanged materials and
+                       products are not hashed again
+    --cache DIR        reuse the metadata of an earlier identical run from the
+                       run cache at DIR instead of running the command, and
+                       cache this run otherwise
+    --cache-input FILEPATH
+                       a file the command reads, whose contents are part of
+                       the run cache key; may be repeated
+    --cache-max-bytes N
+                       the size to which the run cache is limited by evicting
+                       the least recently used runs; default 1 GiB
+    --cache-resign     re-sign metadata reused from the run cache with a fresh
+                       timestamp
+    --profile          time each phase of the run and report it on stderr
+    --profile-output FILE
+                       write the profile to FILE as JSON instead; implies
+                       --profile
+    --profile-phase PHASE
+                       also run the given phase under cProfile; implies
+                       --profile
 """
 
-import subprocess
 import os
+import json
 import datetime
 import sys
-import getpass
 import utils
-import shutil
-import signing
 import argparse
-import re
-import tuf
+import wordlists
+import policy
+import profiler
+
+# subprocess and capture are only imported once the command is about to be 
+# run, and signerd (and through it tuf) once the metadata is signed, so that 
+# --version and runs rejected by the policy start as fast as possible
 
 TOTO_TOOL_VERSION = "Toto Build/Test Metadata Generator 0.4"
 DEFAULT_POLICY_FILENAME = "default_policy.json"
 
+# The phases of a run, in order, as timed by --profile
+PROFILE_PHASES = ["load_policy", "process_env_vars", "check_pre_run", "snapshot_materials", "run_cache", "exec_cmd", 
+  "process_app_data", "snapshot_products", "scan_wordlists", "check_post_run", "store_artifacts", "sign_json", 
+  "gen_json"]
+
 def main():
   """
   <Purpose>
@@ -69,6 +125,39 @@ def main():
   # Setup the command line parser
   args = get_command_line_args()
 
+  # Each phase is timed; the profile is only reported with --profile, 
+  # --profile-output or --profile-phase, and is reported even if a phase fails
+  run_profile = profiler.Profiler(args.profile_phase)
+  try:
+    generate_metadata(args, run_profile)
+  finally:
+    if args.profile_output:
+      run_profile.write_json(args.profile_output)
+    elif args.profile or args.profile_phase:
+      run_profile.write_report(sys.stderr)
+
+
+def generate_metadata(args, run_profile):
+  """
+  <Purpose>
+    Runs the command given on the command line and writes its signed 
+    metadata, timing each phase with the given profiler.
+
+  <Arguments>
+    args:
+      The command line arguments, as returned by get_command_line_args().
+
+    run_profile:
+      The profiler.Profiler with which each of PROFILE_PHASES is timed.
+
+  <Exceptions>
+    policy.PolicyConstraintException, if a constraint of the policy is not 
+    met.
+
+  <Return>
+    None.
+  """
+
   # Grab the command line arguments
   cmd_string = args.command
   input_filepath = args.input
@@ -84,23 +173,195 @@ def main():
   metadata['variables'] = dict()
   metadata['application'] = dict()
 
-  # Execute the given command and fill the metadata dict
-  process_env_vars(metadata)
-  stdout, stderr, return_code = exec_cmd(cmd_string, input_filepath)
-  process_app_data(metadata, cmd_string, input_filepath, stdout, stderr, return_code)
-  policy_dict = process_policy_file(metadata, policy_filepath)
-  check_file_against_wordlists(metadata, policy_dict["supplied_data"]["word_lists"], "out", "output_data")
-  check_file_against_wordlists(metadata, policy_dict["supplied_data"]["word_lists"], "err", "err_data")
-
-  # Generate the signed JSON
-  signed_metadata = signing.sign_json(metadata)
-  utils.gen_json(signed_metadata, "metadata")
+  # The command's stdout and stderr are streamed straight into these files
+  output_dir = os.path.abspath(args.output_dir or os.getcwd())
+  if not os.path.isdir(output_dir):
+    os.makedirs(output_dir)
+  stdout_filepath = os.path.join(output_dir, "out")
+  stderr_filepath = os.path.join(output_dir, "err")
+
+  # With an artifact store, the captured files are kept in it by digest
+  artifacts = None
+  if args.store:
+    import store
+    artifacts = store.ArtifactStore(args.store, args.store_compress)
+
+  # The policy is compiled up front so that its static constraints can be 
+  # checked before the command is spawned
+  with run_profile.phase("load_policy"):
+    compiled_policy = policy.Policy.load(policy_filepath)
+
+  # A host or command constraint which is not met stops us before anything is 
+  # set up to run the command
+  with run_profile.phase("process_env_vars"):
+    process_env_vars(metadata)
+  with run_profile.phase("check_pre_run"):
+    compiled_policy.check_pre_run(metadata, cmd_string)
+
+  # The declared materials are recorded before the command can change them, 
+  # and the products once it has finished; toto's own files are left out
+  stat_index = None
+  if args.stat_index and (args.material or args.product):
+    import materials
+    stat_index = materials.StatIndex(args.stat_index)
+  snapshot_exclude = [os.path.join(output_dir, name) for name in 
+    ["in", "out", "err", "metadata.json"]]
+  snapshot_exclude += [path for path in [args.store, args.cache, args.stat_index] if path]
+  if args.material:
+    with run_profile.phase("snapshot_materials") as phase:
+      metadata['materials'] = take_snapshot(args.material, stat_index, args.hash_jobs, 
+        snapshot_exclude, phase)
+      if stat_index is not None and not args.product:
+        stat_index.save()
+
+  # With a run cache, a run whose inputs are all unchanged is not repeated; its 
+  # cached metadata and files are returned instead. Products are not kept in 
+  # the cache, so a run which declares them is always repeated
+  run_cache = None
+  if args.cache and args.product:
+    sys.stderr.write("main.py: warning: --cache is ignored since --product is given; the run is not cached\n")
+  if args.cache and not args.product:
+    with run_profile.phase("run_cache"):
+      import runcache
+      run_cache = runcache.RunCache(args.cache, args.cache_max_bytes or runcache.DEFAULT_MAX_BYTES)
+      run_key = runcache.cache_key(get_run_cache_fields(args, metadata, policy_filepath))
+      hit = run_cache.get(run_key)
+      if hit is not None:
+        restore_cached_run(hit[0], hit[1], metadata, output_dir, args.cache_resign)
+        return
+
+  import capture
+
+  # The policy may limit each stream on disk to its first and last bytes. The 
+  # streams are then scanned as they are captured, so that the counts still 
+  # cover all of the output, and instances are kept in full, since the lines 
+  # they refer to may not have been kept
+  capture_limits = None
+  head_bytes = compiled_policy.execution.get("capture_head_bytes")
+  tail_bytes = compiled_policy.execution.get("capture_tail_bytes")
+  instance_mode = args.instances
+  if head_bytes is not None or tail_bytes is not None:
+    capture_limits = (head_bytes or 0, tail_bytes or 0)
+    instance_mode = "full"
+  matcher = wordlists.WordListMatcher(compiled_policy.word_lists, instance_mode, 
+    compiled_policy.execution.get("max_instances_per_category"))
+
+  # The streams are hashed as they are captured rather than re-read afterwards
+  stdout_hasher = utils.HashingSink()
+  stderr_hasher = utils.HashingSink()
+  stdout_sinks = [stdout_hasher]
+  stderr_sinks = [stderr_hasher]
+
+  # The command may be stopped early by a timeout set by the policy or, if the 
+  # policy sets a failure limit, once that limit is reached; for the latter 
+  # the streams are scanned as they are captured
+  abort = capture.Abort()
+  timeout = compiled_policy.execution.get("timeout_seconds")
+  kill_grace = compiled_policy.execution.get("kill_grace_seconds")
+  if kill_grace is None:
+    kill_grace = capture.KILL_GRACE
+  live_scanners = None
+  failure_limit = None
+  abort_after_failures = compiled_policy.execution.get("abort_after_failures")
+  if abort_after_failures:
+    failure_limit = wordlists.FailureLimit(abort_after_failures, abort)
+  if failure_limit is not None or capture_limits is not None:
+    # Bounded output is only bounded if its lines are too
+    max_line_bytes = capture_limits is not None and wordlists.MAX_LINE_BYTES or None
+    live_scanners = [wordlists.LiveScanSink(matcher, failure_limit, max_line_bytes), 
+      wordlists.LiveScanSink(matcher, failure_limit, max_line_bytes)]
+    stdout_sinks.append(live_scanners[0])
+    stderr_sinks.append(live_scanners[1])
 
-
-def exec_cmd(cmd_string, input_filepath):
+  # Execute the given command and fill the metadata dict
+  resource_usage = dict()
+  dropped_bytes = dict()
+  with run_profile.phase("exec_cmd") as phase:
+    return_code = exec_cmd(cmd_string, input_filepath, stdout_filepath, stderr_filepath, 
+      stdout_sinks, stderr_sinks, abort, timeout, kill_grace, resource_usage, 
+      capture_limits, dropped_bytes, timeout is not None or failure_limit is not None)
+    phase["bytes"] = stdout_hasher.bytes_written + stderr_hasher.bytes_written
+  with run_profile.phase("process_app_data") as phase:
+    process_app_data(metadata, cmd_string, input_filepath, stdout_filepath, stderr_filepath, 
+      return_code, stdout_hasher, stderr_hasher, output_dir, artifacts)
+    phase["bytes"] = input_filepath and os.path.getsize(input_filepath) or 0
+  metadata['application']['terminated_early'] = abort.reason is not None
+  metadata['application']['termination_reason'] = abort.reason
+  metadata['application']['timed_out'] = abort.timed_out
+  metadata['application']['timeout_seconds'] = timeout
+  metadata['application']['resource_usage'] = resource_usage or None
+  metadata['application']['bounded_capture'] = None
+  if capture_limits is not None:
+    metadata['application']['bounded_capture'] = get_bounded_capture_data(capture_limits, 
+      dropped_bytes, stdout_filepath, stderr_filepath)
+  if run_cache is not None:
+    metadata['application']['cache_hit'] = False
+  if args.product:
+    with run_profile.phase("snapshot_products") as phase:
+      metadata['products'] = take_snapshot(args.product, stat_index, args.hash_jobs, 
+        snapshot_exclude, phase)
+      if stat_index is not None:
+        stat_index.save()
+  with run_profile.phase("scan_wordlists") as phase:
+    if live_scanners:
+      # The streams were scanned while they were captured
+      for scanner in live_scanners:
+        scanner.close()
+      metadata["output_data"] = live_scanners[0].results
+      metadata["err_data"] = live_scanners[1].results
+      phase["bytes"] = 0
+    elif args.scan_jobs > 1:
+      # Scan both files together, in chunks, across a pool of processes
+      metadata["output_data"], metadata["err_data"] = matcher.scan_files_parallel(
+        [stdout_filepath, stderr_filepath], args.scan_jobs)
+      phase["bytes"] = stdout_hasher.bytes_written + stderr_hasher.bytes_written
+    else:
+      check_file_against_wordlists(metadata, matcher, stdout_filepath, "output_data")
+      check_file_against_wordlists(metadata, matcher, stderr_filepath, "err_data")
+      phase["bytes"] = stdout_hasher.bytes_written + stderr_hasher.bytes_written
+
+  # The output-dependent constraints are checked against the scan results
+  with run_profile.phase("check_post_run"):
+    compiled_policy.check_post_run(metadata)
+
+  # Only now that the output has been scanned is it moved into the store, and 
+  # the metadata pointed at the stored blobs
+  if artifacts is not None:
+    with run_profile.phase("store_artifacts"):
+      bounded_capture = metadata['application']['bounded_capture'] or dict()
+      for path_key, hashes_key in [("output_path", "output_hashes"), ("err_path", "err_hashes")]:
+        # A file which was cut short is stored by the digest of what it holds
+        hashes = bounded_capture.get(hashes_key.replace("_hashes", "_stored_hashes"))
+        if hashes is None:
+          hashes = metadata['application'][hashes_key]
+        captured_filepath = metadata['application'][path_key]
+        metadata['application'][path_key] = store_artifact(artifacts, captured_filepath, 
+          hashes['sha256'], captured_filepath, True)
+
+  # Generate the signed JSON, using the signer daemon if it is running
+  with run_profile.phase("sign_json"):
+    import signerd
+    signed_metadata = signerd.sign_json(metadata)
+  metadata_name = os.path.join(output_dir, "metadata")
+  with run_profile.phase("gen_json") as phase:
+    utils.gen_json(signed_metadata, metadata_name)
+    phase["bytes"] = os.path.getsize(metadata_name + ".json")
+
+  # Only a run which was not cut short is worth repeating from the cache
+  if run_cache is not None and abort.reason is None:
+    run_cache.put(run_key, metadata_name + ".json", {"in": os.path.join(output_dir, "in"), 
+      "out": stdout_filepath, "err": stderr_filepath}, {"output_dir": output_dir})
+
+
+def exec_cmd(cmd_string, input_filepath, stdout_filepath, stderr_filepath, 
+    stdout_sinks=(), stderr_sinks=(), abort=None, timeout=None, 
+    kill_grace=None, resource_usage=None, capture_limits=None, dropped_bytes=None,
+    process_group=False):
   """
   <Purpose>
-    Execute the given command and redirect input (as necessary).
+    Execute the given command and redirect input (as necessary). The command's
+    stdout and stderr are streamed to the given files in bounded chunks as they
+    are produced, so the output is never held in memory as a whole.
 
   <Arguments>
     cmd_string:
@@ -111,24 +372,109 @@ def exec_cmd(cmd_string, input_filepath):
       The filepath of the file from which stdin should be read; will be None if 
       no explicit file specified
 
+    stdout_filepath:
+      The filepath of the file to which stdout should be written.
+
+    stderr_filepath:
+      The filepath of the file to which stderr should be written.
+
+    stdout_sinks:
+      Additional sinks (e.g. utils.HashingSink) which stdout is fed to as it is 
+      captured.
+
+    stderr_sinks:
+      Additional sinks which stderr is fed to as it is captured.
+
+    abort:
+      An optional capture.Abort through which the sinks may terminate the 
+      command before it finishes, and which records whether it timed out.
+
+    timeout:
+      The number of seconds the command may run for before it is terminated, 
+      or None for no limit.
+
+    kill_grace:
+      The number of seconds the command is given to exit after being 
+      terminated before it is killed; capture.KILL_GRACE by default.
+
+    resource_usage:
+      An optional dictionary which is filled with the command's wall time, 
+      CPU time, peak memory, block I/O and context switches (see 
+      capture.RUSAGE_FIELDS).
+
+    capture_limits:
+      An optional (head_bytes, tail_bytes) tuple; if given, only the first 
+      and last bytes of each stream are kept in its file (see 
+      capture.HeadTailSink), though the sinks still see all of it.
+
+    dropped_bytes:
+      An optional dictionary which is filled with the number of bytes of 
+      "out" and "err" which were not kept.
+
+    process_group:
+      Whether the command is run in its own process group, so that 
+      terminating it early (see 'abort' and 'timeout') reaches everything the 
+      shell started. Such a group cannot read from the terminal, so its stdin 
+      is /dev/null unless 'input_filepath' is given. Otherwise the command 
+      stays in toto's group and inherits its stdin and terminal signals.
+
   <Exceptions>
-    TBD.
+    OSError or IOError, if the command's output could not be captured.
 
   <Return>
-    A list of strings: [stdout, stderr, return_code].
+    An integer representing the return code from the command that was run.
   """
 
+  import subprocess
+  import capture
+  if kill_grace is None:
+    kill_grace = capture.KILL_GRACE
+
+  # A previous run's files may be hardlinked into an artifact store, so they 
+  # are replaced rather than truncated
+  for filepath in [stdout_filepath, stderr_filepath]:
+    if os.path.lexists(filepath):
+      os.remove(filepath)
+
+  # A background process group reading the terminal would be stopped by 
+  # SIGTTIN, so only a command which may be terminated early gets its own 
+  # group, with stdin away from the terminal
+  input_fileobj = None
   if input_filepath:
     input_fileobj = open(input_filepath,"r")
+  elif process_group:
+    input_fileobj = open(os.devnull, "r")
+  preexec_fn = process_group and os.setpgrp or None
+  try:
     cmd_process = subprocess.Popen(cmd_string, stdin=input_fileobj, stdout=subprocess.PIPE, 
-      stderr=subprocess.PIPE, shell=True)
-    input_fileobj.close()
-  else:
-    cmd_process = subprocess.Popen(cmd_string, stdout=subprocess.PIPE, 
-      stderr=subprocess.PIPE, shell=True)
-  stdout_stderr = cmd_process.communicate()
-  process_attributes = [stdout_stderr[0], stdout_stderr[1], cmd_process.returncode]
-  return process_attributes
+      stderr=subprocess.PIPE, shell=True, preexec_fn=preexec_fn)
+  finally:
+    if input_fileobj is not None:
+      input_fileobj.close()
+
+  stdout_fileobj = open(stdout_filepath, "wb")
+  stderr_fileobj = open(stderr_filepath, "wb")
+  stdout_writer = stdout_fileobj
+  stderr_writer = stderr_fileobj
+  if capture_limits is not None:
+    stdout_writer = capture.HeadTailSink(stdout_fileobj, *capture_limits)
+    stderr_writer = capture.HeadTailSink(stderr_fileobj, *capture_limits)
+  try:
+    return_code = capture.capture_process(cmd_process, 
+      [stdout_writer] + list(stdout_sinks), [stderr_writer] + list(stderr_sinks), 
+      abort=abort, timeout=timeout, kill_grace=kill_grace, resource_usage=resource_usage)
+  finally:
+    try:
+      if capture_limits is not None:
+        stdout_writer.close()
+        stderr_writer.close()
+    finally:
+      stdout_fileobj.close()
+      stderr_fileobj.close()
+  if capture_limits is not None and dropped_bytes is not None:
+    dropped_bytes["out"] = stdout_writer.dropped_bytes
+    dropped_bytes["err"] = stderr_writer.dropped_bytes
+  return return_code
 
 
 def process_env_vars(metadata):
@@ -162,14 +508,17 @@ def process_env_vars(metadata):
   metadata['variables']['toto_tool_verion'] = TOTO_TOOL_VERSION
 
   # We use the getpass module here for Unix and Windows compatibility 
+  import getpass
   metadata['variables']['user'] = getpass.getuser()
   metadata['variables']['curr_working_dir'] = os.getcwd()
 
 
-def process_app_data(metadata, cmd_string, input_filepath, stdout, stderr, return_code):
+def process_app_data(metadata, cmd_string, input_filepath, stdout_filepath, stderr_filepath, 
+    return_code, stdout_hasher, stderr_hasher, output_dir=None, artifacts=None):
   """
   <Purpose>
-    Execute the given command and redirect input (as necessary).
+    Record the command, its return code and the hashes and filepaths of its
+    captured I/O.
 
   <Arguments>
     metadata:
@@ -183,15 +532,29 @@ def process_app_data(metadata, cmd_string, input_filepath, stdout, stderr, retur
       The filepath of the file from which stdin should be read; will be None if 
       no explicit file specified
 
-    stdout:
-      A string representing the stdout from the command that was run.
+    stdout_filepath:
+      The filepath of the file holding the stdout from the command that was run.
 
-    stderr:
-      A string representing the stderr from the command that was run.
+    stderr_filepath:
+      The filepath of the file holding the stderr from the command that was run.
 
     return_code:
       An integer representing the return code from the command that was run.
 
+    stdout_hasher:
+      The utils.HashingSink which stdout was fed to while it was captured.
+
+    stderr_hasher:
+      The utils.HashingSink which stderr was fed to while it was captured.
+
+    output_dir:
+      The directory to which the input is copied; defaults to the current 
+      directory.
+
+    artifacts:
+      An optional store.ArtifactStore in which the input is kept instead; the 
+      recorded input path then points into the store.
+
   <Exceptions>
     TBD.
 
@@ -202,191 +565,348 @@ def process_app_data(metadata, cmd_string, input_filepath, stdout, stderr, retur
   metadata['application']['command'] = cmd_string
   metadata['application']['return_code'] = return_code
 
-  cwd = os.getcwd()
+  if output_dir is None:
+    output_dir = os.getcwd()
 
-  # For the stdin, stdout and stderr, write each to a file, hash it, and store 
-  # the hash and filepath to the metadata
+  # For the stdin, copy it to a file, hashing it in the same pass; then store 
+  # the hashes and filepath of each of the stdin, stdout and stderr files to 
+  # the metadata. The "_hash" fields keep the MD5 digest for compatibility.
+  # With an artifact store the input is hashed first, so that an input which 
+  # is stored already is not copied at all.
   if input_filepath:
-    saved_input_path = os.path.join(cwd,"in")
-    shutil.copyfile(input_filepath, saved_input_path)
-    metadata['application']['input_hash'] = utils.get_hash(saved_input_path)
+    saved_input_path = os.path.join(output_dir,"in")
+    if os.path.lexists(saved_input_path):
+      os.remove(saved_input_path)
+    if artifacts is not None:
+      input_hashes = utils.get_hashes(input_filepath)
+      saved_input_path = store_artifact(artifacts, input_filepath, input_hashes['sha256'], 
+        saved_input_path, False)
+    else:
+      input_hashes = utils.copy_and_hash(input_filepath, saved_input_path)
+    metadata['application']['input_hash'] = input_hashes['md5']
+    metadata['application']['input_hashes'] = input_hashes
     metadata['application']['input_path'] = saved_input_path
   else:
     metadata['application']['input_hash'] = None
+    metadata['application']['input_hashes'] = None
     metadata['application']['input_path'] = None
 
-  saved_output_path = os.path.join(cwd,"out")
-  utils.write_to_file(stdout, saved_output_path)
-  metadata['application']['output_hash'] = utils.get_hash(saved_output_path)
-  metadata['application']['output_path'] = saved_output_path
-  saved_err_path = os.path.join(cwd,"err")
-  utils.write_to_file(stderr, saved_err_path)
-  metadata['application']['err_hash'] = utils.get_hash(saved_err_path)
-  metadata['application']['err_path'] = saved_err_path
+  metadata['application']['output_hash'] = stdout_hasher.hexdigest('md5')
+  metadata['application']['output_hashes'] = stdout_hasher.hexdigests()
+  metadata['application']['output_path'] = stdout_filepath
+  metadata['application']['output_size'] = stdout_hasher.bytes_written
+  metadata['application']['err_hash'] = stderr_hasher.hexdigest('md5')
+  metadata['application']['err_hashes'] = stderr_hasher.hexdigests()
+  metadata['application']['err_path'] = stderr_filepath
+  metadata['application']['err_size'] = stderr_hasher.bytes_written
 
 
-def check_file_against_wordlists(metadata_dict, word_lists, filename, metadata_category):
+def get_bounded_capture_data(capture_limits, dropped_bytes, stdout_filepath, stderr_filepath):
   """
   <Purpose>
-    Reads through a specified output file, searches for related terms 
-    corresponding to the categories of failure, warning and success, and records
-    the lines and line numbers in which these terms appear.
+    Describes what was kept of the streams of a run whose capture was 
+    bounded: the limits, the number of bytes of each stream which were 
+    dropped and, for a file which was cut short, the hashes of what it holds 
+    (the "output_hashes" and "err_hashes" still cover the whole stream).
 
   <Arguments>
-    metadata_dict:
-      The dictionary in which we are storing our metadata.
+    capture_limits:
+      The (head_bytes, tail_bytes) tuple the streams were captured with.
 
-    word_lists:
-      A dictionary storing the wordlists for success, failure and warning.
+    dropped_bytes:
+      The dictionary filled by exec_cmd().
 
-    filename:
-      A string for the path to the outfile we are parsing.
+    stdout_filepath:
+      The filepath of the file holding what was kept of stdout.
 
-    metadata_category:
-      A string for the upper level key to be used to store this data.
+    stderr_filepath:
+      The filepath of the file holding what was kept of stderr.
 
   <Exceptions>
-    TBD.
+    IOError, if a file which was cut short cannot be read.
 
   <Return>
-    None.
+    A dictionary for the "bounded_capture" field of the "application" 
+    section.
   """
 
-  # The wordlists used to check got success, failure and warnings
-  success_words = word_lists["success"]
-  failure_words = word_lists["failure"]
-  warning_words = word_lists["warning"]
-
-  # Setup the dictionary with lists for success/failure/warning occurences
-  metadata_dict[metadata_category] = dict()
-  metadata_dict[metadata_category]["success"] = dict()
-  metadata_dict[metadata_category]["failure"] = dict()
-  metadata_dict[metadata_category]["warning"] = dict()
-  metadata_dict[metadata_category]["success"]["instances"] = list()
-  metadata_dict[metadata_category]["failure"]["instances"] = list()
-  metadata_dict[metadata_category]["warning"]["instances"] = list()
-
-  # Setup three variables to point to the lists and for clarity 
-  success_list = metadata_dict[metadata_category]["success"]["instances"]
-  failure_list = metadata_dict[metadata_category]["failure"]["instances"]
-  warning_list = metadata_dict[metadata_category]["warning"]["instances"]
-
-  # Read through the file and add lines to the corresponding lists
-  fileobj = open(filename, "r")
-  # Straightforward regex to remove non-alpha characters
-  regexobj = re.compile('[^a-zA-Z]')
-  line_num = 0
-  success_count = 0
-  failure_count = 0
-  warning_count = 0
-  for line in fileobj:
-    line_num += 1
-    line_lower = line.lower()
-    line_lower_alpha = regexobj.sub(" ", line_lower)
-    tokens = line_lower_alpha.split()
-    dict_to_add = dict()
-    dict_to_add["line"] = line
-    dict_to_add["line_number"] = line_num
-    for token in tokens:
-      if any(word == token for word in success_words):
-        success_list.append(dict_to_add)
-        success_count += 1
-      elif any(word == token for word in failure_words):
-        failure_list.append(dict_to_add)
-        failure_count += 1
-      elif any(word == token for word in warning_words):
-        warning_list.append(dict_to_add)
-        warning_count += 1
-
-  # Add the counts to the dictionary
-  metadata_dict[metadata_category]["success"]["count"] = success_count
-  metadata_dict[metadata_category]["failure"]["count"] = failure_count
-  metadata_dict[metadata_category]["warning"]["count"] = warning_count
-
-  fileobj.close()
+  data = dict()
+  data['head_bytes'], data['tail_bytes'] = capture_limits
+  for prefix, stream, filepath in [("output", "out", stdout_filepath), ("err", "err", stderr_filepath)]:
+    data[prefix + '_dropped_bytes'] = dropped_bytes.get(stream, 0)
+    data[prefix + '_stored_hashes'] = None
+    if data[prefix + '_dropped_bytes']:
+      data[prefix + '_stored_hashes'] = utils.get_hashes(filepath)
+  return data
 
 
-def get_command_line_args():
+def store_artifact(artifacts, filepath, digest, link_filepath, move):
   """
   <Purpose>
-    Uses the argparse module to parse, process and return the command line 
-    arguments.
+    Adds a file to the artifact store and, if it is stored uncompressed, 
+    hardlinks it back into the run's output directory so that the usual in, 
+    out and err files are still there.
+
+  <Arguments>
+    artifacts:
+      The store.ArtifactStore.
+
+    filepath:
+      The path of the file to be stored.
+
+    digest:
+      The SHA-256 digest of the file.
+
+    link_filepath:
+      The path in the output directory at which the file should appear.
+
+    move:
+      Whether the file is moved into the store rather than copied.
+
+  <Exceptions>
+    IOError or OSError, if the file cannot be stored.
+
+  <Return>
+    The path of the stored blob.
+  """
+
+  import store
+  blob_path = artifacts.add_file(filepath, digest, move)
+  if not blob_path.endswith(store.COMPRESSED_SUFFIX):
+    artifacts.link_to(blob_path, link_filepath)
+  return blob_path
+
+
+def take_snapshot(paths, stat_index, hash_jobs, exclude_paths, phase):
+  """
+  <Purpose>
+    Hashes the files at or under the declared material or product paths, for 
+    the "materials" or "products" section of the metadata.
 
   <Arguments>
+    paths:
+      A list of the declared file and directory paths.
+
+    stat_index:
+      A materials.StatIndex of earlier digests, or None.
+
+    hash_jobs:
+      The number of hashing threads, or None for the number of CPUs.
+
+    exclude_paths:
+      A list of paths to be skipped.
+
+    phase:
+      The profiler record of the phase, in which the bytes hashed are noted.
+
+  <Exceptions>
     None.
 
+  <Return>
+    A dictionary mapping each file's path to its digests.
+  """
+
+  import materials
+  stats = dict()
+  snapshot = materials.snapshot(paths, stat_index, hash_jobs, exclude_paths, stats)
+  phase["bytes"] = stats["hashed_bytes"]
+  return snapshot
+
+
+def get_run_cache_fields(args, metadata, policy_filepath):
+  """
+  <Purpose>
+    Collects the values which determine the result of a run, from which its 
+    run cache key is computed: the command, the digests of its input, of the 
+    policy file and of any declared input files, the host details (other than 
+    the timestamp) and the options which change the metadata.
+
+  <Arguments>
+    args:
+      The command line arguments, as returned by get_command_line_args().
+
+    metadata:
+      The metadata dictionary, with its "variables" filled.
+
+    policy_filepath:
+      The path of the policy file.
+
   <Exceptions>
-    TBD.
+    IOError, if the input or policy file cannot be read.
 
   <Return>
-    An object representing the command line arguments.
+    A dictionary of the values.
   """
 
-  parser = argparse.ArgumentParser(prog='main.py', description='Captures the given build/test command\'s I/O and relevant system details.')
-  parser.add_argument('--version', action='version', version=TOTO_TOOL_VERSION)
-  parser.add_argument('--input', metavar='FILEPATH', help='the path to the desired input file to be routed through stdin')
-  parser.add_argument('--policy', metavar='FILENAME', help='the path to the desired file specifying build/test policy')
-  parser.add_argument('command', metavar='COMMAND', type=str, help='the bash command to execute the build or test')
+  def file_digest(filepath):
+    if not os.path.isfile(filepath):
+      return None
+    return utils.get_hashes(filepath, ("sha256",))["sha256"]
 
-  return parser.parse_args()
+  variables = dict(metadata['variables'])
+  del variables['timestamp']
+
+  declared_inputs = dict()
+  for filepath in args.cache_input or []:
+    declared_inputs[os.path.abspath(filepath)] = file_digest(filepath)
+
+  return {
+    "command": args.command,
+    "input": args.input and utils.get_hashes(args.input, ("sha256",))["sha256"],
+    "policy": utils.get_hashes(policy_filepath, ("sha256",))["sha256"],
+    "declared_inputs": declared_inputs,
+    "materials": metadata.get('materials'),
+    "variables": variables,
+    "options": {"instances": args.instances, "store_compress": args.store_compress,
+      "store": args.store and os.path.abspath(args.store)}
+  }
+
+
+def restore_cached_run(entry_dir, info, metadata, output_dir, resign):
+  """
+  <Purpose>
+    Reproduces a cached run in the output directory: its read-only in, out and 
+    err files are linked back in (or copied, if the cache is on another 
+    filesystem) and its signed metadata is written as metadata.json. If 
+    the run was cached from another output directory, or 'resign' is set, the 
+    metadata is updated (paths, and timestamp if re-signing) and signed anew, 
+    with "cache_hit" set in its "application" section; otherwise the original 
+    signed metadata is returned unchanged.
+
+  <Arguments>
+    entry_dir:
+      The directory of the cache entry, as returned by runcache.RunCache.get().
+
+    info:
+      The information recorded with the entry.
+
+    metadata:
+      The metadata dictionary of this run, with its "variables" filled.
+
+    output_dir:
+      The directory to which in, out, err and metadata.json are written.
+
+    resign:
+      Whether the metadata is re-signed with this run's timestamp.
 
+  <Exceptions>
+    IOError or OSError, if the cached files cannot be restored.
+
+  <Return>
+    None.
+  """
 
-def process_policy_file(metadata_dict, policy_filepath):
+  import runcache
+  import shutil
+  fileobj = open(os.path.join(entry_dir, runcache.ENTRY_METADATA_FILENAME))
+  try:
+    cached_metadata = json.load(fileobj)
+  finally:
+    fileobj.close()
+
+  # Paths into the original output directory now refer to this one; paths into 
+  # an artifact store are still valid
+  changed = False
+  for path_key, name in [("input_path", "in"), ("output_path", "out"), ("err_path", "err")]:
+    cached_filepath = os.path.join(entry_dir, name)
+    filepath = os.path.join(output_dir, name)
+    if os.path.lexists(filepath):
+      os.remove(filepath)
+    if os.path.isfile(cached_filepath):
+      runcache.link_or_copy(cached_filepath, filepath)
+    if cached_metadata['application'].get(path_key) == os.path.join(info["output_dir"], name):
+      changed = changed or filepath != cached_metadata['application'][path_key]
+      cached_metadata['application'][path_key] = filepath
+
+  metadata_filepath = os.path.join(output_dir, "metadata.json")
+  if not changed and not resign:
+    if os.path.lexists(metadata_filepath):
+      os.remove(metadata_filepath)
+    shutil.copyfile(os.path.join(entry_dir, runcache.ENTRY_METADATA_FILENAME), metadata_filepath)
+    return
+
+  # The signature covers everything but the fields it adds
+  del cached_metadata['signed']
+  del cached_metadata['signatures']
+  cached_metadata['application']['cache_hit'] = True
+  if resign:
+    cached_metadata['variables']['timestamp'] = metadata['variables']['timestamp']
+
+  import signerd
+  utils.gen_json(signerd.sign_json(cached_metadata), os.path.join(output_dir, "metadata"))
+
+
+def check_file_against_wordlists(metadata_dict, matcher, filename, metadata_category):
   """
   <Purpose>
-    Reads in the policy file, converts it to a dictionary and also checks system
-    data against constraints from the policy file.
+    Reads through a specified output file, searches for related terms 
+    corresponding to the categories of failure, warning and success, and records
+    the lines and line numbers in which these terms appear.
 
   <Arguments>
     metadata_dict:
-      The dictionary representing the metadata.
+      The dictionary in which we are storing our metadata.
 
-    policy_filepath:
-      The string representing the path to the policy file.
+    matcher:
+      A wordlists.WordListMatcher compiled from the wordlists for success, 
+      failure and warning.
+
+    filename:
+      A string for the path to the outfile we are parsing.
+
+    metadata_category:
+      A string for the upper level key to be used to store this data.
 
   <Exceptions>
     TBD.
 
   <Return>
-    The dictionary representing the data in the policy file.
+    None.
   """
 
-  # Load the JSON into a dictionary
-  policy_dict = tuf.util.load_json_file(policy_filepath)
-
-  # Check the constraints
-  if policy_dict['constraints']['return_code']:
-    if metadata_dict['variables']['return_code'] != policy_dict['constraints']['return_code']:
-      raise PolicyConstraintException("ERROR: constraint on return_code not met; expected - \"" + policy_dict['constraints']['return_code'] + "\", actual - \"" + metadata_dict['variables']['return_code'] + "\"")
-  if policy_dict['constraints']['cpu_arch']:
-    if metadata_dict['variables']['cpu_arch'] != policy_dict['constraints']['cpu_arch']:
-      raise PolicyConstraintException("ERROR: constraint on cpu_arch not met; expected - \"" + policy_dict['constraints']['cpu_arch'] + "\", actual - \"" + metadata_dict['variables']['cpu_arch'] + "\"")
-  if policy_dict['constraints']['os']['kernel']:
-    if metadata_dict['variables']['os']['kernel'] != policy_dict['constraints']['os']['kernel']:
-      raise PolicyConstraintException("ERROR: constraint on os-kernel not met; expected - \"" + policy_dict['constraints']['os']['kernel'] + "\", actual - \"" + metadata_dict['variables']['os']['kernel'] + "\"")
-  if policy_dict['constraints']['os']['release']:
-    if metadata_dict['variables']['os']['release'] != policy_dict['constraints']['os']['release']:
-      raise PolicyConstraintException("ERROR: constraint on os-release not met; expected - \"" + policy_dict['constraints']['os']['release'] + "\", actual - \"" + metadata_dict['variables']['os']['release'] + "\"")
-  if policy_dict['constraints']['os']['version']:
-    if metadata_dict['variables']['os']['version'] != policy_dict['constraints']['os']['version']:
-      raise PolicyConstraintException("ERROR: constraint on os-version not met; expected - \"" + policy_dict['constraints']['os']['version'] + "\", actual - \"" + metadata_dict['variables']['os']['version'] + "\"")
+  metadata_dict[metadata_category] = matcher.scan_file(filename)
 
-  for flag in policy_dict['constraints']['command_flags']:
-    if flag not in metadata_dict['application']['command']:
-      raise PolicyConstraintException("ERROR: constraint on flags not met; flag \"" + flag + "\" not found")
 
-  return policy_dict
+def get_command_line_args():
+  """
+  <Purpose>
+    Uses the argparse module to parse, process and return the command line 
+    arguments.
 
+  <Arguments>
+    None.
 
-class PolicyConstraintException(Exception):
-  """This exception indicates that a constraint specified in the policy file was not met"""
+  <Exceptions>
+    TBD.
 
-  def __init__(self, value):
-    self.value = value
+  <Return>
+    An object representing the command line arguments.
+  """
 
+  parser = argparse.ArgumentParser(prog='main.py', description='Captures the given build/test command\'s I/O and relevant system details.')
+  parser.add_argument('--version', action='version', version=TOTO_TOOL_VERSION)
+  parser.add_argument('--input', metavar='FILEPATH', help='the path to the desired input file to be routed through stdin')
+  parser.add_argument('--policy', metavar='FILENAME', help='the path to the desired file specifying build/test policy')
+  parser.add_argument('--scan-jobs', metavar='N', type=int, default=1, help='the number of processes used to scan the output against the word lists')
+  parser.add_argument('--instances', choices=wordlists.INSTANCE_MODES, default='full', help='how word-list matches are recorded: the full text of each matching line, or a reference to it in the out/err file')
+  parser.add_argument('--output-dir', metavar='DIR', help='the directory in which in, out, err and metadata.json are written; defaults to the current directory')
+  parser.add_argument('--store', metavar='DIR', help='keep in, out and err in a content-addressed store at DIR, shared between runs, and record their paths in it')
+  parser.add_argument('--store-compress', action='store_true', help='gzip-compress files newly added to the store')
+  parser.add_argument('--material', metavar='PATH', action='append', help='a file or directory the command consumes, whose files are hashed into the "materials" section before it runs; may be repeated')
+  parser.add_argument('--product', metavar='PATH', action='append', help='a file or directory the command produces, whose files are hashed into the "products" section after it runs; may be repeated')
+  parser.add_argument('--hash-jobs', metavar='N', type=int, help='the number of threads hashing materials and products; default is the number of CPUs')
+  parser.add_argument('--stat-index', metavar='FILEPATH', help='an index of file digests by path, inode, size and mtime, kept between runs so unchanged materials and products are not hashed again')
+  parser.add_argument('--cache', metavar='DIR', help='reuse the metadata of an earlier identical run from the run cache at DIR instead of running the command, and cache this run otherwise')
+  parser.add_argument('--cache-input', metavar='FILEPATH', action='append', help='a file the command reads, whose contents are part of the run cache key; may be repeated')
+  parser.add_argument('--cache-max-bytes', metavar='N', type=int, help='the size to which the run cache is limited by evicting the least recently used runs; default 1 GiB')
+  parser.add_argument('--cache-resign', action='store_true', help='re-sign metadata reused from the run cache with a fresh timestamp')
+  parser.add_argument('--profile', action='store_true', help='time each phase of the run and report it on stderr')
+  parser.add_argument('--profile-output', metavar='FILE', help='write the profile to FILE as JSON instead; implies --profile')
+  parser.add_argument('--profile-phase', metavar='PHASE', choices=PROFILE_PHASES, help='also run the given phase under cProfile; implies --profile; one of ' + ', '.join(PROFILE_PHASES))
+  parser.add_argument('command', metavar='COMMAND', type=str, help='the bash command to execute the build or test')
 
-  def __str__(self):
-    return repr(self.value)
+  return parser.parse_args()
 
 
-main()
+if __name__ == '__main__':
+  main()
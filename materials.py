@@ -0,0 +1,340 @@
+"""
+<Program Name>
+  materials.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Records the files a command consumes (its materials) and produces (its
+  products). snapshot() walks the declared files and directories and returns
+  the SHA-256 digest of every file in them, in the form recorded in the
+  "materials" and "products" sections of metadata.json:
+
+    {"src/main.cpp": {"sha256": "..."}, ...}
+
+  Source trees can hold hundreds of thousands of files, so files are hashed
+  across a pool of threads (hashlib releases the GIL while it hashes), and a
+  StatIndex kept between runs maps each file's (path, inode, size, mtime) to
+  its digest, so that a file which has not changed since it was last hashed
+  is not read again. For example:
+
+    index = StatIndex("/var/toto/stat-index.json")
+    materials = snapshot(["src"], index)
+    index.save()
+"""
+
+import os
+import json
+import time
+import errno
+import tempfile
+import utils
+
+# The digest recorded for each file
+SNAPSHOT_ALGORITHM = "sha256"
+
+# The number of files handed to a hashing thread at a time
+HASH_BATCH_SIZE = 32
+
+# A file modified this recently (in seconds) may be modified again without
+# its mtime changing, so its digest is not kept in the index
+RACY_SECONDS = 2
+
+
+class StatIndex(object):
+  """
+  A persistent map from a file's path, inode, size and modification time to
+  its digest, loaded from and saved to a JSON file. See the module docstring.
+  """
+
+  def __init__(self, filepath):
+    self.filepath = os.path.abspath(filepath)
+    self.entries = dict()
+    try:
+      fileobj = open(self.filepath, "r")
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return
+    try:
+      try:
+        self.entries = json.load(fileobj)["entries"]
+      except (ValueError, KeyError, TypeError):
+        # A damaged index only costs a rehash of every file
+        self.entries = dict()
+    finally:
+      fileobj.close()
+
+
+  def lookup(self, path, stat_result):
+    """
+    <Purpose>
+      Returns the digest recorded for a file, if the file has not changed
+      since.
+
+    <Arguments>
+      path:
+        The absolute path of the file.
+
+      stat_result:
+        The result of os.stat() on the file.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      The hex digest, or None if the file is not indexed or has changed.
+    """
+
+    entry = self.entries.get(path)
+    if entry is None or entry[:3] != _stat_key(stat_result):
+      return None
+    return entry[3]
+
+
+  def update(self, path, stat_result, digest, now=None):
+    """
+    <Purpose>
+      Records the digest of a file, unless it was modified too recently for
+      its mtime to tell whether it changes again.
+
+    <Arguments>
+      path:
+        The absolute path of the file.
+
+      stat_result:
+        The result of os.stat() on the file, taken before it was hashed.
+
+      digest:
+        The hex digest of the file.
+
+      now:
+        The current time; defaults to time.time().
+
+    <Exceptions>
+      None.
+
+    <Return>
+      None.
+    """
+
+    if now is None:
+      now = time.time()
+    if stat_result.st_mtime >= now - RACY_SECONDS:
+      self.entries.pop(path, None)
+    else:
+      self.entries[path] = _stat_key(stat_result) + [digest]
+
+
+  def prune(self, root, seen_paths):
+    """
+    <Purpose>
+      Forgets the files under a directory which were not seen when it was
+      last walked (i.e. which have been removed), so the index does not grow
+      without bound.
+
+    <Arguments>
+      root:
+        The absolute path of the directory.
+
+      seen_paths:
+        A set of the absolute paths of the files found under it.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      None.
+    """
+
+    prefix = os.path.join(root, "")
+    for path in list(self.entries):
+      if path.startswith(prefix) and path not in seen_paths:
+        del self.entries[path]
+
+
+  def save(self):
+    """
+    <Purpose>
+      Writes the index to its file, through a temporary file renamed into
+      place so that concurrent runs never read a partial index.
+
+    <Arguments>
+      None.
+
+    <Exceptions>
+      IOError or OSError, if the index cannot be written.
+
+    <Return>
+      None.
+    """
+
+    directory = os.path.dirname(self.filepath)
+    handle, temp_filepath = tempfile.mkstemp(dir=directory, prefix=".stat-index")
+    try:
+      fileobj = os.fdopen(handle, "w")
+      try:
+        json.dump({"entries": self.entries}, fileobj, separators=(",", ":"))
+      finally:
+        fileobj.close()
+      os.rename(temp_filepath, self.filepath)
+    finally:
+      if os.path.exists(temp_filepath):
+        os.remove(temp_filepath)
+
+
+def walk_files(root, exclude_paths=()):
+  """
+  <Purpose>
+    Lists the regular files at or under a path, following symbolic links to
+    files but not to directories.
+
+  <Arguments>
+    root:
+      The path of a file or directory.
+
+    exclude_paths:
+      A set of absolute paths of files and directories to be skipped.
+
+  <Exceptions>
+    None; files which cannot be listed are skipped.
+
+  <Return>
+    A generator of the paths of the files, relative to the current directory
+    if 'root' is.
+  """
+
+  if os.path.abspath(root) in exclude_paths:
+    return
+  if not os.path.isdir(root):
+    if os.path.isfile(root):
+      yield os.path.normpath(root)
+    return
+
+  for dirpath, dirnames, filenames in os.walk(root):
+    # Pruned in place, so that os.walk() does not descend into them
+    dirnames[:] = [dirname for dirname in sorted(dirnames)
+      if os.path.abspath(os.path.join(dirpath, dirname)) not in exclude_paths]
+    for filename in sorted(filenames):
+      path = os.path.normpath(os.path.join(dirpath, filename))
+      if os.path.abspath(path) not in exclude_paths and os.path.isfile(path):
+        yield path
+
+
+def snapshot(roots, index=None, jobs=None, exclude_paths=(), stats=None):
+  """
+  <Purpose>
+    Hashes every file at or under the given paths, reusing the digests in
+    the index for files which have not changed.
+
+  <Arguments>
+    roots:
+      A list of the paths of files and directories, e.g. as declared with
+      main.py's --material and --product options.
+
+    index:
+      An optional StatIndex, which is updated with the new digests (but not
+      saved).
+
+    jobs:
+      The number of threads hashing files; defaults to the number of CPUs.
+
+    exclude_paths:
+      A set of absolute paths of files and directories to be skipped (e.g.
+      toto's own output files).
+
+    stats:
+      An optional dictionary, filled with the number of "files" found, the
+      number of them "hashed" rather than found in the index and the
+      "hashed_bytes" read.
+
+  <Exceptions>
+    None; files which vanish or cannot be read while they are hashed are
+    left out.
+
+  <Return>
+    A dictionary mapping the path of each file to {"sha256": digest}.
+  """
+
+  exclude_paths = set(os.path.abspath(path) for path in exclude_paths)
+  digests = dict()
+  to_hash = []
+  for root in roots:
+    seen_paths = set()
+    for path in walk_files(root, exclude_paths):
+      abs_path = os.path.abspath(path)
+      seen_paths.add(abs_path)
+      try:
+        stat_result = os.stat(path)
+      except OSError:
+        continue
+      digest = index is not None and index.lookup(abs_path, stat_result) or None
+      if digest is None:
+        to_hash.append((path, abs_path, stat_result))
+      else:
+        digests[path] = digest
+    if index is not None and os.path.isdir(root):
+      index.prune(os.path.abspath(root), seen_paths)
+
+  if stats is not None:
+    stats["files"] = len(digests) + len(to_hash)
+    stats["hashed"] = len(to_hash)
+    stats["hashed_bytes"] = sum(stat_result.st_size for path, abs_path, stat_result in to_hash)
+
+  now = time.time()
+  for path, abs_path, stat_result, digest in _hash_files(to_hash, jobs):
+    if digest is None:
+      continue
+    digests[path] = digest
+    if index is not None:
+      index.update(abs_path, stat_result, digest, now)
+
+  return dict((path, {SNAPSHOT_ALGORITHM: digest}) for path, digest in digests.items())
+
+
+def _hash_files(to_hash, jobs):
+  # Yields each (path, abs_path, stat_result) in 'to_hash' with the file's
+  # digest appended, or None if it could not be read, hashing on a pool of
+  # threads unless there is too little to share out.
+  if jobs == 1 or len(to_hash) <= 1:
+    for item in to_hash:
+      yield _hash_file(item)
+    return
+
+  import multiprocessing.pool
+  pool = multiprocessing.pool.ThreadPool(jobs or multiprocessing.cpu_count())
+  try:
+    for result in pool.imap_unordered(_hash_file, to_hash, HASH_BATCH_SIZE):
+      yield result
+  finally:
+    pool.close()
+    pool.join()
+
+
+def _hash_file(item):
+  path, abs_path, stat_result = item
+  try:
+    digest = utils.get_hashes(path, (SNAPSHOT_ALGORITHM,))[SNAPSHOT_ALGORITHM]
+  except (IOError, OSError):
+    digest = None
+  return path, abs_path, stat_result, digest
+
+
+def _stat_key(stat_result):
+  # The modification time in nanoseconds where the platform records it, so
+  # that the key round-trips through JSON exactly
+  mtime = getattr(stat_result, "st_mtime_ns", None)
+  if mtime is None:
+    mtime = int(stat_result.st_mtime * 1000000000)
+  return [stat_result.st_ino, stat_result.st_size, mtime]
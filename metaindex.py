@@ -0,0 +1,512 @@
+"""
+<Program Name>
+  metaindex.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Indexes the metadata files of many runs in a local SQLite database, so that
+  questions such as "which runs on kernel release X had failures in err last
+  week" are answered by one indexed query rather than by parsing thousands of
+  JSON files. The "ingest" command loads the given metadata files, and every
+  metadata.json found under the given directories, into the index: the host
+  details from "variables", the command, return code, hashes and sizes from
+  "application" and the count of every word list category in out and err.
+  Only files which are new or have changed (by size and modification time)
+  since they were last ingested are read. With --verify, the signature of
+  each file is checked as it is ingested and the result kept in the index.
+
+  The "query" command lists the runs which match all of the given filters,
+  newest first. This script is called as below:
+
+  usage: metaindex.py [-h] [--db FILEPATH] {ingest,query} ...
+
+    metaindex.py ingest [--verify] [--jobs N] [--name FILENAME] PATH [PATH ...]
+
+    metaindex.py query [--since WHEN] [--until WHEN] [--kernel NAME]
+                       [--release RELEASE] [--host HOSTNAME] [--user USER]
+                       [--command TEXT] [--return-code N] [--failed]
+                       [--has STREAM:CATEGORY] [--verified] [--limit N]
+                       [--json]
+
+  For example:
+
+    python metaindex.py ingest /var/toto/runs
+    python metaindex.py query --release 6.8.0-45 --has err:failure --since 7d
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import datetime
+
+DEFAULT_DB_FILENAME = "toto-index.sqlite"
+
+DEFAULT_METADATA_FILENAME = "metadata.json"
+
+# The metadata sections holding the word list results, by their stream names
+STREAMS = [("out", "output_data"), ("err", "err_data")]
+
+# The units accepted in relative times (e.g. "7d" for seven days ago)
+RELATIVE_UNITS = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+
+SCHEMA = """
+  CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    file_size INTEGER,
+    file_mtime REAL,
+    verified INTEGER,
+    timestamp TEXT,
+    kernel TEXT,
+    release TEXT,
+    kernel_version TEXT,
+    hostname TEXT,
+    cpu_arch TEXT,
+    user TEXT,
+    curr_working_dir TEXT,
+    tool_version TEXT,
+    command TEXT,
+    return_code INTEGER,
+    terminated_early INTEGER,
+    timed_out INTEGER,
+    input_sha256 TEXT,
+    output_sha256 TEXT,
+    err_sha256 TEXT,
+    output_size INTEGER,
+    err_size INTEGER
+  );
+  CREATE TABLE IF NOT EXISTS counts (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    stream TEXT NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, stream, category)
+  );
+  CREATE INDEX IF NOT EXISTS runs_timestamp ON runs(timestamp);
+  CREATE INDEX IF NOT EXISTS runs_release ON runs(release, timestamp);
+  CREATE INDEX IF NOT EXISTS runs_hostname ON runs(hostname, timestamp);
+  CREATE INDEX IF NOT EXISTS counts_category ON counts(stream, category, count);
+"""
+
+# The columns of "runs" filled from a metadata document, in the order of
+# run_row()
+RUN_COLUMNS = ["path", "file_size", "file_mtime", "verified", "timestamp",
+  "kernel", "release", "kernel_version", "hostname", "cpu_arch", "user",
+  "curr_working_dir", "tool_version", "command", "return_code",
+  "terminated_early", "timed_out", "input_sha256", "output_sha256",
+  "err_sha256", "output_size", "err_size"]
+
+# The columns printed by the query command
+QUERY_COLUMNS = ["timestamp", "hostname", "release", "return_code", "command", "path"]
+
+
+class MetadataIndexError(Exception):
+  """
+  Raised when a query cannot be run, e.g. because a filter is malformed.
+  """
+
+  def __init__(self, value):
+    self.value = value
+
+  def __str__(self):
+    return repr(self.value)
+
+
+def open_index(db_filepath):
+  """
+  <Purpose>
+    Opens the index database, creating its tables if it is new.
+
+  <Arguments>
+    db_filepath:
+      The path of the SQLite database file.
+
+  <Exceptions>
+    sqlite3.Error, if the database cannot be opened.
+
+  <Return>
+    A sqlite3 connection.
+  """
+
+  connection = sqlite3.connect(db_filepath)
+  connection.execute("PRAGMA foreign_keys = ON")
+  connection.executescript(SCHEMA)
+  return connection
+
+
+def run_row(filepath, file_stat, metadata, verified=None):
+  """
+  <Purpose>
+    Extracts the indexed fields of a run from its metadata document.
+
+  <Arguments>
+    filepath:
+      The absolute path of the metadata file.
+
+    file_stat:
+      The result of os.stat() on the file.
+
+    metadata:
+      The parsed metadata document, signed or not.
+
+    verified:
+      True or False if its signature was checked, otherwise None.
+
+  <Exceptions>
+    None; missing fields are left empty.
+
+  <Return>
+    A tuple (row, counts), where 'row' holds the values of RUN_COLUMNS and
+    'counts' is a list of (stream, category, count) tuples.
+  """
+
+  variables = metadata.get("variables") or dict()
+  os_details = variables.get("os") or dict()
+  application = metadata.get("application") or dict()
+
+  def sha256(hashes_key):
+    hashes = application.get(hashes_key)
+    return hashes and hashes.get("sha256")
+
+  def flag(value):
+    if value is None:
+      return None
+    return int(bool(value))
+
+  row = (filepath, file_stat.st_size, file_stat.st_mtime, flag(verified),
+    variables.get("timestamp"), os_details.get("kernel"), os_details.get("release"),
+    os_details.get("version"), variables.get("hostname"), variables.get("cpu_arch"),
+    variables.get("user"), variables.get("curr_working_dir"), variables.get("toto_tool_verion"),
+    application.get("command"), application.get("return_code"),
+    flag(application.get("terminated_early")), flag(application.get("timed_out")),
+    sha256("input_hashes"), sha256("output_hashes"), sha256("err_hashes"),
+    application.get("output_size"), application.get("err_size"))
+
+  counts = []
+  for stream, section in STREAMS:
+    for category, results in sorted((metadata.get(section) or dict()).items()):
+      if isinstance(results, dict) and "count" in results:
+        counts.append((stream, category, results["count"]))
+  return row, counts
+
+
+def ingest(connection, paths, verify=False, jobs=None, metadata_filename=DEFAULT_METADATA_FILENAME):
+  """
+  <Purpose>
+    Loads the metadata files which are new or have changed since they were
+    last ingested into the index, in a single transaction.
+
+  <Arguments>
+    connection:
+      A connection returned by open_index().
+
+    paths:
+      A list of metadata files and directories to search for them.
+
+    verify:
+      Whether each file's signature is checked as it is ingested; files
+      which were ingested without being checked are then checked as well.
+
+    jobs:
+      The number of processes verifying signatures; defaults to the number
+      of CPUs.
+
+    metadata_filename:
+      The name of the metadata files to look for in directories.
+
+  <Exceptions>
+    None; files which cannot be read or parsed are reported in the result.
+
+  <Return>
+    A tuple (ingested, unchanged, errors), where 'errors' is a list of
+    (filepath, error) tuples.
+  """
+
+  import verify_batch
+  known = dict()
+  for path, file_size, file_mtime, verified in connection.execute(
+      "SELECT path, file_size, file_mtime, verified FROM runs"):
+    known[path] = (file_size, file_mtime, verified)
+
+  pending = []
+  unchanged = 0
+  for filepath in verify_batch.find_metadata_files(paths, metadata_filename):
+    filepath = os.path.abspath(filepath)
+    try:
+      file_stat = os.stat(filepath)
+    except OSError as e:
+      pending.append((filepath, None, str(e)))
+      continue
+    previous = known.get(filepath)
+    if previous is not None and previous[:2] == (file_stat.st_size, file_stat.st_mtime) \
+        and (not verify or previous[2] is not None):
+      unchanged += 1
+      continue
+    pending.append((filepath, file_stat, None))
+
+  verified = dict()
+  if verify:
+    for filepath, passed, error, seconds in verify_batch.verify_files(
+        [filepath for filepath, file_stat, error in pending if error is None], jobs):
+      verified[filepath] = passed
+
+  ingested = 0
+  errors = []
+  with connection:
+    for filepath, file_stat, error in pending:
+      if error is None:
+        try:
+          fileobj = open(filepath, "r")
+          try:
+            metadata = json.load(fileobj)
+          finally:
+            fileobj.close()
+        except (IOError, ValueError) as e:
+          error = str(e)
+      if error is not None:
+        errors.append((filepath, error))
+        continue
+
+      row, counts = run_row(filepath, file_stat, metadata, verified.get(filepath))
+      connection.execute("DELETE FROM runs WHERE path = ?", (filepath,))
+      run_id = connection.execute("INSERT INTO runs (" + ", ".join(RUN_COLUMNS) +
+        ") VALUES (" + ", ".join(["?"] * len(RUN_COLUMNS)) + ")", row).lastrowid
+      connection.executemany("INSERT INTO counts (run_id, stream, category, count) "
+        "VALUES (?, ?, ?, ?)", [(run_id,) + count for count in counts])
+      ingested += 1
+  return ingested, unchanged, errors
+
+
+def parse_time(value, now=None):
+  """
+  <Purpose>
+    Converts a --since or --until value into the form of the timestamps
+    recorded in metadata (UTC, "YYYY-MM-DD HH:MM:SS.ffffff"), which sort in
+    time order as text.
+
+  <Arguments>
+    value:
+      A time relative to now, as a number and a unit from RELATIVE_UNITS (e.g.
+      "7d", "12h"), or an absolute UTC date or date and time (e.g.
+      "2026-10-11" or "2026-10-11 08:00").
+
+    now:
+      The current UTC datetime; defaults to datetime.datetime.utcnow().
+
+  <Exceptions>
+    MetadataIndexError, if the value is not understood.
+
+  <Return>
+    A timestamp string.
+  """
+
+  unit = value[-1:]
+  if unit in RELATIVE_UNITS and value[:-1].isdigit():
+    if now is None:
+      now = datetime.datetime.utcnow()
+    then = now - datetime.timedelta(seconds=int(value[:-1]) * RELATIVE_UNITS[unit])
+    return str(then)
+
+  for time_format in ["%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]:
+    try:
+      return str(datetime.datetime.strptime(value, time_format))
+    except ValueError:
+      pass
+  raise MetadataIndexError("Unrecognized time: " + value)
+
+
+def query(connection, since=None, until=None, kernel=None, release=None, hostname=None,
+    user=None, command=None, return_code=None, failed=False, has=(), verified=False,
+    limit=None):
+  """
+  <Purpose>
+    Finds the runs which match all of the given filters, newest first.
+
+  <Arguments>
+    connection:
+      A connection returned by open_index().
+
+    since, until:
+      Timestamps as returned by parse_time(), bounding when the runs started.
+
+    kernel, release, hostname, user:
+      Exact values of the runs' host details.
+
+    command:
+      Text which the runs' command contains.
+
+    return_code:
+      The exact return code of the runs.
+
+    failed:
+      Whether only runs with a non-zero return code are wanted.
+
+    has:
+      A list of (stream, category) tuples, e.g. ("err", "failure"); only
+      runs with a non-zero count in each are wanted.
+
+    verified:
+      Whether only runs whose signature was verified are wanted.
+
+    limit:
+      The maximum number of runs returned.
+
+  <Exceptions>
+    MetadataIndexError, if a stream is not one of STREAMS.
+
+  <Return>
+    A list of dictionaries, one per run, holding the columns of "runs" and a
+    "counts" dictionary of {"stream:category": count}.
+  """
+
+  conditions = []
+  parameters = []
+  for column, operator, value in [("timestamp", ">=", since), ("timestamp", "<", until),
+      ("kernel", "=", kernel), ("release", "=", release), ("hostname", "=", hostname),
+      ("user", "=", user), ("return_code", "=", return_code)]:
+    if value is not None:
+      conditions.append("runs.%s %s ?" % (column, operator))
+      parameters.append(value)
+  if command is not None:
+    conditions.append("instr(runs.command, ?) > 0")
+    parameters.append(command)
+  if failed:
+    conditions.append("runs.return_code != 0")
+  if verified:
+    conditions.append("runs.verified = 1")
+  stream_names = [stream for stream, section in STREAMS]
+  for stream, category in has:
+    if stream not in stream_names:
+      raise MetadataIndexError("Unknown stream: " + stream)
+    conditions.append("EXISTS (SELECT 1 FROM counts WHERE counts.run_id = runs.id "
+      "AND counts.stream = ? AND counts.category = ? AND counts.count > 0)")
+    parameters.extend([stream, category])
+
+  sql = "SELECT * FROM runs"
+  if conditions:
+    sql += " WHERE " + " AND ".join(conditions)
+  sql += " ORDER BY runs.timestamp DESC"
+  if limit is not None:
+    sql += " LIMIT %d" % limit
+
+  cursor = connection.execute(sql, parameters)
+  columns = [description[0] for description in cursor.description]
+  runs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+  # The counts of all the matching runs are fetched in one go
+  runs_by_id = dict()
+  for run in runs:
+    run["counts"] = dict()
+    runs_by_id[run["id"]] = run
+  run_ids = list(runs_by_id)
+  for start in range(0, len(run_ids), 500):
+    batch = run_ids[start:start + 500]
+    for run_id, stream, category, count in connection.execute("SELECT run_id, stream, "
+        "category, count FROM counts WHERE run_id IN (" + ", ".join(["?"] * len(batch)) + ")", batch):
+      runs_by_id[run_id]["counts"][stream + ":" + category] = count
+  return runs
+
+
+def print_runs(runs, fileobj=sys.stdout):
+  """
+  <Purpose>
+    Prints one tab-separated line per run, holding QUERY_COLUMNS and its
+    non-zero counts, followed by the number of runs.
+
+  <Arguments>
+    runs:
+      A list of runs as returned by query().
+
+    fileobj:
+      The file to which they are written.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    None.
+  """
+
+  for run in runs:
+    counts = ",".join("%s=%d" % (name, count) for name, count in sorted(run["counts"].items()) if count)
+    fields = [run[column] for column in QUERY_COLUMNS] + [counts or "-"]
+    fileobj.write("\t".join(column is None and "-" or str(column) for column in fields) + "\n")
+  fileobj.write("%d runs\n" % len(runs))
+
+
+def _stream_category(value):
+  stream, separator, category = value.partition(":")
+  if not separator or not category:
+    raise argparse.ArgumentTypeError("expected STREAM:CATEGORY, e.g. err:failure")
+  return stream, category
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='metaindex.py', description='Indexes and queries metadata files in a SQLite database.')
+  parser.add_argument('--db', metavar='FILEPATH', default=DEFAULT_DB_FILENAME, help='the index database; default is ' + DEFAULT_DB_FILENAME)
+  subparsers = parser.add_subparsers(dest='action')
+
+  ingest_parser = subparsers.add_parser('ingest', help='load new and changed metadata files into the index')
+  ingest_parser.add_argument('--verify', action='store_true', help='check the signature of each file as it is ingested')
+  ingest_parser.add_argument('--jobs', metavar='N', type=int, help='the number of processes verifying signatures; default is the number of CPUs')
+  ingest_parser.add_argument('--name', metavar='FILENAME', default=DEFAULT_METADATA_FILENAME, help='the name of the metadata files to look for in directories')
+  ingest_parser.add_argument('paths', metavar='PATH', nargs='+', help='a metadata file or a directory to search for them')
+
+  query_parser = subparsers.add_parser('query', help='list the indexed runs matching all of the given filters')
+  query_parser.add_argument('--since', metavar='WHEN', help='runs started at or after WHEN: e.g. "7d", "12h" ago, or a UTC date "2026-10-11"')
+  query_parser.add_argument('--until', metavar='WHEN', help='runs started before WHEN, in the same form as --since')
+  query_parser.add_argument('--kernel', metavar='NAME', help='runs on this kernel, e.g. Linux')
+  query_parser.add_argument('--release', metavar='RELEASE', help='runs on this kernel release')
+  query_parser.add_argument('--host', metavar='HOSTNAME', help='runs on this host')
+  query_parser.add_argument('--user', metavar='USER', help='runs by this user')
+  query_parser.add_argument('--command', metavar='TEXT', help='runs whose command contains TEXT')
+  query_parser.add_argument('--return-code', metavar='N', type=int, help='runs which returned N')
+  query_parser.add_argument('--failed', action='store_true', help='runs which returned non-zero')
+  query_parser.add_argument('--has', metavar='STREAM:CATEGORY', type=_stream_category, action='append', default=[], help='runs with matches of a word list category in out or err, e.g. err:failure; may be repeated')
+  query_parser.add_argument('--verified', action='store_true', help='only runs whose signature was verified on ingest')
+  query_parser.add_argument('--limit', metavar='N', type=int, help='at most N runs')
+  query_parser.add_argument('--json', action='store_true', help='print the runs as a JSON list')
+  args = parser.parse_args()
+  if args.action is None:
+    parser.error("an action is required: ingest or query")
+
+  connection = open_index(args.db)
+  try:
+    if args.action == "ingest":
+      ingested, unchanged, errors = ingest(connection, args.paths, args.verify, args.jobs, args.name)
+      for filepath, error in errors:
+        sys.stderr.write("ERROR %s (%s)\n" % (filepath, error))
+      print("%d ingested, %d unchanged, %d errors" % (ingested, unchanged, len(errors)))
+      sys.exit(errors and 1 or 0)
+
+    try:
+      runs = query(connection, args.since and parse_time(args.since),
+        args.until and parse_time(args.until), args.kernel, args.release, args.host,
+        args.user, args.command, args.return_code, args.failed, args.has, args.verified,
+        args.limit)
+    except MetadataIndexError as e:
+      parser.error(e.value)
+    if args.json:
+      print(json.dumps(runs, indent=2, sort_keys=True))
+    else:
+      print_runs(runs)
+  finally:
+    connection.close()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,278 @@
+"""
+<Program Name>
+  policy.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Loads the policy file into a compiled Policy object used by main.py. The
+  constraints of the policy are split by when they can be checked:
+
+    pre-run  - constraints on the host (cpu_arch, os kernel/release/version)
+               and on the command itself (command_flags), checked before the
+               command is spawned so a misconfigured job fails immediately.
+    post-run - constraints on the results of the command, checked once it
+               has finished and its output has been scanned: the return_code,
+               the size of its output (max_output_bytes, max_err_bytes), the
+               word-list counts of each stream (max_counts) and regular
+               expressions which no matched line may contain
+               (forbidden_line_patterns).
+
+  The post-run rules are evaluated together in one pass over the sizes,
+  counts and instances already recorded in the metadata; the captured files
+  are never re-scanned (reference-mode instances are read back once). Every
+  violated rule is reported, not just the first.
+"""
+
+import re
+import json
+import wordlists
+
+# The host constraints of the policy: the name used in error messages, the
+# path of the constraint in the policy's "constraints" and the path of the
+# value it is checked against in the metadata
+HOST_CONSTRAINTS = [
+  ("cpu_arch", ("cpu_arch",), ("variables", "cpu_arch")),
+  ("os-kernel", ("os", "kernel"), ("variables", "os", "kernel")),
+  ("os-release", ("os", "release"), ("variables", "os", "release")),
+  ("os-version", ("os", "version"), ("variables", "os", "version"))
+]
+
+# The constraints on the results of the command, laid out as above
+RESULT_CONSTRAINTS = [
+  ("return_code", ("return_code",), ("application", "return_code"))
+]
+
+# The upper limits on the size of the command's output, laid out as above
+SIZE_CONSTRAINTS = [
+  ("max_output_bytes", ("max_output_bytes",), ("application", "output_size")),
+  ("max_err_bytes", ("max_err_bytes",), ("application", "err_size"))
+]
+
+# The scanned streams: their key in the metadata and in "max_counts", and the
+# key of the path of their captured file in the "application" section
+STREAMS = [
+  ("output_data", "output_path"),
+  ("err_data", "err_path")
+]
+
+
+class PolicyConstraintException(Exception):
+  """This exception indicates that a constraint specified in the policy file was not met"""
+
+  def __init__(self, value):
+    self.value = value
+
+
+  def __str__(self):
+    return repr(self.value)
+
+
+class Policy(object):
+  """
+  A policy file compiled for checking. The constraints which are set (i.e.
+  not null) are collected once, so each check only visits those. For example:
+
+    policy = Policy.load("default_policy.json")
+    policy.check_pre_run(metadata, "make")
+    ...
+    policy.check_post_run(metadata)
+  """
+
+  def __init__(self, policy_dict):
+    self.policy_dict = policy_dict
+    constraints = policy_dict["constraints"]
+    self.word_lists = policy_dict["supplied_data"]["word_lists"]
+    self.execution = policy_dict.get("execution") or dict()
+
+    self.host_constraints = _compile_constraints(constraints, HOST_CONSTRAINTS)
+    self.result_constraints = _compile_constraints(constraints, RESULT_CONSTRAINTS)
+    self.size_limits = _compile_constraints(constraints, SIZE_CONSTRAINTS)
+    self.command_flags = list(constraints.get("command_flags") or [])
+
+    # (stream, category, limit) for each word-list count which is limited
+    self.count_limits = []
+    max_counts = constraints.get("max_counts") or dict()
+    for stream, path_key in STREAMS:
+      for category in wordlists.CATEGORIES:
+        limit = _lookup(max_counts, (stream, category))
+        if limit is not None:
+          self.count_limits.append((stream, category, limit))
+
+    # Each forbidden pattern is compiled on its own, so that numbered groups
+    # and backreferences keep their meaning and every pattern is tried on
+    # every line
+    self.line_patterns = []
+    for pattern in constraints.get("forbidden_line_patterns") or []:
+      try:
+        self.line_patterns.append((pattern, re.compile(pattern)))
+      except re.error as e:
+        raise PolicyConstraintException("ERROR: invalid forbidden_line_patterns entry \"" + pattern + "\": " + str(e))
+
+    # The patterns are checked against the recorded instances, so lines whose
+    # instances were dropped by a cap would go unchecked
+    if self.line_patterns and self.execution.get("max_instances_per_category") is not None:
+      raise PolicyConstraintException("ERROR: forbidden_line_patterns cannot be combined with max_instances_per_category, since the lines beyond the cap would not be checked")
+
+
+  @classmethod
+  def load(cls, policy_filepath):
+    """
+    <Purpose>
+      Reads in the policy file and compiles it.
+
+    <Arguments>
+      policy_filepath:
+        The string representing the path to the policy file.
+
+    <Exceptions>
+      IOError, if the policy file cannot be read.
+
+      ValueError, if the policy file is not valid JSON.
+
+    <Return>
+      A Policy object.
+    """
+
+    # The standard json module is used rather than tuf, so that a run
+    # rejected by the pre-run checks never loads tuf and its crypto libraries
+    fileobj = open(policy_filepath, "r")
+    try:
+      return cls(json.load(fileobj))
+    finally:
+      fileobj.close()
+
+
+  def check_pre_run(self, metadata_dict, cmd_string):
+    """
+    <Purpose>
+      Checks the host data in the metadata and the command against the
+      constraints which do not depend on running the command.
+
+    <Arguments>
+      metadata_dict:
+        The dictionary representing the metadata, with its "variables" filled.
+
+      cmd_string:
+        The command which is about to be run.
+
+    <Exceptions>
+      PolicyConstraintException, if a constraint is not met.
+
+    <Return>
+      None.
+    """
+
+    _check_constraints(metadata_dict, self.host_constraints)
+
+    for flag in self.command_flags:
+      if flag not in cmd_string:
+        raise PolicyConstraintException("ERROR: constraint on flags not met; flag \"" + flag + "\" not found")
+
+
+  def check_post_run(self, metadata_dict):
+    """
+    <Purpose>
+      Checks the results of the command recorded in the metadata against the
+      constraints which depend on running it.
+
+    <Arguments>
+      metadata_dict:
+        The dictionary representing the metadata, with its "application",
+        "output_data" and "err_data" filled.
+
+    <Exceptions>
+      PolicyConstraintException, if any constraint is not met; its message
+      lists every violation, one per line.
+
+    <Return>
+      None.
+    """
+
+    violations = _find_violations(metadata_dict, self.result_constraints)
+
+    for name, limit, metadata_path in self.size_limits:
+      actual = _lookup(metadata_dict, metadata_path)
+      if actual is not None and actual > limit:
+        violations.append("ERROR: constraint on " + name + " not met; limit - " + str(limit) + ", actual - " + str(actual))
+
+    for stream, category, limit in self.count_limits:
+      count = _lookup(metadata_dict, (stream, category, "count"))
+      if count is not None and count > limit:
+        violations.append("ERROR: constraint on max_counts of " + stream + " " + category + " not met; limit - " + str(limit) + ", actual - " + str(count))
+
+    if self.line_patterns:
+      violations.extend(self._find_forbidden_lines(metadata_dict))
+
+    if violations:
+      raise PolicyConstraintException("\n".join(violations))
+
+
+  def _find_forbidden_lines(self, metadata_dict):
+    # Searches each matched line of each stream with every forbidden pattern
+    # not yet found in that stream, reporting the first line matching each.
+    violations = []
+    for stream, path_key in STREAMS:
+      results = metadata_dict.get(stream)
+      if results is None:
+        continue
+      remaining = list(self.line_patterns)
+      filename = _lookup(metadata_dict, ("application", path_key))
+      for line_number, line in wordlists.matched_lines(results, filename):
+        if not remaining:
+          break
+        for pattern, regex in list(remaining):
+          if regex.search(line):
+            remaining.remove((pattern, regex))
+            violations.append("ERROR: constraint on forbidden_line_patterns not met; pattern \"" + pattern + "\" found on line " + str(line_number) + " of " + stream)
+    return violations
+
+
+def _compile_constraints(constraints, constraint_table):
+  # Returns (name, expected value, metadata path) for each constraint in the
+  # table which the policy sets.
+  compiled = []
+  for name, policy_path, metadata_path in constraint_table:
+    expected = _lookup(constraints, policy_path)
+    if expected is not None:
+      compiled.append((name, expected, metadata_path))
+  return compiled
+
+
+def _check_constraints(metadata_dict, compiled_constraints):
+  # Raises a PolicyConstraintException for the first constraint not met.
+  violations = _find_violations(metadata_dict, compiled_constraints)
+  if violations:
+    raise PolicyConstraintException(violations[0])
+
+
+def _find_violations(metadata_dict, compiled_constraints):
+  # Returns a message for each constraint whose expected value differs from
+  # the actual value in the metadata.
+  violations = []
+  for name, expected, metadata_path in compiled_constraints:
+    actual = _lookup(metadata_dict, metadata_path)
+    if actual != expected:
+      violations.append("ERROR: constraint on " + name + " not met; expected - \"" + str(expected) + "\", actual - \"" + str(actual) + "\"")
+  return violations
+
+
+def _lookup(dictionary, path):
+  # Follows a path of keys through nested dictionaries, returning None if any
+  # key is missing.
+  for key in path:
+    if not isinstance(dictionary, dict) or key not in dictionary:
+      return None
+    dictionary = dictionary[key]
+  return dictionary
@@ -0,0 +1,198 @@
+"""
+<Program Name>
+  profiler.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Measures where toto's own time goes. main.py runs each phase of its
+  pipeline (loading the policy, running the command, scanning its output,
+  signing, ...) inside Profiler.phase(), which records the phase's elapsed
+  time on a monotonic clock, the bytes it processed and the peak memory of
+  toto and of the command so far. With --profile the result is printed to
+  stderr or written to a sidecar JSON file, and one phase may additionally be
+  run under cProfile.
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import contextlib
+
+# A clock which is not affected by changes to the system time, where available
+if hasattr(time, "monotonic"):
+  monotonic = time.monotonic
+else:
+  monotonic = time.time
+
+
+class Profiler(object):
+  """
+  Records the phases of a run in the order they happen. For example:
+
+    profile = Profiler(cprofile_phase="scan_wordlists")
+    with profile.phase("exec_cmd") as record:
+      ...
+      record["bytes"] = bytes_captured
+    profile.write_report(sys.stderr)
+  """
+
+  def __init__(self, cprofile_phase=None):
+    self.cprofile_phase = cprofile_phase
+    self.cprofile = None
+    self.phases = []
+    self.started_at = monotonic()
+
+
+  @contextlib.contextmanager
+  def phase(self, name):
+    """
+    <Purpose>
+      Times the body of a 'with' statement as the named phase. The record
+      of the phase is yielded so that the body may set its "bytes".
+
+    <Arguments>
+      name:
+        The name of the phase.
+
+    <Exceptions>
+      None; exceptions raised by the body are passed on, with the phase
+      still recorded.
+
+    <Return>
+      A context manager yielding the phase's record.
+    """
+
+    record = {"name": name, "bytes": None}
+    cprofile = None
+    if name == self.cprofile_phase:
+      import cProfile
+      cprofile = cProfile.Profile()
+      cprofile.enable()
+
+    start = monotonic()
+    try:
+      yield record
+    finally:
+      record["seconds"] = monotonic() - start
+      if cprofile is not None:
+        cprofile.disable()
+        self.cprofile = cprofile
+      record["peak_rss_kb"] = _peak_rss_kb(resource.RUSAGE_SELF)
+      record["children_peak_rss_kb"] = _peak_rss_kb(resource.RUSAGE_CHILDREN)
+      self.phases.append(record)
+
+
+  def to_dict(self):
+    """
+    <Purpose>
+      Returns the profile as a dictionary suitable for JSON.
+
+    <Arguments>
+      None.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      A dictionary with the "phases" in order, the "total_seconds" since the
+      profiler was created and the "cprofile_phase".
+    """
+
+    return {
+      "phases": [dict(record) for record in self.phases],
+      "total_seconds": monotonic() - self.started_at,
+      "cprofile_phase": self.cprofile_phase
+    }
+
+
+  def write_report(self, fileobj=sys.stderr, cprofile_limit=25):
+    """
+    <Purpose>
+      Writes a table of the phases, followed by the cProfile statistics of
+      the chosen phase (if any), sorted by cumulative time.
+
+    <Arguments>
+      fileobj:
+        The file to which the report is written.
+
+      cprofile_limit:
+        The number of functions listed from the cProfile statistics.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      None.
+    """
+
+    profile = self.to_dict()
+    fileobj.write("%-20s %10s %6s %12s %12s %12s\n" % ("phase", "ms", "%",
+        "bytes", "peak rss kb", "child rss kb"))
+    total = profile["total_seconds"] or 1.0
+    for record in profile["phases"]:
+      fileobj.write("%-20s %10.2f %6.1f %12s %12d %12d\n" % (record["name"],
+          record["seconds"] * 1000, record["seconds"] * 100 / total,
+          record["bytes"] is None and "-" or record["bytes"],
+          record["peak_rss_kb"], record["children_peak_rss_kb"]))
+    fileobj.write("%-20s %10.2f\n" % ("total", profile["total_seconds"] * 1000))
+
+    if self.cprofile is not None:
+      import pstats
+      fileobj.write("\ncProfile of phase " + self.cprofile_phase + ":\n")
+      stats = pstats.Stats(self.cprofile, stream=fileobj)
+      stats.sort_stats("cumulative").print_stats(cprofile_limit)
+    fileobj.flush()
+
+
+  def write_json(self, filepath):
+    """
+    <Purpose>
+      Writes the profile to a sidecar JSON file. If a phase was run under
+      cProfile, its raw statistics are dumped next to it, with ".pstats"
+      appended to the name, for use with the pstats module.
+
+    <Arguments>
+      filepath:
+        The path of the JSON file.
+
+    <Exceptions>
+      IOError, if the file cannot be written.
+
+    <Return>
+      None.
+    """
+
+    profile = self.to_dict()
+    if self.cprofile is not None:
+      profile["cprofile_stats_path"] = os.path.abspath(filepath + ".pstats")
+      self.cprofile.dump_stats(profile["cprofile_stats_path"])
+
+    fileobj = open(filepath, "w")
+    try:
+      json.dump(profile, fileobj, indent=2, sort_keys=True)
+    finally:
+      fileobj.close()
+
+
+def _peak_rss_kb(who):
+  # Returns the peak resident memory of this process or of its reaped
+  # children, in kilobytes.
+  peak = resource.getrusage(who).ru_maxrss
+  if sys.platform == "darwin":
+    # Reported in bytes rather than kilobytes
+    peak = peak // 1024
+  return peak
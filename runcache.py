@@ -0,0 +1,275 @@
+"""
+<Program Name>
+  runcache.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  An opt-in cache of completed runs, so that a command whose inputs have not
+  changed is not run again. A run is keyed by a digest of everything which
+  determines its result: the command, the hashes of its input, of the policy
+  file and of any declared input files, the host details recorded by
+  main.process_env_vars() (other than the timestamp) and the options which
+  change the metadata. Each entry holds the signed metadata.json of the run
+  along with its in, out and err files:
+
+    <root>/entries/<key>/{metadata.json, in, out, err, info.json}
+
+  The in, out and err files of an entry are read-only, and are shared by
+  hardlink with the runs which use them only if they are read-only already
+  (i.e. blobs of an artifact store); otherwise the entry keeps its own copy,
+  so that changing a run's files cannot change the cached run.
+
+  The cache is bounded in size; once it grows past its limit the least
+  recently used entries are evicted. Entries are written to a temporary
+  directory and renamed into place, so runs sharing a cache never see a
+  partial entry. For example:
+
+    cache = RunCache("/var/toto/cache")
+    key = cache_key({"command": "make", ...})
+    hit = cache.get(key)
+"""
+
+import os
+import json
+import time
+import errno
+import shutil
+import hashlib
+import tempfile
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# The files an entry may hold besides its metadata, by their names in the
+# run's output directory
+ENTRY_FILES = ["in", "out", "err"]
+
+ENTRY_METADATA_FILENAME = "metadata.json"
+ENTRY_INFO_FILENAME = "info.json"
+
+
+def cache_key(fields):
+  """
+  <Purpose>
+    Computes the key of a run from the fields which determine its result.
+
+  <Arguments>
+    fields:
+      A dictionary of JSON-serializable values, e.g. the command, the hashes
+      of its inputs and the host details.
+
+  <Exceptions>
+    TypeError, if a value cannot be serialized.
+
+  <Return>
+    The hex SHA-256 digest of the fields in canonical form.
+  """
+
+  encoded = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+  return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class RunCache(object):
+  """
+  A directory of cached runs, evicted least recently used first once their
+  total size exceeds 'max_bytes'. See the module docstring.
+  """
+
+  def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+    self.root = os.path.abspath(root)
+    self.max_bytes = max_bytes
+    self.entries_dir = os.path.join(self.root, "entries")
+    self.temp_dir = os.path.join(self.root, "tmp")
+    for directory in [self.entries_dir, self.temp_dir]:
+      if not os.path.isdir(directory):
+        try:
+          os.makedirs(directory)
+        except OSError as e:
+          if e.errno != errno.EEXIST:
+            raise
+
+
+  def get(self, key):
+    """
+    <Purpose>
+      Looks up a cached run, marking it as the most recently used.
+
+    <Arguments>
+      key:
+        The key of the run, as returned by cache_key().
+
+    <Exceptions>
+      None.
+
+    <Return>
+      A tuple (entry_dir, info) for the directory holding the run's files
+      and the dictionary recorded with them, or None on a miss.
+    """
+
+    entry_dir = os.path.join(self.entries_dir, key)
+    try:
+      info = _read_json(os.path.join(entry_dir, ENTRY_INFO_FILENAME))
+    except (IOError, OSError, ValueError):
+      return None
+
+    # The time of the last use is kept as the entry's modification time
+    try:
+      os.utime(entry_dir, None)
+    except OSError:
+      return None
+    return entry_dir, info
+
+
+  def put(self, key, metadata_filepath, files, info):
+    """
+    <Purpose>
+      Adds a run to the cache, then evicts the least recently used runs
+      until the cache is within its size limit.
+
+    <Arguments>
+      key:
+        The key of the run, as returned by cache_key().
+
+      metadata_filepath:
+        The path of the run's signed metadata.json.
+
+      files:
+        A dictionary mapping names from ENTRY_FILES to the paths of the
+        run's files; missing files are skipped.
+
+      info:
+        A JSON-serializable dictionary recorded with the entry (e.g. the
+        output directory of the run).
+
+    <Exceptions>
+      IOError or OSError, if the entry cannot be written.
+
+    <Return>
+      The directory holding the new entry.
+    """
+
+    temp_entry_dir = tempfile.mkdtemp(dir=self.temp_dir)
+    try:
+      # The metadata is copied since later runs overwrite metadata.json in
+      # place; in, out and err are only shared if nothing can write to them
+      shutil.copyfile(metadata_filepath, os.path.join(temp_entry_dir, ENTRY_METADATA_FILENAME))
+      size = os.path.getsize(metadata_filepath)
+      for name in ENTRY_FILES:
+        filepath = files.get(name)
+        if filepath and os.path.isfile(filepath):
+          entry_filepath = os.path.join(temp_entry_dir, name)
+          if os.stat(filepath).st_mode & 0o222:
+            shutil.copyfile(filepath, entry_filepath)
+            os.chmod(entry_filepath, 0o444)
+          else:
+            link_or_copy(filepath, entry_filepath)
+          size += os.path.getsize(filepath)
+
+      info = dict(info)
+      info["key"] = key
+      info["size"] = size
+      info["created"] = time.time()
+      fileobj = open(os.path.join(temp_entry_dir, ENTRY_INFO_FILENAME), "w")
+      try:
+        json.dump(info, fileobj, sort_keys=True)
+      finally:
+        fileobj.close()
+
+      entry_dir = os.path.join(self.entries_dir, key)
+      try:
+        os.rename(temp_entry_dir, entry_dir)
+      except OSError as e:
+        # Another run has cached the same key meanwhile, which is as good
+        if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+          raise
+    finally:
+      if os.path.isdir(temp_entry_dir):
+        shutil.rmtree(temp_entry_dir)
+
+    self.evict()
+    return entry_dir
+
+
+  def evict(self):
+    """
+    <Purpose>
+      Removes the least recently used entries until the total size of the
+      cache is at most 'max_bytes'.
+
+    <Arguments>
+      None.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      A list of the keys which were evicted.
+    """
+
+    entries = []
+    total_size = 0
+    for key in os.listdir(self.entries_dir):
+      entry_dir = os.path.join(self.entries_dir, key)
+      try:
+        info = _read_json(os.path.join(entry_dir, ENTRY_INFO_FILENAME))
+        last_used = os.stat(entry_dir).st_mtime
+      except (IOError, OSError, ValueError):
+        continue
+      entries.append((last_used, key, info.get("size", 0)))
+      total_size += info.get("size", 0)
+
+    evicted = []
+    entries.sort()
+    for last_used, key, size in entries:
+      if total_size <= self.max_bytes:
+        break
+      shutil.rmtree(os.path.join(self.entries_dir, key), ignore_errors=True)
+      total_size -= size
+      evicted.append(key)
+    return evicted
+
+
+def _read_json(filepath):
+  fileobj = open(filepath, "r")
+  try:
+    return json.load(fileobj)
+  finally:
+    fileobj.close()
+
+
+def link_or_copy(src_filepath, dst_filepath):
+  """
+  <Purpose>
+    Hardlinks a file where possible, which costs no space for files which
+    are themselves hardlinks into an artifact store, and copies it otherwise
+    (e.g. across filesystems).
+
+  <Arguments>
+    src_filepath:
+      The path of the existing file.
+
+    dst_filepath:
+      The path at which it is made available, which must not exist.
+
+  <Exceptions>
+    IOError or OSError, if the file can be neither linked nor copied.
+
+  <Return>
+    None.
+  """
+
+  try:
+    os.link(src_filepath, dst_filepath)
+  except OSError:
+    shutil.copyfile(src_filepath, dst_filepath)
@@ -57,5 +57,5 @@ setup(
   ],
   keywords='testing verification framework',
   packages = find_packages(exclude=['tests', 'excludes/c_code_proj']),
-  install_requires=['tuf', 'canonicaljson']
+  install_requires=['tuf', 'canonicaljson<1.2']
   )
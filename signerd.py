@@ -0,0 +1,254 @@
+"""
+<Program Name>
+  signerd.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  An optional long-lived signing service. Every run of main.py otherwise pays
+  for importing tuf and loading the signing key before it can sign its
+  metadata; the signer daemon does both once and then signs batches of
+  metadata documents sent to it over a Unix domain socket. main.py uses the
+  daemon whenever its socket exists and falls back to in-process signing
+  otherwise. The daemon is started as below:
+
+  usage: signerd.py [-h] [--socket PATH] [--keystore FILENAME]
+
+  Each connection carries one request, a JSON object of the form
+  {"documents": [...]}, after which the client shuts down its writing side.
+  The daemon replies with {"signed": [...]} holding the signed documents in the
+  same order, or with {"error": "..."}, and closes the connection.
+
+  This module deliberately does not import tuf or signing at module level, so
+  that clients only pay for the socket round trip.
+"""
+
+import os
+import sys
+import json
+import signal
+import socket
+import argparse
+
+try:
+  import socketserver
+except ImportError:
+  import SocketServer as socketserver
+
+# The environment variable which may point main.py at the daemon's socket
+SOCKET_ENV_VAR = "TOTO_SIGNER_SOCKET"
+DEFAULT_SOCKET_PATH = os.path.expanduser("~/.toto-signer.sock")
+
+# The number of seconds a client waits on the daemon before giving up
+CLIENT_TIMEOUT = 60
+
+
+class SignerUnavailableError(Exception):
+  """This exception indicates that the signer daemon could not be used"""
+
+  def __init__(self, value):
+    self.value = value
+
+
+  def __str__(self):
+    return repr(self.value)
+
+
+def get_socket_path():
+  """
+  <Purpose>
+    Returns the path of the daemon's socket, from the TOTO_SIGNER_SOCKET
+    environment variable if it is set.
+
+  <Arguments>
+    None.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    A string for the path of the socket.
+  """
+
+  return os.environ.get(SOCKET_ENV_VAR, DEFAULT_SOCKET_PATH)
+
+
+def sign_documents(documents, socket_path=None, timeout=CLIENT_TIMEOUT):
+  """
+  <Purpose>
+    Sends a batch of metadata documents to the signer daemon and returns them
+    signed, as signing.sign_json() would have.
+
+  <Arguments>
+    documents:
+      A list of metadata dictionaries to be signed.
+
+    socket_path:
+      The path of the daemon's socket; see get_socket_path() by default.
+
+    timeout:
+      The number of seconds to wait on the daemon.
+
+  <Exceptions>
+    SignerUnavailableError, if the daemon is not running, cannot be reached or
+    fails to sign the documents.
+
+  <Return>
+    A list of the signed metadata dictionaries, in the same order.
+  """
+
+  if socket_path is None:
+    socket_path = get_socket_path()
+  if not os.path.exists(socket_path):
+    raise SignerUnavailableError("no signer daemon socket at " + socket_path)
+
+  client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    request = json.dumps({"documents": documents}).encode("utf-8")
+    client.settimeout(timeout)
+    client.connect(socket_path)
+    client.sendall(request)
+    client.shutdown(socket.SHUT_WR)
+    response = json.loads(_read_all(client).decode("utf-8"))
+  except (socket.error, ValueError) as e:
+    raise SignerUnavailableError("signer daemon failed: " + str(e))
+  finally:
+    client.close()
+
+  if "error" in response:
+    raise SignerUnavailableError("signer daemon failed: " + response["error"])
+  return response["signed"]
+
+
+def sign_json(data, socket_path=None):
+  """
+  <Purpose>
+    Signs a single metadata document, using the signer daemon if it is
+    available and falling back to signing.sign_json() in this process if not.
+
+  <Arguments>
+    data:
+      The metadata dictionary to be signed.
+
+    socket_path:
+      The path of the daemon's socket; see get_socket_path() by default.
+
+  <Exceptions>
+    See signing.sign_json().
+
+  <Return>
+    A dictionary containing the original data with the addition of the
+    'signed' and 'signatures' fields.
+  """
+
+  try:
+    return sign_documents([data], socket_path)[0]
+  except SignerUnavailableError:
+    import signing
+    return signing.sign_json(data)
+
+
+class SignerRequestHandler(socketserver.StreamRequestHandler):
+  """Signs the batch of documents sent over a single connection."""
+
+  def handle(self):
+    import signing
+    try:
+      request = json.loads(self.rfile.read().decode("utf-8"))
+      signed = []
+      for document in request["documents"]:
+        signed.append(signing.sign_json(document, self.server.keystore_filepath))
+      response = {"signed": signed}
+    except Exception as e:
+      response = {"error": repr(e)}
+    self.wfile.write(json.dumps(response).encode("utf-8"))
+
+
+class SignerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  """A Unix socket server holding the warm signing key."""
+
+  daemon_threads = True
+
+  def __init__(self, socket_path, keystore_filepath):
+    # Load the key up front so that no request pays for it
+    import signing
+    signing.load_or_create_key(keystore_filepath)
+    self.keystore_filepath = keystore_filepath
+
+    # Only the owner may connect and have documents signed
+    old_umask = os.umask(0o177)
+    try:
+      socketserver.UnixStreamServer.__init__(self, socket_path, SignerRequestHandler)
+    finally:
+      os.umask(old_umask)
+
+
+def serve(socket_path, keystore_filepath):
+  """
+  <Purpose>
+    Runs the signer daemon until it is interrupted, removing its socket when
+    it stops.
+
+  <Arguments>
+    socket_path:
+      The path at which the Unix domain socket is created.
+
+    keystore_filepath:
+      The path of the keystore file holding the encrypted RSA key.
+
+  <Exceptions>
+    socket.error, if the socket cannot be created.
+
+  <Return>
+    None.
+  """
+
+  # A socket left behind by a daemon which did not exit cleanly is replaced
+  if os.path.exists(socket_path):
+    os.remove(socket_path)
+
+  server = SignerServer(socket_path, keystore_filepath)
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+    os.remove(socket_path)
+
+
+def _read_all(sock):
+  # Reads from the socket until the other end closes it.
+  chunks = []
+  while True:
+    data = sock.recv(65536)
+    if not data:
+      break
+    chunks.append(data)
+  return b"".join(chunks)
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='signerd.py', description='Signs metadata documents sent over a Unix domain socket.')
+  parser.add_argument('--socket', metavar='PATH', default=get_socket_path(), help='the path of the socket to listen on')
+  parser.add_argument('--keystore', metavar='FILENAME', default=os.path.abspath("keystore.txt"), help='the path of the keystore holding the signing key')
+  args = parser.parse_args()
+
+  # Being terminated removes the socket just like an interrupt does
+  signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+  serve(args.socket, args.keystore)
+
+
+if __name__ == '__main__':
+  main()
@@ -16,17 +16,83 @@
   See LICENSE for licensing information.
 
 <Purpose>
-  To sign and verify the metadata.
+  To sign and verify the metadata. The RSA signing key is generated only once,
+  stored encrypted in a keystore file and reused by later runs; within a 
+  process the decrypted key is cached so that it is only loaded once.
 """
 
+import os
+import copy
+import binascii
 import tuf
 import tuf.keys
 import tuf.sig
 import tuf.util
 import canonicaljson as json
 
+KEYSTORE_FILENAME = "keystore.txt"
+KEYSTORE_PASSWORD = "badpassword"
 
-def sign_json(data):
+# Decrypted keys which have been loaded (or generated) by this process, keyed
+# by the real path of their keystore file
+_cached_keys = dict()
+
+
+def load_or_create_key(keystore_filepath=KEYSTORE_FILENAME, password=KEYSTORE_PASSWORD):
+  """
+  <Purpose>
+    Return the RSA key stored in the given keystore file, generating the key
+    and creating the keystore if it does not exist yet. The decrypted key is
+    cached for the life of the process, so the keystore is read and decrypted
+    at most once.
+
+  <Arguments>
+    keystore_filepath:
+      The path of the keystore file holding the encrypted RSA key.
+
+    password:
+      The password with which the key is encrypted.
+
+  <Exceptions>
+    tuf.CryptoError, if the key in the keystore cannot be decrypted.
+
+    tuf.UnsupportedLibraryError, if an unsupported or unavailable library is
+    detected.
+
+  <Side Effects>
+    A keystore file containing the encrypted RSA key will be created if it
+    does not exist.
+
+  <Returns>
+    An RSA key dictionary, including its private key.
+  """
+
+  cache_key = os.path.realpath(keystore_filepath)
+  if cache_key in _cached_keys:
+    return _cached_keys[cache_key]
+
+  if os.path.exists(keystore_filepath):
+    # tuf expects the encrypted key as a byte string
+    fileobj = open(keystore_filepath, 'rb')
+    encrypted_key = fileobj.read()
+    fileobj.close()
+    rsakey_dict = tuf.keys.decrypt_key(encrypted_key, password)
+
+  else:
+    # The RSA keys need to be encrypted before they are stored locally, and the
+    # keystore is only readable by its owner
+    rsakey_dict = tuf.keys.generate_rsa_key()
+    encrypted_key = tuf.keys.encrypt_key(rsakey_dict, password)
+    fd = os.open(keystore_filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    fileobj = os.fdopen(fd, 'w')
+    fileobj.write(encrypted_key)
+    fileobj.close()
+
+  _cached_keys[cache_key] = rsakey_dict
+  return rsakey_dict
+
+
+def sign_json(data, keystore_filepath=KEYSTORE_FILENAME):
   """
   <Purpose>
     Return a dictionary of the original data with
@@ -45,13 +111,16 @@ def sign_json(data):
      'method': '...',
      'sig': '...'}.
 
-    The signing process will use the generated RSA keys 
-    and the data to generate the signature.
+    The signing process will use the RSA key from the keystore
+    (see load_or_create_key()) and the data to generate the signature.
 
   <Arguments>
     data:
       Data object used to generate the signature.
 
+    keystore_filepath:
+      The path of the keystore file holding the encrypted RSA key.
+
   <Exceptions>
     tuf.FormatError, if 'rsakey_dict' does not have the correct format.
 
@@ -62,26 +131,23 @@ def sign_json(data):
 
   <Side Effects>
     'data' is modified to include the 'signed' and 'signatures' fields.
-    A 'keystore.txt' file containing the encrypted RSA keys will be created.
+    A 'keystore.txt' file containing the encrypted RSA keys will be created
+    if it does not exist.
 
   <Returns>
     A dictionary containing the original data with the addition
     of the 'signed' and 'signatures' fields.
   """
 
-  # Use generated RSA keys to create signature.
-  rsakey_dict = tuf.keys.generate_rsa_key()
+  # Use the stored RSA keys to create signature.
+  rsakey_dict = load_or_create_key(keystore_filepath)
   rsa_signature = tuf.sig.generate_rsa_signature(data, rsakey_dict)
 
-  # The RSA keys need to be encrypted before it is stored locally
-  encrypted_keys = tuf.keys.encrypt_key(rsakey_dict, "badpassword")
-  fileobj = open('keystore.txt', 'w')
-  fileobj.write(encrypted_keys)
-  fileobj.close()
-
-  # Update metadata with public key and signature.
-  rsakey_dict['keyval']['private'] = ''
-  data['signed'] = rsakey_dict
+  # Update metadata with public key and signature. The cached key is copied so
+  # that clearing the private key does not affect later signatures.
+  public_key_dict = copy.deepcopy(rsakey_dict)
+  public_key_dict['keyval']['private'] = ''
+  data['signed'] = public_key_dict
   data['signatures'] = rsa_signature
 
   return data
@@ -90,7 +156,68 @@ def sign_json(data):
 
 
 
-def verify_json(jsondata):
+class PublicKeyCache(object):
+  """
+  Caches parsed public keys by keyid, so that verifying many documents signed
+  with the same key (e.g. with verify_batch.py) parses each key only once. A
+  cached key is only used for a document whose public key is identical to the
+  one it was parsed from. RSASSA-PSS signatures are verified directly with
+  PyCrypto (the library behind tuf's own RSA verification) when it is
+  available; any other key or method falls back to tuf.keys.verify_signature().
+  """
+
+  def __init__(self):
+    # keyid -> (public key PEM, PKCS1_PSS verifier)
+    self.verifiers = dict()
+
+
+  def verify(self, key_dict, signature, data):
+    tuf.formats.ANYKEY_SCHEMA.check_match(key_dict)
+    tuf.formats.SIGNATURE_SCHEMA.check_match(signature)
+
+    verifier = None
+    if key_dict['keytype'] == 'rsa' and signature['method'] == 'RSASSA-PSS':
+      verifier = self._get_verifier(key_dict)
+    if verifier is None:
+      return tuf.keys.verify_signature(key_dict, signature, data)
+
+    import Crypto.Hash.SHA256
+    # Hash exactly what tuf.keys.verify_signature() hashes: the UTF-8
+    # encoding of the canonical JSON of 'data'
+    data = tuf.formats.encode_canonical(data).encode('utf-8')
+    try:
+      sig = binascii.unhexlify(signature['sig'].encode('utf-8'))
+      return verifier.verify(Crypto.Hash.SHA256.new(data), sig)
+    except (ValueError, IndexError, TypeError):
+      raise tuf.CryptoError('The RSA signature could not be verified.')
+
+
+  def _get_verifier(self, key_dict):
+    # Returns the cached verifier for the key, parsing the key on first use,
+    # or None if PyCrypto is not available.
+    public = key_dict['keyval']['public']
+    cached = self.verifiers.get(key_dict['keyid'])
+    if cached is not None and cached[0] == public:
+      return cached[1]
+
+    try:
+      import Crypto.PublicKey.RSA
+      import Crypto.Signature.PKCS1_PSS
+    except ImportError:
+      return None
+    try:
+      verifier = Crypto.Signature.PKCS1_PSS.new(Crypto.PublicKey.RSA.importKey(public))
+    except (ValueError, IndexError, TypeError):
+      raise tuf.CryptoError('The RSA public key could not be imported.')
+
+    # A document claiming a known keyid with a different key never replaces
+    # the cached one
+    if cached is None:
+      self.verifiers[key_dict['keyid']] = (public, verifier)
+    return verifier
+
+
+def verify_json(jsondata, key_cache=None):
   """
   <Purpose>
     Determine whether the private key belonging to 'key_dict' produced
@@ -105,6 +232,10 @@ def verify_json(jsondata):
       A json string containing the metadata with the
       'signed' and 'signatures' fields.
 
+    key_cache:
+      An optional PublicKeyCache through which the public key is 
+      resolved, for verifying many documents in a row.
+
   <Exceptions>
     tuf.FormatError, raised if either 'signed' or 'signatures' fields
     in 'data' are improperly formatted.
@@ -133,7 +264,10 @@ def verify_json(jsondata):
   del canonicalData['signed']
   del canonicalData['signatures']
   canonicalData = tuf.formats.encode_canonical(canonicalData)
-  verify_state = tuf.keys.verify_signature(signed, signatures, canonicalData)
+  if key_cache is not None:
+    verify_state = key_cache.verify(signed, signatures, canonicalData)
+  else:
+    verify_state = tuf.keys.verify_signature(signed, signatures, canonicalData)
 
   return verify_state
 
@@ -0,0 +1,297 @@
+"""
+<Program Name>
+  store.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  A content-addressed store for the files captured by main.py (in, out and
+  err). Each file is stored once, as a read-only "blob" named after the
+  SHA-256 digest of its contents:
+
+    <root>/sha256/<first two hex digits>/<remaining hex digits>[.gz]
+
+  so the same input used by hundreds of runs, or identical output from
+  repeated runs, takes up the space of one file. A blob is never copied when
+  it can be avoided: a captured file which toto owns is moved (renamed) into
+  the store, and a file which must be left in place (e.g. the --input file)
+  is reflinked where the filesystem supports it. Only otherwise is the file
+  streamed into the store, gzip-compressed if the store is opened with
+  compression. Files are written to a temporary name and renamed into place,
+  so concurrent runs sharing a store never see a partial blob.
+
+  For example:
+
+    artifacts = ArtifactStore("/var/toto/store")
+    blob_path = artifacts.add_file("out", sha256_digest, move=True)
+"""
+
+import os
+import errno
+import shutil
+import tempfile
+
+# The digest by which blobs are addressed
+STORE_ALGORITHM = "sha256"
+
+# The suffix of compressed blobs
+COMPRESSED_SUFFIX = ".gz"
+
+# The number of bytes streamed at a time when a blob has to be copied
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# The Linux ioctl which clones a file's extents into another (a reflink), as
+# supported by e.g. btrfs and XFS
+FICLONE = 0x40049409
+
+
+class ArtifactStore(object):
+  """
+  A directory of blobs addressed by digest. See the module docstring.
+  """
+
+  def __init__(self, root, compress=False):
+    self.root = os.path.abspath(root)
+    self.compress = compress
+    self.temp_dir = os.path.join(self.root, "tmp")
+    for directory in [self.root, self.temp_dir]:
+      if not os.path.isdir(directory):
+        try:
+          os.makedirs(directory)
+        except OSError as e:
+          # Another run sharing the store may have created it meanwhile
+          if e.errno != errno.EEXIST:
+            raise
+
+
+  def blob_path(self, digest, compressed=False):
+    """
+    <Purpose>
+      Returns the path at which the blob with the given digest is stored.
+
+    <Arguments>
+      digest:
+        The hex SHA-256 digest of the blob's (uncompressed) contents.
+
+      compressed:
+        Whether the path of the compressed form of the blob is wanted.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      A string for the path of the blob.
+    """
+
+    path = os.path.join(self.root, STORE_ALGORITHM, digest[:2], digest[2:])
+    if compressed:
+      path += COMPRESSED_SUFFIX
+    return path
+
+
+  def find(self, digest):
+    """
+    <Purpose>
+      Looks up the blob with the given digest, in either form.
+
+    <Arguments>
+      digest:
+        The hex SHA-256 digest of the blob's contents.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      The path of the stored blob, or None if it is not in the store.
+    """
+
+    for compressed in [False, True]:
+      path = self.blob_path(digest, compressed)
+      if os.path.exists(path):
+        return path
+    return None
+
+
+  def add_file(self, filepath, digest, move=False):
+    """
+    <Purpose>
+      Adds a file to the store, unless a blob with the same contents is
+      stored already.
+
+    <Arguments>
+      filepath:
+        The path of the file to be added.
+
+      digest:
+        The hex SHA-256 digest of the file's contents, which the caller has
+        already computed (e.g. with utils.HashingSink while capturing it).
+
+      move:
+        If True, the file belongs to the caller and is moved into the store
+        (or removed, if the blob exists already) rather than copied.
+
+    <Exceptions>
+      IOError or OSError, if the file cannot be read or the blob written.
+
+    <Return>
+      The path of the stored blob.
+    """
+
+    existing_path = self.find(digest)
+    if existing_path is not None:
+      if move:
+        os.remove(filepath)
+      return existing_path
+
+    path = self.blob_path(digest, self.compress)
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+      try:
+        os.makedirs(directory)
+      except OSError as e:
+        if e.errno != errno.EEXIST:
+          raise
+
+    if move and not self.compress:
+      try:
+        os.chmod(filepath, 0o444)
+        os.rename(filepath, path)
+        return path
+      except OSError as e:
+        # Moving between filesystems is a copy, made below
+        if e.errno != errno.EXDEV:
+          raise
+
+    handle, temp_path = tempfile.mkstemp(dir=self.temp_dir)
+    try:
+      temp_fileobj = os.fdopen(handle, "wb")
+      try:
+        if self.compress:
+          _compress_into(filepath, temp_fileobj)
+        elif not _reflink(filepath, temp_fileobj):
+          _copy_into(filepath, temp_fileobj)
+      finally:
+        temp_fileobj.close()
+      os.chmod(temp_path, 0o444)
+      os.rename(temp_path, path)
+    finally:
+      # Only left behind if the blob could not be written
+      if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    if move:
+      os.remove(filepath)
+    return path
+
+
+  def link_to(self, blob_path, filepath):
+    """
+    <Purpose>
+      Makes a stored blob available at another path (e.g. as "out" in the
+      run's output directory), by hardlinking it where possible and copying
+      it otherwise. Any file already at that path is replaced.
+
+    <Arguments>
+      blob_path:
+        The path of an uncompressed blob, as returned by add_file().
+
+      filepath:
+        The path at which the blob should appear.
+
+    <Exceptions>
+      IOError or OSError, if the blob cannot be linked or copied.
+
+    <Return>
+      None.
+    """
+
+    if os.path.lexists(filepath):
+      os.remove(filepath)
+    try:
+      os.link(blob_path, filepath)
+    except OSError:
+      shutil.copyfile(blob_path, filepath)
+
+
+def open_blob(path):
+  """
+  <Purpose>
+    Opens a stored blob (or any captured file) for reading its uncompressed
+    contents, decompressing it if it is a compressed blob.
+
+  <Arguments>
+    path:
+      The path of the blob.
+
+  <Exceptions>
+    IOError, if the blob cannot be opened.
+
+  <Return>
+    A binary file object, which supports seek().
+  """
+
+  if path.endswith(COMPRESSED_SUFFIX):
+    import gzip
+    return gzip.open(path, "rb")
+  return open(path, "rb")
+
+
+def _compress_into(filepath, fileobj):
+  # Streams the file through gzip into the given file object.
+  import gzip
+  src_fileobj = open(filepath, "rb")
+  try:
+    # The name and timestamp are left out, so that a blob depends only on
+    # its contents
+    gzip_fileobj = gzip.GzipFile(filename="", mode="wb", fileobj=fileobj, mtime=0)
+    try:
+      _copy_stream(src_fileobj, gzip_fileobj)
+    finally:
+      gzip_fileobj.close()
+  finally:
+    src_fileobj.close()
+
+
+def _copy_into(filepath, fileobj):
+  # Streams the file into the given file object.
+  src_fileobj = open(filepath, "rb")
+  try:
+    _copy_stream(src_fileobj, fileobj)
+  finally:
+    src_fileobj.close()
+
+
+def _copy_stream(src_fileobj, dst_fileobj):
+  while True:
+    data = src_fileobj.read(COPY_CHUNK_SIZE)
+    if not data:
+      break
+    dst_fileobj.write(data)
+
+
+def _reflink(filepath, fileobj):
+  # Clones the file's contents into the given (empty) file object without
+  # copying them, returning False if the platform or filesystem cannot.
+  try:
+    import fcntl
+  except ImportError:
+    return False
+  src_fileobj = open(filepath, "rb")
+  try:
+    fcntl.ioctl(fileobj.fileno(), FICLONE, src_fileobj.fileno())
+    return True
+  except (IOError, OSError):
+    return False
+  finally:
+    src_fileobj.close()
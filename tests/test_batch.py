@@ -0,0 +1,106 @@
+"""
+<Program Name>
+  test_batch.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for batch.py
+"""
+
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import batch
+
+DEFAULT_POLICY_FILEPATH = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))), "default_policy.json")
+
+
+class TestBatchMethods(unittest.TestCase):
+
+  def setUp(self):
+    # Jobs run in the current directory, which also holds the keystore.
+    self.old_cwd = os.getcwd()
+    self.temp_dir = tempfile.mkdtemp()
+    os.chdir(self.temp_dir)
+
+
+  def tearDown(self):
+    os.chdir(self.old_cwd)
+    shutil.rmtree(self.temp_dir)
+
+
+  def write_manifest(self, manifest):
+    fileobj = open("manifest.json", "w")
+    json.dump(manifest, fileobj)
+    fileobj.close()
+    return "manifest.json"
+
+
+  def test_load_manifest(self):
+    jobs = batch.load_manifest(self.write_manifest({"jobs": [
+        {"name": "build", "command": "make"}, {"command": "make test", "input": "in.txt"}]}))
+    self.assertEqual([job["name"] for job in jobs], ["build", "job-2"])
+
+    args = batch.job_command_line(jobs[1], "out-dir")
+    self.assertEqual(args[-1], "make test")
+    self.assertEqual(args[args.index("--input") + 1], "in.txt")
+    self.assertEqual(args[args.index("--output-dir") + 1], "out-dir")
+    self.assertFalse("--policy" in args)
+
+    for manifest in [{}, {"jobs": []}, {"jobs": [{"name": "build"}]},
+        {"jobs": [{"name": "a", "command": "x"}, {"name": "a", "command": "y"}]},
+        {"jobs": [{"name": "../a", "command": "x"}]}]:
+      self.assertRaises(batch.ManifestError, batch.load_manifest, self.write_manifest(manifest))
+
+
+  def test_run_batch(self):
+    # Every job gets its own directory and metadata, and a job failing its
+    # policy does not stop the others.
+    fileobj = open(DEFAULT_POLICY_FILEPATH)
+    strict_policy = json.load(fileobj)
+    fileobj.close()
+    strict_policy["constraints"]["return_code"] = 0
+    fileobj = open("strict_policy.json", "w")
+    json.dump(strict_policy, fileobj)
+    fileobj.close()
+
+    jobs = batch.load_manifest(self.write_manifest({"jobs": [
+        {"name": "one", "command": "echo one"},
+        {"name": "two", "command": "echo two; exit 3", "policy": "strict_policy.json"},
+        {"name": "three", "command": "echo three"}]}))
+    reported = []
+    results = batch.run_batch(jobs, "output", 2, reported.append)
+
+    self.assertEqual([result[0] for result in results], ["one", "two", "three"])
+    self.assertEqual(sorted(reported), sorted(results))
+    self.assertEqual([result[1] == 0 for result in results], [True, False, True])
+    for name in ["one", "three"]:
+      output_dir = os.path.join(self.temp_dir, "output", name)
+      fileobj = open(os.path.join(output_dir, "out"))
+      self.assertEqual(fileobj.read(), name + "\n")
+      fileobj.close()
+      fileobj = open(os.path.join(output_dir, "metadata.json"))
+      metadata = json.load(fileobj)
+      fileobj.close()
+      self.assertEqual(metadata["application"]["output_path"], os.path.join(output_dir, "out"))
+    self.assertFalse(os.path.exists(os.path.join("output", "two", "metadata.json")))
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
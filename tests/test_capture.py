@@ -0,0 +1,235 @@
+"""
+<Program Name>
+  test_capture.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for capture.py
+"""
+
+import unittest
+import subprocess
+import sys
+import os
+import io
+import time
+import capture
+
+# Writes 'count' copies of a line to stdout and a shorter run to stderr
+CHILD_SCRIPT = (
+    "import sys\n"
+    "count = int(sys.argv[1])\n"
+    "for i in range(count):\n"
+    "  sys.stdout.write('line %d of stdout\\n' % i)\n"
+    "  if i % 10 == 0:\n"
+    "    sys.stderr.write('line %d of stderr\\n' % i)\n"
+    "sys.exit(3)\n")
+
+
+class TestCaptureMethods(unittest.TestCase):
+
+  def run_child(self, count, chunk_size=capture.CHUNK_SIZE):
+    process = subprocess.Popen([sys.executable, "-c", CHILD_SCRIPT, str(count)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout_sink = io.BytesIO()
+    stderr_sink = io.BytesIO()
+    return_code = capture.capture_process(process, [stdout_sink],
+        [stderr_sink], chunk_size)
+    return return_code, stdout_sink.getvalue(), stderr_sink.getvalue()
+
+
+  def test_capture_process(self):
+    # Both streams must be captured in full, in order, along with the
+    # return code.
+    return_code, stdout, stderr = self.run_child(100)
+    self.assertEqual(return_code, 3)
+    expected_stdout = "".join("line %d of stdout\n" % i for i in range(100))
+    expected_stderr = "".join("line %d of stderr\n" % i for i in range(0, 100, 10))
+    self.assertEqual(stdout, expected_stdout.encode("ascii"))
+    self.assertEqual(stderr, expected_stderr.encode("ascii"))
+
+
+  def test_capture_larger_than_pipe_buffer(self):
+    # Output well past the pipe buffer on both streams must not deadlock,
+    # and small chunks must not lose or reorder data.
+    return_code, stdout, stderr = self.run_child(50000, chunk_size=512)
+    self.assertEqual(return_code, 3)
+    self.assertEqual(stdout.count(b"\n"), 50000)
+    self.assertEqual(stderr.count(b"\n"), 5000)
+    self.assertTrue(stdout.endswith(b"line 49999 of stdout\n"))
+
+
+  def test_sink_error_is_raised(self):
+    # A failing sink must be reported to the caller rather than silently
+    # truncating the capture, and must not leave the child blocked.
+    class FailingSink(object):
+      def write(self, data):
+        raise IOError("disk full")
+
+    process = subprocess.Popen([sys.executable, "-c", CHILD_SCRIPT, "50000"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    self.assertRaises(IOError, capture.capture_process, process,
+        [FailingSink()], [io.BytesIO()])
+    self.assertEqual(process.returncode, 3)
+
+
+  def test_abort(self):
+    # Triggering the abort from a sink must terminate the whole process
+    # group, including children of the shell, and record the reason.
+    class AbortingSink(object):
+      def __init__(self, abort):
+        self.abort = abort
+      def write(self, data):
+        if b"ready" in data:
+          self.abort.trigger("saw ready")
+
+    abort = capture.Abort()
+    process = subprocess.Popen("echo ready; sleep 30; echo done", shell=True,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, preexec_fn=os.setpgrp)
+    stdout_sink = io.BytesIO()
+    start = time.time()
+    return_code = capture.capture_process(process,
+        [stdout_sink, AbortingSink(abort)], [io.BytesIO()], abort=abort)
+    self.assertTrue(time.time() - start < 10)
+    self.assertNotEqual(return_code, 0)
+    self.assertEqual(stdout_sink.getvalue(), b"ready\n")
+    self.assertEqual(abort.reason, "saw ready")
+
+    # Later triggers keep the first reason
+    abort.trigger("another reason")
+    self.assertEqual(abort.reason, "saw ready")
+
+
+  def test_timeout(self):
+    # A command overrunning its timeout is terminated, and one ignoring
+    # SIGTERM is killed once the grace period has passed.
+    for command, grace in [("echo started; sleep 30", 5),
+        ("trap '' TERM; echo started; sleep 30", 0.5)]:
+      abort = capture.Abort()
+      process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE,
+          stderr=subprocess.PIPE, preexec_fn=os.setpgrp)
+      stdout_sink = io.BytesIO()
+      start = time.time()
+      return_code = capture.capture_process(process, [stdout_sink],
+          [io.BytesIO()], abort=abort, timeout=0.5, kill_grace=grace)
+      self.assertTrue(time.time() - start < 5)
+      self.assertNotEqual(return_code, 0)
+      self.assertEqual(stdout_sink.getvalue(), b"started\n")
+      self.assertTrue(abort.timed_out)
+      self.assertEqual(abort.reason, "timeout of 0.5 seconds reached")
+
+
+  def test_supervise_many(self):
+    # A single supervisor drains several processes at once, each into its
+    # own sinks, and only times out the one which overruns.
+    supervisor = capture.Supervisor(chunk_size=512)
+    supervised = []
+    for count in [100, 20000, 500]:
+      process = subprocess.Popen([sys.executable, "-c", CHILD_SCRIPT, str(count)],
+          stdout=subprocess.PIPE, stderr=subprocess.PIPE, preexec_fn=os.setpgrp)
+      sinks = (io.BytesIO(), io.BytesIO())
+      supervised.append((count, sinks, supervisor.add(process, [sinks[0]], [sinks[1]], timeout=30)))
+    process = subprocess.Popen("sleep 30", shell=True, stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, preexec_fn=os.setpgrp)
+    sleeper = supervisor.add(process, [], [], timeout=0.5)
+
+    start = time.time()
+    supervisor.run()
+    self.assertTrue(time.time() - start < 10)
+    for count, sinks, child in supervised:
+      self.assertEqual(child.return_code, 3)
+      self.assertFalse(child.abort.timed_out)
+      self.assertEqual(sinks[0].getvalue().count(b"\n"), count)
+      self.assertEqual(sinks[1].getvalue().count(b"\n"), (count + 9) // 10)
+    self.assertTrue(sleeper.abort.timed_out)
+    self.assertNotEqual(sleeper.return_code, 0)
+
+
+  def test_quick_exit(self):
+    # A command which exits at once is reaped at once, rather than after a
+    # poll interval, whether or not it has a timeout.
+    for timeout in [None, 30]:
+      start = time.time()
+      for i in range(10):
+        process = subprocess.Popen(["true"], stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, preexec_fn=os.setpgrp)
+        self.assertEqual(capture.capture_process(process, [], [], timeout=timeout), 0)
+      self.assertTrue(time.time() - start < 10 * capture.POLL_INTERVAL / 2)
+
+
+  def test_resource_usage(self):
+    # The child is reaped with its resource usage, all recorded as integers,
+    # and Popen's return code still matches.
+    script = ("import time\n"
+        "data = bytearray(64 * 1024 * 1024)\n"
+        "end = time.time() + 0.3\n"
+        "while time.time() < end:\n"
+        "  pass\n")
+    process = subprocess.Popen([sys.executable, "-c", script],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    usage = dict()
+    return_code = capture.capture_process(process, [], [], resource_usage=usage)
+    self.assertEqual(return_code, 0)
+    self.assertEqual(process.returncode, 0)
+    self.assertEqual(sorted(usage.keys()), sorted(["wall_time_ms"] +
+        [field for field, attribute in capture.RUSAGE_FIELDS]))
+    for value in usage.values():
+      self.assertTrue(isinstance(value, int))
+    self.assertTrue(usage["wall_time_ms"] >= 300)
+    self.assertTrue(usage["user_cpu_ms"] + usage["system_cpu_ms"] >= 150)
+    self.assertTrue(usage["max_rss_kb"] >= 64 * 1024)
+
+    # A trivial command's wall time is that of the command, not of the
+    # supervisor's polling.
+    for timeout in [None, 30]:
+      process = subprocess.Popen(["true"], stdout=subprocess.PIPE,
+          stderr=subprocess.PIPE, preexec_fn=os.setpgrp)
+      usage = dict()
+      capture.capture_process(process, [], [], timeout=timeout, resource_usage=usage)
+      self.assertTrue(usage["wall_time_ms"] < 50, usage)
+
+
+  def test_head_tail_sink(self):
+    # Only the head and tail of the stream are written, however the writes
+    # fall across them, and every other byte is counted as dropped.
+    data = b"".join(b"line %d\n" % i if sys.version_info >= (3, 5) else "line %d\n" % i
+        for i in range(1000))
+    for head_bytes, tail_bytes in [(100, 200), (0, 50), (100, 0), (len(data), 10)]:
+      for write_size in [1, 7, 4096]:
+        fileobj = io.BytesIO()
+        sink = capture.HeadTailSink(fileobj, head_bytes, tail_bytes)
+        for start in range(0, len(data), write_size):
+          sink.write(data[start:start + write_size])
+        sink.close()
+        expected = data
+        if len(data) > head_bytes + tail_bytes:
+          expected = data[:head_bytes] + data[len(data) - tail_bytes:]
+        self.assertEqual(fileobj.getvalue(), expected)
+        self.assertEqual(sink.dropped_bytes, len(data) - len(expected))
+        self.assertEqual(sink.bytes_written, len(data))
+
+    # The ring holds at most the tail, as captured from a real process.
+    process = subprocess.Popen([sys.executable, "-c", CHILD_SCRIPT, "20000"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    fileobj = io.BytesIO()
+    sink = capture.HeadTailSink(fileobj, 17, 21)
+    capture.capture_process(process, [sink], [], chunk_size=512)
+    sink.close()
+    self.assertEqual(fileobj.getvalue(), b"line 0 of stdout\nline 19999 of stdout\n")
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
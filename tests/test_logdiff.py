@@ -0,0 +1,101 @@
+"""
+<Program Name>
+  test_logdiff.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for logdiff.py
+"""
+
+import unittest
+import hashlib
+import os
+import shutil
+import tempfile
+import logdiff
+import wordlists
+
+WORD_LISTS = {"success": ["passed"], "failure": ["error", "failed"], "warning": ["deprecated"]}
+
+
+class TestLogDiffMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.matcher = wordlists.WordListMatcher(WORD_LISTS)
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def write_run(self, name, lines):
+    data = "".join(line + "\n" for line in lines).encode("utf-8")
+    filepath = os.path.join(self.temp_dir, name)
+    fileobj = open(filepath, "wb")
+    fileobj.write(data)
+    fileobj.close()
+    return {"application": {"output_path": filepath,
+      "output_hashes": {"sha256": hashlib.sha256(data).hexdigest()},
+      "err_path": filepath, "err_hashes": {"sha256": hashlib.sha256(data).hexdigest()}}}
+
+
+  def test_iter_chunks(self):
+    lines = ["line %d" % i for i in range(5000)]
+    metadata = self.write_run("out", lines)
+    chunks = list(logdiff.iter_chunks(metadata["application"]["output_path"]))
+    self.assertTrue(len(chunks) > 10)
+    self.assertEqual([line.decode("utf-8") for digest, line_number, offset, chunk in chunks
+        for line in chunk], lines)
+    self.assertEqual(chunks[-1][1] + len(chunks[-1][3]), 5001)
+
+    # Chunking does not depend on how the file is read.
+    read_size = logdiff.READ_SIZE
+    logdiff.READ_SIZE = 100
+    try:
+      self.assertEqual(list(logdiff.iter_chunks(metadata["application"]["output_path"])), chunks)
+    finally:
+      logdiff.READ_SIZE = read_size
+
+
+  def test_compare(self):
+    body = ["step %d passed" % i for i in range(20000)]
+    old_lines = body[:5000] + ["warning: api deprecated"] + body[5000:] + ["error: flaky"]
+    new_lines = (body[:100] + ["inserted line"] + body[100:12000] +
+        ["error: test_io failed", "error: flaky"] + body[12000:])
+    old_metadata = self.write_run("old", old_lines)
+    new_metadata = self.write_run("new", new_lines)
+
+    report = logdiff.compare(old_metadata, new_metadata, self.matcher, ["out"])
+    self.assertEqual(list(report), ["out"])
+    self.assertFalse(report["out"]["identical"])
+    self.assertEqual(report["out"]["added"], [{"line_number": 12002,
+        "line": "error: test_io failed", "categories": ["failure"]}])
+    self.assertEqual(report["out"]["removed"], [{"line_number": 5001,
+        "line": "warning: api deprecated", "categories": ["warning"]}])
+
+    # Streams with the same digest are not read.
+    identical_metadata = self.write_run("copy", old_lines)
+    os.remove(identical_metadata["application"]["output_path"])
+    report = logdiff.compare(old_metadata, identical_metadata, self.matcher)
+    self.assertTrue(report["out"]["identical"] and report["err"]["identical"])
+
+    self.assertRaises(logdiff.LogDiffError, logdiff.compare, old_metadata,
+        {"application": {}}, self.matcher)
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
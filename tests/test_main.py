@@ -0,0 +1,96 @@
+"""
+<Program Name>
+  test_main.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for main.py
+"""
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import time
+import capture
+import main
+
+# Prints the process group of the command and whatever it reads from stdin
+GROUP_SCRIPT = (
+    "import os, sys\n"
+    "sys.stdout.write('%d\\n' % os.getpgrp())\n"
+    "sys.stdout.write(sys.stdin.read())\n")
+
+
+class TestMainMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.stdout_filepath = os.path.join(self.temp_dir, "out")
+    self.stderr_filepath = os.path.join(self.temp_dir, "err")
+    self.input_filepath = os.path.join(self.temp_dir, "in")
+    fileobj = open(self.input_filepath, "w")
+    fileobj.write("from input\n")
+    fileobj.close()
+    self.command = "\"%s\" -c \"%s\"" % (sys.executable, GROUP_SCRIPT.replace("\"", "\\\""))
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def read_stdout(self):
+    fileobj = open(self.stdout_filepath)
+    lines = fileobj.read().splitlines()
+    fileobj.close()
+    return int(lines[0]), lines[1:]
+
+
+  def test_exec_cmd_process_group(self):
+    # Without a way to terminate it early, the command stays in toto's
+    # process group, where it may use the terminal.
+    return_code = main.exec_cmd(self.command, self.input_filepath,
+        self.stdout_filepath, self.stderr_filepath)
+    self.assertEqual(return_code, 0)
+    self.assertEqual(self.read_stdout(), (os.getpgrp(), ["from input"]))
+
+    # Otherwise it leads its own group, reading the input if there is one
+    # and /dev/null rather than the terminal if not.
+    main.exec_cmd(self.command, self.input_filepath, self.stdout_filepath,
+        self.stderr_filepath, process_group=True)
+    process_group, lines = self.read_stdout()
+    self.assertNotEqual(process_group, os.getpgrp())
+    self.assertEqual(lines, ["from input"])
+    main.exec_cmd(self.command, None, self.stdout_filepath,
+        self.stderr_filepath, process_group=True)
+    self.assertEqual(self.read_stdout()[1], [])
+
+
+  def test_exec_cmd_timeout_in_callers_group(self):
+    # A command sharing toto's process group is still terminated on its own
+    # when its timeout passes.
+    abort = capture.Abort()
+    start = time.time()
+    return_code = main.exec_cmd("exec sleep 30", None, self.stdout_filepath,
+        self.stderr_filepath, abort=abort, timeout=0.5)
+    self.assertTrue(time.time() - start < 5)
+    self.assertNotEqual(return_code, 0)
+    self.assertTrue(abort.timed_out)
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,99 @@
+"""
+<Program Name>
+  test_materials.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for materials.py
+"""
+
+import unittest
+import hashlib
+import os
+import shutil
+import tempfile
+import materials
+
+
+class TestMaterialsMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.src_dir = os.path.join(self.temp_dir, "src")
+    os.makedirs(os.path.join(self.src_dir, "lib"))
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def write_file(self, path, data, age=60):
+    fileobj = open(path, "wb")
+    fileobj.write(data)
+    fileobj.close()
+    # Files are backdated so that the index trusts their mtime
+    mtime = os.stat(path).st_mtime - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+  def test_snapshot(self):
+    main_filepath = self.write_file(os.path.join(self.src_dir, "main.cpp"), b"int main;")
+    self.write_file(os.path.join(self.src_dir, "lib", "util.h"), b"#pragma once")
+    excluded_filepath = self.write_file(os.path.join(self.src_dir, "out"), b"log")
+
+    for jobs in [1, 4]:
+      snapshot = materials.snapshot([self.src_dir], jobs=jobs, exclude_paths=[excluded_filepath])
+      self.assertEqual(sorted(snapshot), [os.path.join(self.src_dir, "lib", "util.h"), main_filepath])
+      self.assertEqual(snapshot[main_filepath]["sha256"], hashlib.sha256(b"int main;").hexdigest())
+
+    # A single file may be declared, and a missing path has no files.
+    self.assertEqual(list(materials.snapshot([main_filepath, os.path.join(self.temp_dir, "missing")])),
+        [main_filepath])
+
+
+  def test_stat_index(self):
+    main_filepath = self.write_file(os.path.join(self.src_dir, "main.cpp"), b"int main;")
+    index_filepath = os.path.join(self.temp_dir, "index.json")
+    index = materials.StatIndex(index_filepath)
+    stats = dict()
+    materials.snapshot([self.src_dir], index, stats=stats)
+    self.assertEqual((stats["files"], stats["hashed"]), (1, 1))
+    index.save()
+
+    # An unchanged file is not hashed again, even by a later run.
+    index = materials.StatIndex(index_filepath)
+    materials.snapshot([self.src_dir], index, stats=stats)
+    self.assertEqual((stats["files"], stats["hashed"]), (1, 0))
+
+    # A changed file is, and a removed one is forgotten.
+    self.write_file(main_filepath, b"int main();", age=30)
+    snapshot = materials.snapshot([self.src_dir], index, stats=stats)
+    self.assertEqual(stats["hashed"], 1)
+    self.assertEqual(snapshot[main_filepath]["sha256"], hashlib.sha256(b"int main();").hexdigest())
+    os.remove(main_filepath)
+    materials.snapshot([self.src_dir], index)
+    self.assertEqual(index.entries, dict())
+
+    # A file modified just now is not indexed, since it could change again
+    # within the same mtime.
+    self.write_file(main_filepath, b"int main;", age=0)
+    materials.snapshot([self.src_dir], index)
+    self.assertEqual(index.entries, dict())
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
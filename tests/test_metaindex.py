@@ -0,0 +1,106 @@
+"""
+<Program Name>
+  test_metaindex.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for metaindex.py
+"""
+
+import unittest
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import metaindex
+
+
+def make_metadata(timestamp, release, return_code, err_failures):
+  results = lambda failures: {"failure": {"count": failures, "instances": []},
+    "success": {"count": 0, "instances": []}, "warning": {"count": 0, "instances": []}}
+  return {
+    "variables": {"timestamp": timestamp, "hostname": "builder", "cpu_arch": "x86_64",
+      "user": "toto", "os": {"kernel": "Linux", "release": release, "version": "#1"}},
+    "application": {"command": "make test", "return_code": return_code,
+      "terminated_early": False, "err_hashes": {"sha256": "ab" * 32}},
+    "output_data": results(0),
+    "err_data": results(err_failures)
+  }
+
+
+class TestMetaIndexMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.connection = metaindex.open_index(os.path.join(self.temp_dir, "index.sqlite"))
+
+
+  def tearDown(self):
+    self.connection.close()
+    shutil.rmtree(self.temp_dir)
+
+
+  def write_run(self, name, metadata):
+    run_dir = os.path.join(self.temp_dir, "runs", name)
+    if not os.path.isdir(run_dir):
+      os.makedirs(run_dir)
+    fileobj = open(os.path.join(run_dir, "metadata.json"), "w")
+    json.dump(metadata, fileobj)
+    fileobj.close()
+
+
+  def test_ingest(self):
+    runs_dir = os.path.join(self.temp_dir, "runs")
+    self.write_run("a", make_metadata("2026-10-10 08:00:00.000000", "6.8.0", 0, 0))
+    self.write_run("b", make_metadata("2026-10-12 08:00:00.000000", "6.8.0", 2, 3))
+    self.assertEqual(metaindex.ingest(self.connection, [runs_dir]), (2, 0, []))
+
+    # Only new and changed files are read again; broken ones are reported.
+    self.write_run("c", make_metadata("2026-10-14 08:00:00.000000", "6.9.1", 1, 1))
+    self.write_run("b", make_metadata("2026-10-12 08:00:00.000000", "6.8.0", 2, 30))
+    fileobj = open(os.path.join(runs_dir, "broken.json"), "w")
+    fileobj.write("{")
+    fileobj.close()
+    ingested, unchanged, errors = metaindex.ingest(self.connection,
+        [runs_dir, os.path.join(runs_dir, "broken.json")])
+    self.assertEqual((ingested, unchanged, len(errors)), (2, 1, 1))
+    self.assertEqual(self.connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0], 3)
+    self.assertEqual(self.connection.execute("SELECT COUNT(*) FROM counts").fetchone()[0], 18)
+
+    runs = metaindex.query(self.connection, has=[("err", "failure")])
+    self.assertEqual([run["timestamp"][:10] for run in runs], ["2026-10-14", "2026-10-12"])
+    self.assertEqual(runs[1]["counts"]["err:failure"], 30)
+    self.assertEqual(runs[1]["terminated_early"], 0)
+
+    runs = metaindex.query(self.connection, release="6.8.0", failed=True,
+        since=metaindex.parse_time("2026-10-11"))
+    self.assertEqual([run["return_code"] for run in runs], [2])
+    self.assertEqual(metaindex.query(self.connection, command="make", verified=True), [])
+    self.assertRaises(metaindex.MetadataIndexError, metaindex.query, self.connection,
+        has=[("in", "failure")])
+
+
+  def test_parse_time(self):
+    now = datetime.datetime(2026, 10, 18, 12, 0, 0)
+    self.assertEqual(metaindex.parse_time("7d", now), "2026-10-11 12:00:00")
+    self.assertEqual(metaindex.parse_time("90m", now), "2026-10-18 10:30:00")
+    self.assertEqual(metaindex.parse_time("2026-10-11 08:00"), "2026-10-11 08:00:00")
+    self.assertRaises(metaindex.MetadataIndexError, metaindex.parse_time, "last week")
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,165 @@
+"""
+<Program Name>
+  test_policy.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for policy.py
+"""
+
+import unittest
+import copy
+import json
+import os
+import shutil
+import tempfile
+import policy
+import wordlists
+
+DEFAULT_POLICY_FILEPATH = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))), "default_policy.json")
+
+
+class TestPolicyMethods(unittest.TestCase):
+
+  def setUp(self):
+    fileobj = open(DEFAULT_POLICY_FILEPATH)
+    self.policy_dict = json.load(fileobj)
+    fileobj.close()
+    self.metadata = {
+      "variables": {"cpu_arch": "x86_64",
+          "os": {"kernel": "Linux", "release": "4.2.0", "version": "#1 SMP"}},
+      "application": {"command": "make -j4", "return_code": 0}
+    }
+
+
+  def test_default_policy(self):
+    # The default policy sets no constraints, so every check passes.
+    default_policy = policy.Policy(self.policy_dict)
+    default_policy.check_pre_run(self.metadata, "make -j4")
+    default_policy.check_post_run(self.metadata)
+    self.assertEqual(default_policy.word_lists, self.policy_dict["supplied_data"]["word_lists"])
+
+
+  def test_pre_run_constraints(self):
+    self.policy_dict["constraints"]["cpu_arch"] = "x86_64"
+    self.policy_dict["constraints"]["os"]["kernel"] = "Linux"
+    self.policy_dict["constraints"]["command_flags"] = ["-j4"]
+    policy.Policy(self.policy_dict).check_pre_run(self.metadata, "make -j4")
+
+    wrong_arch = copy.deepcopy(self.policy_dict)
+    wrong_arch["constraints"]["cpu_arch"] = "armv7l"
+    self.assertRaises(policy.PolicyConstraintException,
+        policy.Policy(wrong_arch).check_pre_run, self.metadata, "make -j4")
+
+    # A missing flag is caught from the command alone, before it is run.
+    self.assertRaises(policy.PolicyConstraintException,
+        policy.Policy(self.policy_dict).check_pre_run, self.metadata, "make")
+
+
+  def test_post_run_constraints(self):
+    # The return code is read from the application section, and a
+    # constraint of 0 is still enforced.
+    self.policy_dict["constraints"]["return_code"] = 0
+    checked_policy = policy.Policy(self.policy_dict)
+    checked_policy.check_pre_run(self.metadata, "make -j4")
+    checked_policy.check_post_run(self.metadata)
+    self.metadata["application"]["return_code"] = 2
+    self.assertRaises(policy.PolicyConstraintException,
+        checked_policy.check_post_run, self.metadata)
+
+
+  def test_threshold_constraints(self):
+    self.policy_dict["constraints"]["max_output_bytes"] = 100
+    self.policy_dict["constraints"]["max_counts"]["err_data"]["warning"] = 0
+    checked_policy = policy.Policy(self.policy_dict)
+    self.metadata["application"]["output_size"] = 100
+    self.metadata["err_data"] = {"warning": {"count": 0, "instances": []}}
+    checked_policy.check_post_run(self.metadata)
+
+    # Every violated constraint is reported, not just the first.
+    self.metadata["application"]["output_size"] = 101
+    self.metadata["err_data"]["warning"]["count"] = 3
+    try:
+      checked_policy.check_post_run(self.metadata)
+      self.fail("no PolicyConstraintException raised")
+    except policy.PolicyConstraintException as e:
+      messages = e.value.split("\n")
+      self.assertEqual(len(messages), 2)
+      self.assertTrue("max_output_bytes" in messages[0])
+      self.assertTrue("err_data warning" in messages[1])
+
+
+  def test_forbidden_line_patterns(self):
+    self.policy_dict["constraints"]["forbidden_line_patterns"] = ["segmentation fault", "^FATAL"]
+    checked_policy = policy.Policy(self.policy_dict)
+    word_lists = {"success": [], "failure": ["error", "fatal", "fault"], "warning": []}
+    lines = [b"build started\n", b"error: segmentation fault\n", b"FATAL error\n"]
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+      filename = os.path.join(temp_dir, "out")
+      fileobj = open(filename, "wb")
+      fileobj.write(b"".join(lines))
+      fileobj.close()
+      self.metadata["application"]["output_path"] = filename
+
+      # Both instance modes give the same violations; reference-mode lines
+      # are read back from the captured file.
+      for instance_mode in wordlists.INSTANCE_MODES:
+        matcher = wordlists.WordListMatcher(word_lists, instance_mode)
+        self.metadata["output_data"] = matcher.scan_file(filename)
+        try:
+          checked_policy.check_post_run(self.metadata)
+          self.fail("no PolicyConstraintException raised")
+        except policy.PolicyConstraintException as e:
+          messages = e.value.split("\n")
+          self.assertEqual(len(messages), 2)
+          self.assertTrue("\"segmentation fault\" found on line 2" in messages[0])
+          self.assertTrue("\"^FATAL\" found on line 3" in messages[1])
+
+      # Overlapping patterns are each reported, and numbered backreferences
+      # keep their meaning.
+      fileobj = open(filename, "ab")
+      fileobj.write(b"fatal fatal\n")
+      fileobj.close()
+      self.policy_dict["constraints"]["forbidden_line_patterns"] = ["error", "err.*fault", r"(\w+) \1"]
+      self.metadata["output_data"] = wordlists.WordListMatcher(word_lists).scan_file(filename)
+      try:
+        policy.Policy(self.policy_dict).check_post_run(self.metadata)
+        self.fail("no PolicyConstraintException raised")
+      except policy.PolicyConstraintException as e:
+        messages = e.value.split("\n")
+        self.assertEqual(len(messages), 3)
+        self.assertTrue("\"error\" found on line 2" in messages[0])
+        self.assertTrue("\"err.*fault\" found on line 2" in messages[1])
+        self.assertTrue("found on line 4" in messages[2])
+    finally:
+      shutil.rmtree(temp_dir)
+
+    invalid = copy.deepcopy(self.policy_dict)
+    invalid["constraints"]["forbidden_line_patterns"] = ["("]
+    self.assertRaises(policy.PolicyConstraintException, policy.Policy, invalid)
+
+    # Capped instances could hide forbidden lines, so the two cannot be
+    # combined.
+    capped = copy.deepcopy(self.policy_dict)
+    capped["execution"] = {"max_instances_per_category": 10}
+    self.assertRaises(policy.PolicyConstraintException, policy.Policy, capped)
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
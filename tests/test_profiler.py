@@ -0,0 +1,103 @@
+"""
+<Program Name>
+  test_profiler.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for profiler.py
+"""
+
+import unittest
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import profiler
+
+
+class TestProfilerMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def run_phases(self, run_profile):
+    with run_profile.phase("first") as record:
+      time.sleep(0.05)
+      record["bytes"] = 1234
+    with run_profile.phase("second"):
+      sorted(range(100000), key=lambda x: -x)
+
+
+  def test_phases(self):
+    # Phases are recorded in order, with their time, bytes and memory.
+    run_profile = profiler.Profiler()
+    self.run_phases(run_profile)
+    profile = run_profile.to_dict()
+    self.assertEqual([record["name"] for record in profile["phases"]], ["first", "second"])
+    first = profile["phases"][0]
+    self.assertTrue(first["seconds"] >= 0.04)
+    self.assertEqual(first["bytes"], 1234)
+    self.assertEqual(profile["phases"][1]["bytes"], None)
+    self.assertTrue(first["peak_rss_kb"] > 0)
+    self.assertTrue(profile["total_seconds"] >= first["seconds"])
+    self.assertEqual(run_profile.cprofile, None)
+
+    # A failing phase is still recorded.
+    try:
+      with run_profile.phase("failing"):
+        raise ValueError("failed")
+    except ValueError:
+      pass
+    self.assertEqual(run_profile.phases[-1]["name"], "failing")
+
+
+  def test_report(self):
+    run_profile = profiler.Profiler(cprofile_phase="second")
+    self.run_phases(run_profile)
+    report_filepath = os.path.join(self.temp_dir, "report.txt")
+    fileobj = open(report_filepath, "w")
+    run_profile.write_report(fileobj)
+    fileobj.close()
+    fileobj = open(report_filepath)
+    report = fileobj.read()
+    fileobj.close()
+    lines = report.splitlines()
+    self.assertTrue(lines[1].startswith("first"))
+    self.assertTrue(lines[2].startswith("second"))
+    self.assertTrue("cProfile of phase second:" in report)
+
+    # The sidecar JSON holds the same phases, and the cProfile statistics
+    # are dumped next to it.
+    filepath = os.path.join(self.temp_dir, "profile.json")
+    run_profile.write_json(filepath)
+    fileobj = open(filepath)
+    profile = json.load(fileobj)
+    fileobj.close()
+    self.assertEqual([record["name"] for record in profile["phases"]], ["first", "second"])
+    self.assertEqual(profile["cprofile_stats_path"], filepath + ".pstats")
+    stats = pstats.Stats(profile["cprofile_stats_path"])
+    self.assertTrue(stats.total_calls > 0)
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,177 @@
+"""
+<Program Name>
+  test_runcache.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for runcache.py
+"""
+
+import unittest
+import errno
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import runcache
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+class TestRunCacheMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def write_file(self, name, data):
+    filepath = os.path.join(self.temp_dir, name)
+    fileobj = open(filepath, "w")
+    fileobj.write(data)
+    fileobj.close()
+    return filepath
+
+
+  def test_cache_key(self):
+    key = runcache.cache_key({"command": "make", "input": None, "options": {"a": 1, "b": 2}})
+    self.assertEqual(key, runcache.cache_key({"options": {"b": 2, "a": 1}, "input": None,
+        "command": "make"}))
+    self.assertNotEqual(key, runcache.cache_key({"command": "make test", "input": None,
+        "options": {"a": 1, "b": 2}}))
+
+
+  def test_put_and_get(self):
+    cache = runcache.RunCache(os.path.join(self.temp_dir, "cache"))
+    key = runcache.cache_key({"command": "make"})
+    self.assertEqual(cache.get(key), None)
+
+    metadata_filepath = self.write_file("metadata.json", '{"signed": "..."}')
+    out_filepath = self.write_file("out", "hello\n")
+    entry_dir = cache.put(key, metadata_filepath, {"out": out_filepath,
+        "err": os.path.join(self.temp_dir, "missing")}, {"output_dir": self.temp_dir})
+
+    # A writable file is copied, so that changing it does not change the
+    # entry; missing ones are skipped.
+    hit_entry_dir, info = cache.get(key)
+    self.assertEqual(hit_entry_dir, entry_dir)
+    self.assertEqual(info["output_dir"], self.temp_dir)
+    fileobj = open(out_filepath, "a")
+    fileobj.write("changed\n")
+    fileobj.close()
+    fileobj = open(os.path.join(entry_dir, "out"))
+    self.assertEqual(fileobj.read(), "hello\n")
+    fileobj.close()
+    self.assertEqual(os.stat(os.path.join(entry_dir, "out")).st_mode & 0o222, 0)
+    self.assertFalse(os.path.exists(os.path.join(entry_dir, "err")))
+    self.assertEqual(os.listdir(cache.temp_dir), [])
+
+    # Caching the same run again, e.g. by a concurrent run, keeps one entry.
+    self.assertEqual(cache.put(key, metadata_filepath, {}, {}), entry_dir)
+    self.assertEqual(os.listdir(cache.entries_dir), [key])
+    self.assertEqual(os.listdir(cache.temp_dir), [])
+
+    # A read-only file, such as an artifact store blob, is shared instead.
+    os.chmod(out_filepath, 0o444)
+    other_key = runcache.cache_key({"command": "make test"})
+    other_entry_dir = cache.put(other_key, metadata_filepath, {"out": out_filepath}, {})
+    self.assertEqual(os.stat(os.path.join(other_entry_dir, "out")).st_ino,
+        os.stat(out_filepath).st_ino)
+
+
+  def test_link_or_copy(self):
+    # Files which cannot be linked, e.g. across filesystems, are copied.
+    src_filepath = self.write_file("src", "hello\n")
+    link = os.link
+    def failing_link(src, dst):
+      raise OSError(errno.EXDEV, "Invalid cross-device link")
+    runcache.os.link = failing_link
+    try:
+      runcache.link_or_copy(src_filepath, os.path.join(self.temp_dir, "dst"))
+    finally:
+      runcache.os.link = link
+    fileobj = open(os.path.join(self.temp_dir, "dst"))
+    self.assertEqual(fileobj.read(), "hello\n")
+    fileobj.close()
+    self.assertNotEqual(os.stat(src_filepath).st_ino,
+        os.stat(os.path.join(self.temp_dir, "dst")).st_ino)
+
+
+  def test_evict(self):
+    metadata_filepath = self.write_file("metadata.json", "x" * 100)
+    cache = runcache.RunCache(os.path.join(self.temp_dir, "cache"), max_bytes=250)
+    keys = [runcache.cache_key({"command": str(i)}) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+      os.utime(cache.put(key, metadata_filepath, {}, {}), (1000 + i, 1000 + i))
+
+    # Using the older entry makes the other one the least recently used.
+    cache.get(keys[0])
+    cache.put(keys[2], metadata_filepath, {}, {})
+    self.assertEqual(sorted(os.listdir(cache.entries_dir)), sorted([keys[0], keys[2]]))
+
+
+  def test_main_cache_hit(self):
+    # A second identical run is answered from the cache without running the
+    # command again.
+    counter_filepath = self.write_file("counter", "")
+    command = "echo run >> %s; echo hello" % counter_filepath
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([PACKAGE_DIR] + [path for path in
+        [os.environ.get("PYTHONPATH")] if path])
+    for output_dir in ["first", "second"]:
+      subprocess.check_call([sys.executable, os.path.join(PACKAGE_DIR, "main.py"),
+          "--cache", "cache", "--output-dir", output_dir, command], cwd=self.temp_dir, env=env)
+      # Changing a run's files afterwards must not change the cached run.
+      fileobj = open(os.path.join(self.temp_dir, "first", "out"), "a")
+      fileobj.write("changed\n")
+      fileobj.close()
+
+    fileobj = open(counter_filepath)
+    self.assertEqual(fileobj.read(), "run\n")
+    fileobj.close()
+    fileobj = open(os.path.join(self.temp_dir, "second", "metadata.json"))
+    metadata = json.load(fileobj)
+    fileobj.close()
+    self.assertEqual(metadata["application"]["output_path"],
+        os.path.join(self.temp_dir, "second", "out"))
+    self.assertTrue(metadata["application"]["cache_hit"])
+    fileobj = open(os.path.join(self.temp_dir, "second", "out"))
+    self.assertEqual(fileobj.read(), "hello\n")
+    fileobj.close()
+
+
+  def test_main_cache_with_products(self):
+    # A run declaring products is not cached, and says so.
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([PACKAGE_DIR] + [path for path in
+        [os.environ.get("PYTHONPATH")] if path])
+    os.mkdir(os.path.join(self.temp_dir, "build"))
+    process = subprocess.Popen([sys.executable, os.path.join(PACKAGE_DIR, "main.py"),
+        "--cache", "cache", "--product", "build", "--output-dir", "run", "echo hello"],
+        cwd=self.temp_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    self.assertEqual(process.returncode, 0, stderr)
+    self.assertTrue(b"--cache is ignored" in stderr)
+    self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "cache")))
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
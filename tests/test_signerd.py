@@ -0,0 +1,78 @@
+"""
+<Program Name>
+  test_signerd.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for signerd.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import canonicaljson as json
+import signing
+import signerd
+
+
+class TestSignerDaemonMethods(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(self):
+    # Run the daemon in a thread, with its own keystore and socket.
+    self.temp_dir = tempfile.mkdtemp()
+    self.socket_path = os.path.join(self.temp_dir, "signer.sock")
+    self.keystore_path = os.path.join(self.temp_dir, "keystore.txt")
+    self.server = signerd.SignerServer(self.socket_path, self.keystore_path)
+    self.thread = threading.Thread(target=self.server.serve_forever)
+    self.thread.daemon = True
+    self.thread.start()
+
+
+  @classmethod
+  def tearDownClass(self):
+    self.server.shutdown()
+    self.server.server_close()
+    shutil.rmtree(self.temp_dir)
+
+
+  def test_sign_documents(self):
+    # A batch comes back signed, in order, with the daemon's key and with
+    # signatures which verify.
+    documents = [{"hostname": "build01", "index": i} for i in range(3)]
+    signed_documents = signerd.sign_documents(documents, self.socket_path)
+    self.assertEqual(len(signed_documents), 3)
+    daemon_keyid = signing.load_or_create_key(self.keystore_path)["keyid"]
+    for i, signed_document in enumerate(signed_documents):
+      self.assertEqual(signed_document["index"], i)
+      self.assertEqual(signed_document["signatures"]["keyid"], daemon_keyid)
+      self.assertEqual(signed_document["signed"]["keyval"]["private"], "")
+      self.assertTrue(signing.verify_json(json.encode_pretty_printed_json(signed_document)))
+
+
+  def test_fallback(self):
+    # Without a daemon, signing happens in this process.
+    missing_socket_path = os.path.join(self.temp_dir, "missing.sock")
+    self.assertRaises(signerd.SignerUnavailableError, signerd.sign_documents,
+        [{"hostname": "build01"}], missing_socket_path)
+    signed_document = signerd.sign_json({"hostname": "build01"}, missing_socket_path)
+    self.assertTrue(signing.verify_json(json.encode_pretty_printed_json(signed_document)))
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
@@ -20,6 +20,10 @@
 """
 
 import unittest
+import copy
+import os
+import shutil
+import tempfile
 import canonicaljson as json
 import tuf
 import tuf.keys
@@ -75,25 +79,50 @@ class TestSigningMethods(unittest.TestCase):
 
 
   def test_keystore(self):
-    # Compare the before/after timestamp of keystore file 
-    # to confirm the file was updated. Also, check at least
-    # one line exists is in the file to validate file write 
-    # occurs.
+    # The key is generated once and then reused, so signing again must 
+    # leave the keystore file untouched and sign with the same key. Also, 
+    # check at least one line exists in the file to validate the file 
+    # was written.
     time1 = utils.get_file_modification_time(KEYFILE)
-    signing.sign_json(test_data["data"].copy())
+    signed_data = signing.sign_json(test_data["data"].copy())
     time2 = utils.get_file_modification_time(KEYFILE)
     count2 = utils.file_line_counter(KEYFILE)
  
-    # Raise an error if the keystore file hasn't updated after signing.
-    self.assertTrue(time1 < time2, "The " + KEYFILE + " file was NOT updated after signing.") 
+    # Raise an error if the keystore file was rewritten by signing.
+    self.assertEqual(time1, time2, "The " + KEYFILE + " file was rewritten after signing.") 
     # Raise an error if the keystore does not contain at least 1 entry 
     # after signing. 
     self.assertTrue(count2 >= 1, "The " + KEYFILE + " file does NOT contain an entry.") 
+    self.assertEqual(signed_data["signatures"]["keyid"], return_data["cdata"]["signatures"]["keyid"], "A new key was used for the second signature.")
 
     # Search the file and make sure that we cannot see the public key.
     found_word = utils.word_found_in_file(KEYFILE, "public")
     self.assertFalse(found_word, "The keystore.txt file contains word 'public'.")
-    
+
+
+  def test_persistent_key(self):
+    # A new process (simulated by clearing the key cache) must load the
+    # existing key from the keystore rather than generate a new one, and 
+    # the cached key must keep its private part after signing.
+    signing._cached_keys.clear()
+    signed_data = signing.sign_json(test_data["data"].copy())
+    self.assertEqual(signed_data["signatures"]["keyid"], return_data["cdata"]["signatures"]["keyid"], "The stored key was not reused.")
+    self.assertTrue(len(signing.load_or_create_key(KEYFILE)["keyval"]["private"]) > 0, "The cached key lost its private key.")
+
+
+  def test_reload_keystore(self):
+    # An existing keystore must load, in any number of later processes,
+    # as the key that was stored in it.
+    temp_dir = tempfile.mkdtemp()
+    try:
+      keystore_filepath = os.path.join(temp_dir, KEYFILE)
+      keyid = signing.load_or_create_key(keystore_filepath)["keyid"]
+      for i in range(2):
+        signing._cached_keys.clear()
+        self.assertEqual(signing.load_or_create_key(keystore_filepath)["keyid"], keyid)
+    finally:
+      shutil.rmtree(temp_dir)
+
 
   def test_verify_json(self):
     # Convert the dictionary to json and pass to verify_json.
@@ -104,7 +133,7 @@ class TestSigningMethods(unittest.TestCase):
 
     # Test the verify_json function to make sure it is correctly 
     # returning valid results when passing in bad data.
-    xdata = return_data["cdata"].copy()
+    xdata = copy.deepcopy(return_data["cdata"])
     xdata["FakeName"] = 'FakeHost'
     json_xdata_string = json.encode_pretty_printed_json(xdata)
     return_verify = signing.verify_json(json_xdata_string)
@@ -112,46 +141,62 @@ class TestSigningMethods(unittest.TestCase):
     self.assertFalse(return_verify, "Verify json test did not return false on invalid data.")
 
     # Delete the name field to revert to normal.  This should return true.
-    xdata = return_data["cdata"].copy()
+    xdata = copy.deepcopy(return_data["cdata"])
     json_xdata_string = json.encode_pretty_printed_json(xdata)
     return_verify = signing.verify_json(json_xdata_string)
     self.assertTrue(return_verify, "JSON reverted back, should return true.")
 
     # Add invalid public key.  This should raise an exception.
-    xdata = return_data["cdata"].copy()
+    xdata = copy.deepcopy(return_data["cdata"])
     xdata["signed"]["keyval"]["public"] = "000234234243adsfadfasd"
     json_xdata_string = json.encode_pretty_printed_json(xdata)
     self.assertRaises(tuf.CryptoError, signing.verify_json, json_xdata_string)
 
-    # Add invalid private key.  This should raise an exception.
-    xdata = return_data["cdata"].copy()
+    # Add invalid private key.  Only the public key is used to verify, so
+    # this must not change the result.
+    xdata = copy.deepcopy(return_data["cdata"])
     xdata["signed"]["keyval"]["private"] = "000234234243adsfadfasd"
     json_xdata_string = json.encode_pretty_printed_json(xdata)
-    self.assertRaises(tuf.CryptoError, signing.verify_json, json_xdata_string)
+    self.assertTrue(signing.verify_json(json_xdata_string), "An unused private key changed the verification result.")
 
     # Add invalid signature sig key.  This should raise an exception.
-    xdata = return_data["cdata"].copy()
+    xdata = copy.deepcopy(return_data["cdata"])
     xdata["signatures"]["sig"] = "000234234243adfadfadbcs"
     json_xdata_string = json.encode_pretty_printed_json(xdata)
     # Raise a format error for the field.  This field should be
     # formatted as:  a-f, A-F, 0-9.
     self.assertRaises(tuf.FormatError, signing.verify_json, json_xdata_string)
-    # Raise an error for an invalid sig field.
+    # A well-formed but wrong sig field must not verify.
     xdata["signatures"]["sig"] = "000234234243adfadfadbc"
     json_xdata_string = json.encode_pretty_printed_json(xdata)
-    self.assertRaises(tuf.CryptoError, signing.verify_json, json_xdata_string)
+    self.assertFalse(signing.verify_json(json_xdata_string), "Verify json test did not return false on an invalid signature.")
 
     # Add invalid signature keyid key.  This should raise an exception.
-    xdata = return_data["cdata"].copy()
+    xdata = copy.deepcopy(return_data["cdata"])
     xdata["signatures"]["keyid"] = "000234234243adfadfadbcs"
     json_xdata_string = json.encode_pretty_printed_json(xdata)
     # Raise a format error for the field.  This field should be
     # formatted as:  a-f, A-F, 0-9.
     self.assertRaises(tuf.FormatError, signing.verify_json, json_xdata_string)
-    # Raise an error for an invalid keyid field.
+    # The keyid only names the key; the signature is checked against the
+    # public key itself, so a well-formed keyid does not change the result.
     xdata["signatures"]["keyid"] = "000234234243adfadfadbc"
     json_xdata_string = json.encode_pretty_printed_json(xdata)
-    self.assertRaises(tuf.CryptoError, signing.verify_json, json_xdata_string)
+    self.assertTrue(signing.verify_json(json_xdata_string), "A well-formed keyid changed the verification result.")
+
+
+  def test_verify_json_with_key_cache(self):
+    # Verifying through a key cache must give the same answers as without
+    # one, for repeated valid documents and for tampered ones.
+    key_cache = signing.PublicKeyCache()
+    json_return_data_string = json.encode_pretty_printed_json(return_data["cdata"])
+    for i in range(3):
+      self.assertTrue(signing.verify_json(json_return_data_string, key_cache), "Verify json with a key cache did not return true on valid data.")
+
+    xdata = copy.deepcopy(return_data["cdata"])
+    xdata["FakeName"] = 'FakeHost'
+    json_xdata_string = json.encode_pretty_printed_json(xdata)
+    self.assertFalse(signing.verify_json(json_xdata_string, key_cache), "Verify json with a key cache did not return false on invalid data.")
 
 
 # Run the unit tests.
@@ -0,0 +1,128 @@
+"""
+<Program Name>
+  test_startup.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for the startup cost of main.py: the heavy modules must only be
+  imported by the phases which need them.
+"""
+
+import unittest
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Modules which no run may import before it gets to the command
+HEAVY_MODULES = ["tuf", "canonicaljson", "signing", "signerd", "socket",
+    "multiprocessing", "subprocess", "capture"]
+
+# Runs main.main() with the given arguments in a fresh interpreter and prints
+# which of the heavy modules it imported
+CHILD_SCRIPT = (
+    "import sys, json\n"
+    "sys.argv = ['main.py'] + json.loads(sys.argv[1])\n"
+    "heavy = json.loads(sys.argv.pop(-1))\n"
+    "import main\n"
+    "try:\n"
+    "  main.main()\n"
+    "except (SystemExit, main.policy.PolicyConstraintException):\n"
+    "  pass\n"
+    "sys.stdout = sys.__stdout__\n"
+    "print(json.dumps(sorted(set(m.split('.')[0] for m in sys.modules) & set(heavy))))\n")
+
+
+class TestStartupMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def imported_heavy_modules(self, args, heavy_modules=HEAVY_MODULES):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([PACKAGE_DIR] + [path for path in
+        [os.environ.get("PYTHONPATH")] if path])
+    process = subprocess.Popen([sys.executable, "-c", CHILD_SCRIPT,
+        json.dumps(args + [json.dumps(heavy_modules)])], stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, cwd=self.temp_dir, env=env)
+    stdout, stderr = process.communicate()
+    self.assertEqual(process.returncode, 0, stderr)
+    return json.loads(stdout.decode("utf-8").strip().splitlines()[-1])
+
+
+  def test_version(self):
+    self.assertEqual(self.imported_heavy_modules(["--version"]), [])
+
+
+  def write_rejecting_policy(self):
+    # Writes a copy of the default policy which no host satisfies, so that a
+    # run stops before the command is spawned.
+    fileobj = open(os.path.join(PACKAGE_DIR, "default_policy.json"))
+    policy_dict = json.load(fileobj)
+    fileobj.close()
+    policy_dict["constraints"]["cpu_arch"] = "no-such-arch"
+    policy_filepath = os.path.join(self.temp_dir, "policy.json")
+    fileobj = open(policy_filepath, "w")
+    json.dump(policy_dict, fileobj)
+    fileobj.close()
+    return policy_filepath
+
+
+  def test_policy_rejection(self):
+    # A run rejected before the command is spawned only pays for loading the
+    # policy.
+    policy_filepath = self.write_rejecting_policy()
+    self.assertEqual(self.imported_heavy_modules(["--policy", policy_filepath,
+        "echo hello"]), [])
+    self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "out")))
+
+
+  def test_profile_before_command(self):
+    # --profile takes no value, so the command which follows it is not
+    # mistaken for a file; --profile-output writes the profile as JSON, and
+    # --profile-phase reports on stderr as --profile does.
+    policy_filepath = self.write_rejecting_policy()
+    main_filepath = os.path.join(PACKAGE_DIR, "main.py")
+    profile_filepath = os.path.join(self.temp_dir, "profile.json")
+    for options in [["--profile"], ["--profile-output", profile_filepath],
+        ["--profile-phase", "load_policy"]]:
+      process = subprocess.Popen([sys.executable, main_filepath] + options +
+          ["--policy", policy_filepath, "echo hello"], stdout=subprocess.PIPE,
+          stderr=subprocess.PIPE, cwd=self.temp_dir)
+      stdout, stderr = process.communicate()
+      stderr = stderr.decode("utf-8")
+      self.assertTrue("PolicyConstraintException" in stderr, stderr)
+      self.assertEqual("load_policy" in stderr, options[0] != "--profile-output")
+      self.assertEqual("cProfile of phase load_policy" in stderr, options[0] == "--profile-phase")
+
+    fileobj = open(profile_filepath)
+    profile = json.load(fileobj)
+    fileobj.close()
+    self.assertEqual([record["name"] for record in profile["phases"]],
+        ["load_policy", "process_env_vars", "check_pre_run"])
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
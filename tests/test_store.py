@@ -0,0 +1,125 @@
+"""
+<Program Name>
+  test_store.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for store.py
+"""
+
+import unittest
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import store
+import wordlists
+
+TEST_DATA = b"toto build and test\nerror: something failed\n" * 1000
+
+
+class TestStoreMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.digest = hashlib.sha256(TEST_DATA).hexdigest()
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def write_file(self, name, data=TEST_DATA):
+    filepath = os.path.join(self.temp_dir, name)
+    fileobj = open(filepath, "wb")
+    fileobj.write(data)
+    fileobj.close()
+    return filepath
+
+
+  def read_blob(self, path):
+    fileobj = store.open_blob(path)
+    try:
+      return fileobj.read()
+    finally:
+      fileobj.close()
+
+
+  def test_add_file(self):
+    artifacts = store.ArtifactStore(os.path.join(self.temp_dir, "store"))
+
+    # A copied file is left in place; the blob is read-only and named after
+    # its digest.
+    input_filepath = self.write_file("input")
+    blob_path = artifacts.add_file(input_filepath, self.digest)
+    self.assertEqual(blob_path, artifacts.blob_path(self.digest))
+    self.assertEqual(self.read_blob(blob_path), TEST_DATA)
+    self.assertTrue(os.path.exists(input_filepath))
+    self.assertFalse(os.stat(blob_path).st_mode & stat.S_IWUSR)
+
+    # Identical contents are stored only once; a moved duplicate is removed.
+    output_filepath = self.write_file("out")
+    self.assertEqual(artifacts.add_file(output_filepath, self.digest, move=True), blob_path)
+    self.assertFalse(os.path.exists(output_filepath))
+
+    # A new file which is moved in keeps its inode rather than being copied.
+    other_data = b"other output\n"
+    output_filepath = self.write_file("out", other_data)
+    inode = os.stat(output_filepath).st_ino
+    other_blob_path = artifacts.add_file(output_filepath,
+        hashlib.sha256(other_data).hexdigest(), move=True)
+    self.assertEqual(os.stat(other_blob_path).st_ino, inode)
+    self.assertFalse(os.path.exists(output_filepath))
+
+    # Linking a blob back replaces any existing file without touching the
+    # blob.
+    link_filepath = self.write_file("linked", b"stale")
+    artifacts.link_to(blob_path, link_filepath)
+    self.assertEqual(self.read_blob(link_filepath), TEST_DATA)
+    self.assertEqual(os.listdir(artifacts.temp_dir), [])
+
+
+  def test_compressed_store(self):
+    artifacts = store.ArtifactStore(os.path.join(self.temp_dir, "store"), compress=True)
+    blob_path = artifacts.add_file(self.write_file("out"), self.digest, move=True)
+    self.assertTrue(blob_path.endswith(store.COMPRESSED_SUFFIX))
+    self.assertTrue(os.path.getsize(blob_path) < len(TEST_DATA))
+    self.assertEqual(self.read_blob(blob_path), TEST_DATA)
+    self.assertEqual(artifacts.find(self.digest), blob_path)
+
+    # The same contents always compress to the same blob.
+    fileobj = open(blob_path, "rb")
+    compressed = fileobj.read()
+    fileobj.close()
+    os.chmod(blob_path, 0o644)
+    os.remove(blob_path)
+    artifacts.add_file(self.write_file("out"), self.digest, move=True)
+    fileobj = open(blob_path, "rb")
+    self.assertEqual(fileobj.read(), compressed)
+    fileobj.close()
+
+    # Reference-mode lines can be read back from a compressed blob.
+    matcher = wordlists.WordListMatcher({"success": [], "failure": ["error"],
+        "warning": []}, "reference")
+    results = matcher.scan_file(self.write_file("scanned"))
+    self.assertEqual(results["failure"]["count"], 1000)
+    self.assertEqual(wordlists.read_line(blob_path, results["lines"][-1]),
+        "error: something failed\n")
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
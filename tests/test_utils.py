@@ -0,0 +1,164 @@
+"""
+<Program Name>
+  test_utils.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for utils.py
+"""
+
+import unittest
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import utils
+
+# Spans several hash chunks and ends part-way through one
+TEST_DATA = b"toto build and test\n" * 10000
+
+
+class TestUtilsMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.filename = os.path.join(self.temp_dir, "data")
+    fileobj = open(self.filename, "wb")
+    fileobj.write(TEST_DATA)
+    fileobj.close()
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def test_hashing_sink(self):
+    # Feeding the data in arbitrary pieces must give the same digests as
+    # hashing it in one go, for every requested algorithm.
+    hasher = utils.HashingSink(("md5", "sha256"))
+    for start in range(0, len(TEST_DATA), 1000):
+      hasher.write(TEST_DATA[start:start + 1000])
+    digests = hasher.hexdigests()
+    self.assertEqual(sorted(digests.keys()), ["md5", "sha256"])
+    self.assertEqual(digests["md5"], hashlib.md5(TEST_DATA).hexdigest())
+    self.assertEqual(digests["sha256"], hashlib.sha256(TEST_DATA).hexdigest())
+    self.assertEqual(hasher.hexdigest("md5"), digests["md5"])
+    self.assertEqual(hasher.bytes_written, len(TEST_DATA))
+
+
+  def test_get_hash(self):
+    self.assertEqual(utils.get_hash(self.filename), hashlib.md5(TEST_DATA).hexdigest())
+    digests = utils.get_hashes(self.filename)
+    self.assertEqual(digests["sha256"], hashlib.sha256(TEST_DATA).hexdigest())
+
+
+  def test_copy_and_hash(self):
+    copy_filename = os.path.join(self.temp_dir, "copy")
+    digests = utils.copy_and_hash(self.filename, copy_filename)
+    fileobj = open(copy_filename, "rb")
+    self.assertEqual(fileobj.read(), TEST_DATA)
+    fileobj.close()
+    self.assertEqual(digests, utils.get_hashes(self.filename))
+
+
+  def test_write_json_stream(self):
+    # The streamed document must have a fixed layout: sorted keys, four-space
+    # indentation and escaped non-ASCII characters, whatever the installed
+    # version of canonicaljson produces.
+    filename = os.path.join(self.temp_dir, "metadata.json")
+    fileobj = open(filename, "w")
+    utils.write_json_stream({"b": [1, {"x": u"caf\u00e9 \"ok\""}], "a": None, "c": {}}, fileobj)
+    fileobj.close()
+    fileobj = open(filename, "r")
+    self.assertEqual(fileobj.read(), '{\n    "a": null,\n    "b": [\n        1,\n'
+        '        {\n            "x": "caf\\u00e9 \\"ok\\""\n        }\n    ],\n    "c": {}\n}')
+    fileobj.close()
+
+    # Documents larger than a single write batch must come out whole.
+    metadata = {
+      "variables": {"hostname": "build01", "os": {"kernel": "Linux"}},
+      "application": {"return_code": 0, "input_hash": None, "ratio": 0.25},
+      "output_data": {"failure": {"count": 0, "instances": []},
+          "success": {"count": 2, "instances": [{"line": u"caf\u00e9 \"ok\"\n", "line_number": i} for i in range(2000)]}},
+      "empty": {}
+    }
+    fileobj = open(filename, "w")
+    utils.write_json_stream(metadata, fileobj)
+    fileobj.close()
+    fileobj = open(filename, "r")
+    streamed = fileobj.read()
+    fileobj.close()
+    expected = json.dumps(metadata, ensure_ascii=True, indent=4, sort_keys=True, separators=(',', ': '))
+    self.assertEqual(streamed, expected)
+
+
+  def test_search_buffer(self):
+    # Counts and offsets must match str.count() and a left-to-right scan for
+    # every needle, including needles which overlap themselves or each other
+    # and occurrences which straddle a block boundary.
+    data = b"xaaaab error errors err\nwarning aaa\n" * 50
+    needles = [b"aa", b"err", b"error", b"rr", b"\nw", b"missing", b""]
+    block_size = utils.SEARCH_BLOCK_SIZE
+    for size in [block_size, 7, 64]:
+      utils.SEARCH_BLOCK_SIZE = size
+      try:
+        results = utils.search_buffer(data, needles, all_offsets=True)
+      finally:
+        utils.SEARCH_BLOCK_SIZE = block_size
+      for needle in needles:
+        self.assertEqual(results[needle]["count"], data.count(needle))
+        offsets = []
+        position = data.find(needle)
+        while position != -1 and needle:
+          offsets.append(position)
+          position = data.find(needle, position + len(needle))
+        if needle:
+          self.assertEqual(results[needle]["offsets"], offsets)
+        self.assertEqual(results[needle]["first_offset"], data.find(needle) if needle in data else None)
+
+
+  def test_mapped_file(self):
+    mapped = utils.MappedFile(self.filename)
+    try:
+      self.assertEqual(mapped.count_lines(), 10000)
+      results = mapped.search(["build", b"test\n", "missing"])
+      self.assertEqual(results["build"], {"count": 10000, "first_offset": 5})
+      self.assertEqual(results[b"test\n"]["count"], 10000)
+      self.assertEqual(results["missing"]["count"], 0)
+    finally:
+      mapped.close()
+
+    # The older helpers are wrappers around it.
+    self.assertEqual(utils.file_line_counter(self.filename), 10000)
+    self.assertTrue(utils.word_found_in_file(self.filename, "toto"))
+    self.assertFalse(utils.word_found_in_file(self.filename, "missing"))
+    self.assertEqual(utils.count_string("Error, ERROR and errors", "error"), 3)
+
+    # A last line without a newline counts; an empty file has no lines.
+    filename = os.path.join(self.temp_dir, "partial")
+    fileobj = open(filename, "wb")
+    fileobj.write(b"one\ntwo")
+    fileobj.close()
+    self.assertEqual(utils.file_line_counter(filename), 2)
+    fileobj = open(filename, "wb")
+    fileobj.close()
+    self.assertEqual(utils.file_line_counter(filename), 0)
+    self.assertFalse(utils.word_found_in_file(filename, "one"))
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,210 @@
+"""
+<Program Name>
+  test_wordlists.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Test cases for wordlists.py
+"""
+
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import wordlists
+
+WORD_LISTS = {
+  "success": ["success", "passed", "pass"],
+  "failure": ["fail", "error", "pass"],
+  "warning": ["warn", "warning"]
+}
+
+TEST_LOG = (
+  b"Compiling module\n"
+  b"ERROR: build failed, error in foo.c\n"
+  b"3 tests passed\n"
+  b"warning:unused-variable fail2pass\n"
+  b"\n"
+  b"error without newline")
+
+
+class TestWordListMethods(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.filename = os.path.join(self.temp_dir, "out")
+    fileobj = open(self.filename, "wb")
+    fileobj.write(TEST_LOG)
+    fileobj.close()
+    self.matcher = wordlists.WordListMatcher(WORD_LISTS)
+
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+
+  def test_scan_file(self):
+    results = self.matcher.scan_file(self.filename)
+
+    # A line is recorded once per matching token, tokens are the lowercased
+    # runs of letters, and a word in several lists counts for the first.
+    error_line = {"line": "ERROR: build failed, error in foo.c\n", "line_number": 2}
+    passed_line = {"line": "3 tests passed\n", "line_number": 3}
+    warning_line = {"line": "warning:unused-variable fail2pass\n", "line_number": 4}
+    last_line = {"line": "error without newline", "line_number": 6}
+
+    self.assertEqual(results["failure"]["instances"],
+        [error_line, error_line, warning_line, last_line])
+    self.assertEqual(results["failure"]["count"], 4)
+    self.assertEqual(results["success"]["instances"], [passed_line, warning_line])
+    self.assertEqual(results["success"]["count"], 2)
+    self.assertEqual(results["warning"]["instances"], [warning_line])
+    self.assertEqual(results["warning"]["count"], 1)
+
+
+  def test_empty_file(self):
+    fileobj = open(self.filename, "wb")
+    fileobj.close()
+    self.assertEqual(self.matcher.scan_file(self.filename), self.matcher.new_results())
+
+
+  def test_scan_files_parallel(self):
+    # Chunks far smaller than the file force lines to be split across many
+    # chunks; the merged results must match the serial scan exactly.
+    other_filename = os.path.join(self.temp_dir, "err")
+    fileobj = open(other_filename, "wb")
+    fileobj.write((TEST_LOG + b"\n") * 50)
+    fileobj.close()
+
+    filenames = [self.filename, other_filename]
+    parallel_results = self.matcher.scan_files_parallel(filenames, 2, chunk_size=64)
+    serial_results = [self.matcher.scan_file(filename) for filename in filenames]
+    self.assertEqual(parallel_results, serial_results)
+    self.assertEqual(json.dumps(parallel_results, sort_keys=True),
+        json.dumps(serial_results, sort_keys=True))
+    self.assertEqual(parallel_results[1]["failure"]["instances"][-1]["line_number"], 300)
+
+
+  def test_live_scan_sink(self):
+    # Feeding the log in pieces that split lines (and the final line without
+    # a newline) must give the same results as scanning the file.
+    for piece_size in [1, 7, 64, len(TEST_LOG)]:
+      scanner = wordlists.LiveScanSink(self.matcher)
+      for start in range(0, len(TEST_LOG), piece_size):
+        scanner.write(TEST_LOG[start:start + piece_size])
+      scanner.close()
+      self.assertEqual(scanner.results, self.matcher.scan_file(self.filename))
+
+
+  def test_failure_limit(self):
+    # The limit is shared between sinks and triggers the abort only once
+    # the combined number of failure hits reaches it.
+    class FakeAbort(object):
+      reasons = []
+      def trigger(self, reason):
+        self.reasons.append(reason)
+
+    abort = FakeAbort()
+    failure_limit = wordlists.FailureLimit(3, abort)
+    stdout_scanner = wordlists.LiveScanSink(self.matcher, failure_limit)
+    stderr_scanner = wordlists.LiveScanSink(self.matcher, failure_limit)
+    stdout_scanner.write(b"error: one\n")
+    stderr_scanner.write(b"error: two\n")
+    self.assertEqual(abort.reasons, [])
+    stdout_scanner.write(b"still going\nerror again\n")
+    self.assertEqual(abort.reasons, ["failure limit of 3 reached"])
+    stderr_scanner.write(b"error: four\n")
+    self.assertEqual(abort.reasons, ["failure limit of 3 reached"])
+    self.assertEqual(failure_limit.count, 4)
+
+
+  def test_reference_mode(self):
+    # Each matching line is recorded once with its byte range and hits, the
+    # counts are unchanged, and expanding the references gives exactly the
+    # full-mode results.
+    reference_matcher = wordlists.WordListMatcher(WORD_LISTS, "reference")
+    results = reference_matcher.scan_file(self.filename)
+    self.assertEqual(results["failure"]["count"], 4)
+    self.assertEqual(len(results["lines"]), 4)
+    self.assertEqual(results["lines"][0], {"line_number": 2, "offset": 17,
+        "length": 36, "categories": ["failure", "failure"], "tokens": ["error", "error"]})
+    self.assertEqual(wordlists.read_line(self.filename, results["lines"][0]),
+        "ERROR: build failed, error in foo.c\n")
+    self.assertEqual(wordlists.expand_references(results, self.filename),
+        self.matcher.scan_file(self.filename))
+
+    # The live and parallel scans must record the same references.
+    scanner = wordlists.LiveScanSink(reference_matcher)
+    for start in range(0, len(TEST_LOG), 5):
+      scanner.write(TEST_LOG[start:start + 5])
+    scanner.close()
+    self.assertEqual(scanner.results, results)
+    self.assertEqual(reference_matcher.scan_files_parallel([self.filename], 2, chunk_size=16),
+        [results])
+
+
+  def test_max_instances(self):
+    # Beyond the cap hits are only counted, in either mode and however the
+    # file is scanned, and the counts stay exact.
+    for instance_mode in wordlists.INSTANCE_MODES:
+      capped_matcher = wordlists.WordListMatcher(WORD_LISTS, instance_mode, max_instances=2)
+      results = capped_matcher.scan_file(self.filename)
+      self.assertEqual(results["failure"]["count"], 4)
+      self.assertEqual(results["failure"]["dropped_instances"], 2)
+      self.assertEqual(results["success"]["dropped_instances"], 0)
+      if instance_mode == "full":
+        self.assertEqual([instance["line_number"] for instance in
+            results["failure"]["instances"]], [2, 2])
+      else:
+        self.assertEqual([reference["line_number"] for reference in results["lines"]], [2, 3, 4])
+        self.assertEqual(results["lines"][2]["categories"], ["warning", "success"])
+
+      scanner = wordlists.LiveScanSink(capped_matcher)
+      scanner.write(TEST_LOG)
+      scanner.close()
+      self.assertEqual(scanner.results, results)
+      self.assertEqual(capped_matcher.scan_files_parallel([self.filename], 2, chunk_size=16),
+          [results])
+
+
+  def test_max_line_bytes(self):
+    # A line longer than the cap is kept and scanned only up to the cap, so
+    # output without newlines takes bounded memory; the lines after it keep
+    # their numbers and offsets.
+    scanner = wordlists.LiveScanSink(self.matcher, max_line_bytes=32)
+    scanner.write(b"build error ")
+    for i in range(1000):
+      scanner.write(b"x" * 1000)
+      self.assertTrue(sum(len(piece) for piece in scanner.pending) <= 32)
+    scanner.write(b" failed\nanother error\n" + b"e" * 100 + b" error\n")
+    scanner.close()
+    instances = scanner.results["failure"]["instances"]
+    self.assertEqual([instance["line_number"] for instance in instances], [1, 2])
+    self.assertEqual(instances[0]["line"], "build error " + "x" * 20)
+    self.assertTrue(instances[0]["truncated"])
+    self.assertFalse("truncated" in instances[1])
+
+    reference_scanner = wordlists.LiveScanSink(wordlists.WordListMatcher(WORD_LISTS,
+        "reference"), max_line_bytes=32)
+    reference_scanner.write(b"build error " + b"x" * 1000 + b" failed\nanother error\n")
+    reference_scanner.close()
+    self.assertEqual([(line["line_number"], line["offset"], line["length"]) for line in
+        reference_scanner.results["lines"]], [(1, 0, 1020), (2, 1020, 14)])
+
+
+# Run the unit tests.
+if __name__ == '__main__':
+  unittest.main()
@@ -21,15 +21,257 @@
   a string gen_json() which outputs a dictionary to a JSON file, get_hash() which 
   generates an MD5 checksum of the file corresponding to a given filename, 
   write_to_file writes a given string to he file corresponding to a given 
-  filename.
+  filename. HashingSink can be fed bytes from any I/O path (e.g. a captured 
+  stream) to compute several digests in a single pass, and copy_and_hash() 
+  copies a file while hashing it. write_json_stream() writes a dictionary as 
+  pretty-printed canonical JSON without building the whole document in memory.
+  search_buffer() finds many needles in a single pass, and MappedFile 
+  memory-maps a file once for any number of searches and line counts; the 
+  older word_found_in_file(), file_line_counter() and count_string() are 
+  wrappers around them.
 """
 
-import canonicaljson
+import re
 import json
+import mmap
 import hashlib
 import os.path
 import time
 
+# The digests recorded for captured I/O; MD5 is kept for compatibility
+DEFAULT_HASH_ALGORITHMS = ("md5", "sha256")
+
+# The number of bytes read at a time when hashing or copying a file
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Produces exactly the output of canonicaljson.encode_pretty_printed_json()
+# before version 1.2 (as pinned in requirements.txt), which is this same 
+# configuration of simplejson's encoder; later versions no longer escape 
+# non-ASCII characters
+PRETTY_JSON_ENCODER = json.JSONEncoder(ensure_ascii=True, indent=4, 
+  sort_keys=True, separators=(',', ': '))
+
+# The number of encoded pieces collected before each write when streaming JSON
+JSON_WRITE_BATCH = 4096
+
+# The number of bytes of a mapped file counted or searched at a time
+SEARCH_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+class HashingSink(object):
+  """
+  A write-only sink which incrementally hashes every byte written to it with
+  one or more hashlib algorithms, so that data can be hashed in the same pass
+  in which it is captured or copied. For example:
+
+    hasher = HashingSink(("md5", "sha256"))
+    hasher.write(data)
+    hasher.hexdigests() -> {"md5": "...", "sha256": "..."}
+  """
+
+  def __init__(self, algorithms=DEFAULT_HASH_ALGORITHMS):
+    self.hashers = dict()
+    for algorithm in algorithms:
+      self.hashers[algorithm] = hashlib.new(algorithm)
+    self.bytes_written = 0
+
+
+  def write(self, data):
+    for hasher in self.hashers.values():
+      hasher.update(data)
+    self.bytes_written += len(data)
+
+
+  def hexdigest(self, algorithm):
+    return self.hashers[algorithm].hexdigest()
+
+
+  def hexdigests(self):
+    digests = dict()
+    for algorithm, hasher in self.hashers.items():
+      digests[algorithm] = hasher.hexdigest()
+    return digests
+
+
+class MappedFile(object):
+  """
+  A file memory-mapped once for reading, so that it can be searched for any
+  number of needles and have its lines counted without being read again or
+  loaded into memory. For example:
+
+    with MappedFile("out") as mapped:
+      mapped.count_lines() -> 1200
+      mapped.search([b"error", b"warning"]) -> {b"error": {"count": 3,
+        "first_offset": 1017}, b"warning": {"count": 0, "first_offset": None}}
+  """
+
+  def __init__(self, filename):
+    self.fileobj = open(filename, "rb")
+    self.size = os.fstat(self.fileobj.fileno()).st_size
+    # An empty file cannot be mapped, but has nothing to search either
+    if self.size:
+      self.data = mmap.mmap(self.fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+      self.data = b""
+
+
+  def __enter__(self):
+    return self
+
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+
+  def close(self):
+    if self.size:
+      self.data.close()
+    self.fileobj.close()
+
+
+  def count_lines(self):
+    """
+    <Purpose>
+      Counts the lines of the file: its newlines, plus a last line which
+      lacks one.
+
+    <Arguments>
+      None.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      The number of lines, 0 for an empty file.
+    """
+
+    count = 0
+    for start in range(0, self.size, SEARCH_BLOCK_SIZE):
+      count += self.data[start:start + SEARCH_BLOCK_SIZE].count(b"\n")
+    if self.size and self.data[self.size - 1:self.size] != b"\n":
+      count += 1
+    return count
+
+
+  def search(self, needles, all_offsets=False):
+    """
+    <Purpose>
+      Searches the file for many needles at once; see search_buffer().
+
+    <Arguments>
+      needles:
+        A list of the byte strings to search for; text strings are searched
+        for in their UTF-8 encoding.
+
+      all_offsets:
+        Whether the offset of every occurrence is returned.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      A dictionary as returned by search_buffer(), keyed by the needles as
+      given.
+    """
+
+    encoded_needles = dict()
+    for needle in needles:
+      encoded = needle
+      if not isinstance(needle, bytes):
+        encoded = needle.encode("utf-8")
+      encoded_needles[needle] = encoded
+    results = search_buffer(self.data, list(set(encoded_needles.values())), all_offsets)
+    return dict((needle, results[encoded]) for needle, encoded in encoded_needles.items())
+
+
+def search_buffer(buf, needles, all_offsets=False):
+  """
+  <Purpose>
+    Finds every occurrence of many needles in a string, bytes or memory-mapped
+    file in a single pass: the buffer is taken a block at a time and each 
+    block is searched for every needle while it is at hand. The occurrences 
+    of each needle are counted exactly as str.count() would (non-overlapping, 
+    from the left), independently of the other needles.
+
+  <Arguments>
+    buf:
+      The string, bytes or mmap to search.
+
+    needles:
+      A list of needles of the same type as 'buf' (bytes for an mmap).
+
+    all_offsets:
+      Whether the offset of every occurrence is returned.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    A dictionary mapping each needle to a dictionary holding its "count" and
+    the "first_offset" of it (None if it does not occur) and, with
+    'all_offsets', the list of all its "offsets".
+  """
+
+  size = len(buf)
+  results = dict()
+  searched = []
+  for needle in set(needles):
+    results[needle] = {"count": 0, "first_offset": None}
+    if all_offsets:
+      results[needle]["offsets"] = []
+    if needle:
+      searched.append(needle)
+    else:
+      # As with str.count(), the empty string occurs around every character
+      results[needle]["count"] = size + 1
+      results[needle]["first_offset"] = 0
+      if all_offsets:
+        results[needle]["offsets"] = list(range(size + 1))
+
+  # Needles whose occurrences can overlap (e.g. "aa" in "aaa") are scanned 
+  # left to right from the end of their last occurrence, as str.count() does; 
+  # the occurrences of any other needle are simply counted
+  patterns = dict()
+  for needle in searched:
+    if all_offsets or _overlaps_itself(needle):
+      patterns[needle] = re.compile(re.escape(needle))
+  next_starts = dict((needle, 0) for needle in searched)
+
+  # Each block is extended by the longest needle, less one byte, so that the 
+  # occurrences which start in it are found whole
+  max_length = max([len(needle) for needle in searched] or [1])
+  for block_start in range(0, size, SEARCH_BLOCK_SIZE):
+    block_length = min(SEARCH_BLOCK_SIZE, size - block_start)
+    window = buf[block_start:block_start + block_length + max_length - 1]
+    for needle in searched:
+      result = results[needle]
+      end = block_length + len(needle) - 1
+      pattern = patterns.get(needle)
+      if pattern is None:
+        count = window.count(needle, 0, end)
+        if count and result["first_offset"] is None:
+          result["first_offset"] = block_start + window.find(needle, 0, end)
+        result["count"] += count
+        continue
+
+      for match in pattern.finditer(window, max(next_starts[needle] - block_start, 0), end):
+        if result["first_offset"] is None:
+          result["first_offset"] = block_start + match.start()
+        result["count"] += 1
+        if all_offsets:
+          result["offsets"].append(block_start + match.start())
+        next_starts[needle] = block_start + match.end()
+  return results
+
+
+def _overlaps_itself(needle):
+  # Whether the needle starts with one of its own proper suffixes.
+  for length in range(1, len(needle)):
+    if needle[:length] == needle[-length:]:
+      return True
+  return False
+
+
 def count_string(s, substring):
   """
   <Purpose>
@@ -48,8 +290,7 @@ def count_string(s, substring):
     count:
       The number of times substring occured in s
   """
-  s = s.lower()
-  return s.count(substring)
+  return search_buffer(s.lower(), [substring])[substring]["count"]
 
 
 def gen_json(metadata_dict, metadata_name):
@@ -75,8 +316,44 @@ def gen_json(metadata_dict, metadata_name):
 
   filename = metadata_name + '.json'
   fileobj = open(filename, 'w')
-  fileobj.write(canonicaljson.encode_pretty_printed_json(metadata_dict))
-  fileobj.close()
+  try:
+    write_json_stream(metadata_dict, fileobj)
+  finally:
+    fileobj.close()
+
+
+def write_json_stream(json_object, fileobj):
+  """
+  <Purpose>
+    Writes the given object to a file as pretty-printed JSON with sorted keys,
+    byte-for-byte identical to canonicaljson.encode_pretty_printed_json()
+    before version 1.2, with non-ASCII characters escaped. The
+    document is encoded incrementally and written in batches as it is
+    produced, so it never exists in memory as a single string.
+
+  <Arguments>
+    json_object:
+      The object (e.g. the metadata dictionary) to be written.
+
+    fileobj:
+      A file object open for writing text.
+
+  <Exceptions>
+    TypeError, if the object contains a value which cannot be encoded as JSON.
+
+    IOError, if writing to the file fails.
+
+  <Return>
+    None.
+  """
+
+  pieces = []
+  for piece in PRETTY_JSON_ENCODER.iterencode(json_object):
+    pieces.append(piece)
+    if len(pieces) >= JSON_WRITE_BATCH:
+      fileobj.write("".join(pieces))
+      pieces = []
+  fileobj.write("".join(pieces))
 
 
 def get_hash(filename):
@@ -95,19 +372,83 @@ def get_hash(filename):
     A 32-character string (a 128-bit hash value).
   """
 
-  md5_hasher = hashlib.md5()
+  return get_hashes(filename, ("md5",))["md5"]
 
-  # Read the file as bytes
-  fileobj = open(filename,"rb")
 
-  # We read the file in 128-byte chunks
-  while True:
-    data = fileobj.read(128)
-    if not data:
-      break
-    md5_hasher.update(data)
-  fileobj.close()
-  return md5_hasher.hexdigest()
+def get_hashes(filename, algorithms=DEFAULT_HASH_ALGORITHMS):
+  """
+  <Purpose>
+    Returns the checksums of the file represented by the given filename for 
+    each of the given algorithms, reading the file only once.
+
+  <Arguments>
+    filename:
+      The name of the file for which the checksums will be generated.
+
+    algorithms:
+      A sequence of hashlib algorithm names (e.g. "md5", "sha256").
+
+  <Exceptions>
+    IOError, if the file cannot be read.
+
+    ValueError, if an algorithm is not supported by hashlib.
+
+  <Return>
+    A dictionary mapping each algorithm name to its hex digest.
+  """
+
+  hasher = HashingSink(algorithms)
+  fileobj = open(filename, "rb")
+  try:
+    while True:
+      data = fileobj.read(HASH_CHUNK_SIZE)
+      if not data:
+        break
+      hasher.write(data)
+  finally:
+    fileobj.close()
+  return hasher.hexdigests()
+
+
+def copy_and_hash(src_filename, dst_filename, algorithms=DEFAULT_HASH_ALGORITHMS):
+  """
+  <Purpose>
+    Copies a file while hashing its contents, so that every byte is read from
+    disk only once.
+
+  <Arguments>
+    src_filename:
+      The name of the file to be copied.
+
+    dst_filename:
+      The name of the file to which it should be copied.
+
+    algorithms:
+      A sequence of hashlib algorithm names (e.g. "md5", "sha256").
+
+  <Exceptions>
+    IOError, if either file cannot be opened, read or written.
+
+  <Return>
+    A dictionary mapping each algorithm name to the hex digest of the file.
+  """
+
+  hasher = HashingSink(algorithms)
+  src_fileobj = open(src_filename, "rb")
+  try:
+    dst_fileobj = open(dst_filename, "wb")
+    try:
+      while True:
+        data = src_fileobj.read(HASH_CHUNK_SIZE)
+        if not data:
+          break
+        dst_fileobj.write(data)
+        hasher.write(data)
+    finally:
+      dst_fileobj.close()
+  finally:
+    src_fileobj.close()
+  return hasher.hexdigests()
 
 
 def write_to_file(string_to_write, filename):
@@ -152,12 +493,11 @@ def file_line_counter(filename):
     lines were found, then return 0.  
   """
   
-  count = 0
-  with open(filename) as f:
-    for count, line in enumerate(f):
-      count = count + 1
-  f.close()
-  return count
+  mapped = MappedFile(filename)
+  try:
+    return mapped.count_lines()
+  finally:
+    mapped.close()
 
 
 def get_file_modification_time(filename):
@@ -201,10 +541,12 @@ def word_found_in_file(filename, word):
     a False is returned.
   """
 
-  with open(filename) as f:
-    for line in f:
-      if (word in line):
-        f.close()
-        return True
-  f.close()
-  return False
+  if not isinstance(word, bytes):
+    word = word.encode("utf-8")
+  # Only presence is asked for, so the map is searched up to the first hit 
+  # rather than counted in full as search() does
+  mapped = MappedFile(filename)
+  try:
+    return mapped.data.find(word) != -1
+  finally:
+    mapped.close()
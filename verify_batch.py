@@ -0,0 +1,199 @@
+"""
+<Program Name>
+  verify_batch.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Verifies the signatures of many metadata files at once, e.g. when auditing a
+  release. The given files, and every metadata.json found under the given
+  directories, are verified with signing.verify_json() across a pool of
+  processes, each of which caches the public keys it has parsed by keyid. A
+  compact pass/fail report with per-file timing is printed, and the exit
+  status is non-zero if any file failed. This script is called as below:
+
+  usage: verify_batch.py [-h] [--jobs N] [--name FILENAME] [--quiet] PATH [PATH ...]
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+
+DEFAULT_METADATA_FILENAME = "metadata.json"
+
+# The public keys parsed by this (worker) process
+_key_cache = None
+
+
+def find_metadata_files(paths, metadata_filename=DEFAULT_METADATA_FILENAME):
+  """
+  <Purpose>
+    Expands a list of files and directories into a list of metadata files.
+    Files are kept as given; directories are walked for files with the given
+    name.
+
+  <Arguments>
+    paths:
+      A list of paths to metadata files or to directories holding them.
+
+    metadata_filename:
+      The name of the metadata files to look for in directories.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    A sorted list of paths to metadata files.
+  """
+
+  filepaths = []
+  for path in paths:
+    if os.path.isdir(path):
+      for dirpath, dirnames, filenames in os.walk(path):
+        if metadata_filename in filenames:
+          filepaths.append(os.path.join(dirpath, metadata_filename))
+    else:
+      filepaths.append(path)
+  return sorted(filepaths)
+
+
+def verify_file(filepath):
+  """
+  <Purpose>
+    Verifies the signature of a single metadata file.
+
+  <Arguments>
+    filepath:
+      The path of the metadata file.
+
+  <Exceptions>
+    None; failures are reported in the result.
+
+  <Return>
+    A tuple (filepath, passed, error, seconds), where 'error' is None or a
+    string describing why the file could not be verified.
+  """
+
+  global _key_cache
+  import signing
+  if _key_cache is None:
+    _key_cache = signing.PublicKeyCache()
+
+  start = time.time()
+  error = None
+  try:
+    fileobj = open(filepath, "r")
+    try:
+      jsondata = fileobj.read()
+    finally:
+      fileobj.close()
+    passed = bool(signing.verify_json(jsondata, _key_cache))
+  except Exception as e:
+    passed = False
+    error = e.__class__.__name__ + ": " + str(e)
+  return filepath, passed, error, time.time() - start
+
+
+def verify_files(filepaths, processes=None):
+  """
+  <Purpose>
+    Verifies the given metadata files across a pool of processes.
+
+  <Arguments>
+    filepaths:
+      A list of paths of metadata files.
+
+    processes:
+      The number of worker processes; defaults to the number of CPUs.
+
+  <Exceptions>
+    None; failures are reported in the results.
+
+  <Return>
+    A list of (filepath, passed, error, seconds) tuples, as returned by
+    verify_file(), in the order of 'filepaths'.
+  """
+
+  if processes == 1 or len(filepaths) <= 1:
+    return [verify_file(filepath) for filepath in filepaths]
+
+  pool = multiprocessing.Pool(processes)
+  try:
+    # Batches of files per task keep the pool's overhead low while still
+    # spreading the work evenly
+    chunksize = max(1, len(filepaths) // ((processes or multiprocessing.cpu_count()) * 8))
+    return pool.map(verify_file, filepaths, chunksize)
+  finally:
+    pool.terminate()
+    pool.join()
+
+
+def print_report(results, quiet=False, fileobj=sys.stdout):
+  """
+  <Purpose>
+    Prints one line per file ("PASS" or "FAIL", the time taken and the path,
+    plus the error for a failure) followed by a summary line.
+
+  <Arguments>
+    results:
+      A list of results as returned by verify_files().
+
+    quiet:
+      If True, only failures and the summary are printed.
+
+    fileobj:
+      The file to which the report is written.
+
+  <Exceptions>
+    None.
+
+  <Return>
+    The number of files which failed.
+  """
+
+  failed = 0
+  total_seconds = 0.0
+  for filepath, passed, error, seconds in results:
+    total_seconds += seconds
+    if not passed:
+      failed += 1
+    if passed and quiet:
+      continue
+    line = "%s %9.2fms %s" % (passed and "PASS" or "FAIL", seconds * 1000, filepath)
+    if error:
+      line += " (" + error + ")"
+    fileobj.write(line + "\n")
+
+  fileobj.write("%d files, %d passed, %d failed, %.2fs verifying\n" % (len(results),
+      len(results) - failed, failed, total_seconds))
+  return failed
+
+
+def main():
+  parser = argparse.ArgumentParser(prog='verify_batch.py', description='Verifies the signatures of many metadata files.')
+  parser.add_argument('--jobs', metavar='N', type=int, default=None, help='the number of processes to verify with; defaults to the number of CPUs')
+  parser.add_argument('--name', metavar='FILENAME', default=DEFAULT_METADATA_FILENAME, help='the name of the metadata files to look for in directories')
+  parser.add_argument('--quiet', action='store_true', help='only report failures and the summary')
+  parser.add_argument('paths', metavar='PATH', nargs='+', help='a metadata file or a directory to search for them')
+  args = parser.parse_args()
+
+  results = verify_files(find_metadata_files(args.paths, args.name), args.jobs)
+  failed = print_report(results, args.quiet)
+  sys.exit(failed and 1 or 0)
+
+
+if __name__ == '__main__':
+  main()
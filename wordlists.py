@@ -0,0 +1,613 @@
+"""
+<Program Name>
+  wordlists.py
+
+<Author>
+  Casey McGinley
+  Fernando Maymi
+  Catherine Eng
+  Justin Valcarel
+  Wilson Li
+
+<Started>
+  October 18, 2026
+
+<Copyright>
+  See LICENSE for licensing information.
+
+<Purpose>
+  Provides the word-list matcher used by main.py to search captured output for
+  the success, failure and warning terms of the policy file. The word lists are
+  compiled once into a single token -> category hash map, so each token of a
+  line costs one dictionary lookup instead of a scan over every word list.
+
+  Large files can also be scanned in parallel: they are memory-mapped, split
+  into chunks at newline boundaries and the chunks are scanned across a
+  process pool, with the results merged back in file order. Alternatively, a
+  LiveScanSink scans the output while the command is still running, so that a
+  FailureLimit can stop it as soon as enough failures have been seen.
+
+  Matches are recorded in one of two instance modes. In "full" mode (the
+  default) every hit stores the text of its line under its category's
+  "instances". In "reference" mode each matching line is stored only once,
+  in a "lines" list, as its line number, byte offset and length within the
+  captured file plus the matched categories and tokens; read_line() and
+  expand_references() recover the line text on demand.
+
+  The instances stored per category can also be capped (max_instances): the
+  counts stay exact, and the hits beyond the cap are only counted, under the
+  category's "dropped_instances". A LiveScanSink may likewise cap the length
+  of a line (max_line_bytes), so that output without newlines cannot grow it
+  without bound; only the start of a longer line is scanned and stored, and
+  its instances are marked "truncated".
+"""
+
+import re
+import os
+import mmap
+import threading
+
+# The word-list categories, in the order in which a token is checked against
+# them; a word appearing in several lists belongs to the first one
+CATEGORIES = ("success", "failure", "warning")
+
+# Tokens are the runs of alphabetic characters in a lowercased line; lines are
+# scanned as bytes, exactly as they were captured
+TOKEN_REGEX = re.compile(b'[a-zA-Z]+')
+
+# The ways in which matching lines can be recorded; see the module docstring
+INSTANCE_MODES = ("full", "reference")
+
+# The approximate number of bytes in each chunk of a parallel scan
+PARALLEL_CHUNK_SIZE = 16 * 1024 * 1024
+
+# The number of bytes of a line kept and scanned by a LiveScanSink whose
+# lines are capped, as when the captured output is bounded
+MAX_LINE_BYTES = 64 * 1024
+
+# The matcher used by each process of a parallel scan's pool
+_worker_matcher = None
+
+
+class WordListMatcher(object):
+  """
+  The word lists from a policy file compiled for scanning. For example:
+
+    matcher = WordListMatcher(policy_dict["supplied_data"]["word_lists"])
+    results = matcher.scan_file("out")
+    results["failure"]["count"] -> 2
+
+  The results of a scan have the same layout as the "output_data" and
+  "err_data" sections of the metadata. With instance_mode="reference", a
+  failure line is recorded as:
+
+    results["lines"] -> [{"line_number": 2, "offset": 17, "length": 36,
+                          "categories": ["failure"], "tokens": ["error"]}]
+
+  With max_instances, at most that many hits of each category are stored.
+  """
+
+  def __init__(self, word_lists, instance_mode="full", max_instances=None):
+    if instance_mode not in INSTANCE_MODES:
+      raise ValueError("unknown instance mode: " + repr(instance_mode))
+    self.instance_mode = instance_mode
+    self.max_instances = max_instances
+    self.word_lists = word_lists
+    self.token_map = dict()
+    for category in CATEGORIES:
+      for word in word_lists[category]:
+        # Tokens are bytes, so the words are encoded to match them
+        if not isinstance(word, bytes):
+          word = word.encode("utf-8")
+        if word not in self.token_map:
+          self.token_map[word] = category
+
+
+  def new_results(self):
+    """
+    <Purpose>
+      Returns an empty results dictionary to be filled by scan_line().
+
+    <Arguments>
+      None.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      A dictionary mapping each category to a dictionary holding a "count" of
+      0 and, in full mode, an empty list of "instances" (plus a
+      "dropped_instances" of 0 if the instances are capped). In reference mode
+      the dictionary also holds an empty list of "lines".
+    """
+
+    results = dict()
+    for category in CATEGORIES:
+      results[category] = dict()
+      if self.instance_mode == "full":
+        results[category]["instances"] = list()
+      results[category]["count"] = 0
+      if self.max_instances is not None:
+        results[category]["dropped_instances"] = 0
+    if self.instance_mode == "reference":
+      results["lines"] = list()
+    return results
+
+
+  def scan_line(self, line, line_number, results, offset=0, length=None):
+    """
+    <Purpose>
+      Searches a single line for word-list terms and records every hit in the
+      given results. In full mode a line is recorded once per matching token,
+      so a line with two failure terms appears twice in the failure instances;
+      in reference mode it is recorded once, listing both tokens.
+
+    <Arguments>
+      line:
+        The line to be searched, including its trailing newline (if any).
+
+      line_number:
+        The 1-based line number of the line within its file.
+
+      results:
+        A results dictionary as returned by new_results().
+
+      offset:
+        The byte offset of the line within its file; only recorded in
+        reference mode.
+
+      length:
+        The length of the whole line, if 'line' is only its start; such a
+        line is recorded as "truncated" in full mode, and with its whole
+        length in reference mode.
+
+    <Exceptions>
+      None.
+
+    <Return>
+      None.
+    """
+
+    token_map = self.token_map
+    full_mode = self.instance_mode == "full"
+    max_instances = self.max_instances
+    dict_to_add = None
+    for token in TOKEN_REGEX.findall(line.lower()):
+      category = token_map.get(token)
+      if category is None:
+        continue
+      if max_instances is not None and (results[category]["count"] - 
+          results[category]["dropped_instances"]) >= max_instances:
+        # Beyond the cap a hit is only counted
+        results[category]["count"] += 1
+        results[category]["dropped_instances"] += 1
+        continue
+      if dict_to_add is None:
+        dict_to_add = dict()
+        dict_to_add["line_number"] = line_number
+        if full_mode:
+          dict_to_add["line"] = _decode_line(line)
+          if length is not None and length > len(line):
+            dict_to_add["truncated"] = True
+        else:
+          dict_to_add["offset"] = offset
+          dict_to_add["length"] = length is None and len(line) or length
+          dict_to_add["categories"] = list()
+          dict_to_add["tokens"] = list()
+          results["lines"].append(dict_to_add)
+      if full_mode:
+        results[category]["instances"].append(dict_to_add)
+      else:
+        dict_to_add["categories"].append(category)
+        dict_to_add["tokens"].append(_decode_line(token))
+      results[category]["count"] += 1
+
+
+  def scan_file(self, filename):
+    """
+    <Purpose>
+      Reads through the given file in a single pass and records the lines and
+      line numbers in which word-list terms appear.
+
+    <Arguments>
+      filename:
+        A string for the path to the file to be searched.
+
+    <Exceptions>
+      IOError, if the file cannot be read.
+
+    <Return>
+      A results dictionary as returned by new_results().
+    """
+
+    results = self.new_results()
+    fileobj = open(filename, "rb")
+    try:
+      line_number = 0
+      offset = 0
+      for line in fileobj:
+        line_number += 1
+        self.scan_line(line, line_number, results, offset)
+        offset += len(line)
+    finally:
+      fileobj.close()
+    return results
+
+
+  def scan_files_parallel(self, filenames, processes=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    <Purpose>
+      Scans the given files across a pool of processes. Each file is
+      memory-mapped and split into chunks of about 'chunk_size' bytes which end
+      on a newline, so no line is ever split between chunks. The per-chunk
+      results are merged back in order with their line numbers made global, so
+      the results are identical to those of scan_file().
+
+    <Arguments>
+      filenames:
+        A list of paths to the files to be searched.
+
+      processes:
+        The number of worker processes; defaults to the number of CPUs.
+
+      chunk_size:
+        The approximate number of bytes in each chunk.
+
+    <Exceptions>
+      IOError or OSError, if a file cannot be read.
+
+    <Return>
+      A list holding a results dictionary (as returned by new_results()) for
+      each of the given files, in the same order.
+    """
+
+    tasks = list()
+    for file_index, filename in enumerate(filenames):
+      for start, end in _split_at_newlines(filename, chunk_size):
+        tasks.append((file_index, filename, start, end))
+
+    # A pool is not worth starting for work that fits in a single chunk
+    if len(tasks) <= 1:
+      return [self.scan_file(filename) for filename in filenames]
+
+    # multiprocessing is only imported once a pool is actually needed, as it
+    # adds noticeably to the startup time of every run
+    import multiprocessing
+    all_results = [self.new_results() for filename in filenames]
+    line_offsets = [0] * len(filenames)
+    pool = multiprocessing.Pool(processes, _init_worker,
+        (self.word_lists, self.instance_mode, self.max_instances))
+    try:
+      # imap() hands back the chunks in order, so each chunk's line numbers
+      # are offset by the number of lines in the chunks before it
+      for file_index, chunk_results, chunk_lines in pool.imap(_scan_chunk, tasks):
+        _merge_results(all_results[file_index], chunk_results, line_offsets[file_index], 
+            self.max_instances)
+        line_offsets[file_index] += chunk_lines
+    finally:
+      pool.terminate()
+      pool.join()
+    return all_results
+
+
+class LiveScanSink(object):
+  """
+  A capture sink (see capture.py) which splits the stream written to it into
+  lines and scans each line as soon as it is complete, so the results are
+  available the moment the command exits. The results are identical to those
+  of WordListMatcher.scan_file() on the captured file, once close() has
+  scanned any final line without a trailing newline. For example:
+
+    scanner = LiveScanSink(matcher)
+    capture.capture_process(process, [stdout_fileobj, scanner], [...])
+    scanner.close()
+    scanner.results["failure"]["count"] -> 2
+
+  With max_line_bytes, only that many bytes of each line are kept while it is
+  incomplete, and only they are scanned; see the module docstring.
+  """
+
+  def __init__(self, matcher, failure_limit=None, max_line_bytes=None):
+    self.matcher = matcher
+    self.failure_limit = failure_limit
+    self.max_line_bytes = max_line_bytes
+    self.results = matcher.new_results()
+    self.line_number = 0
+    self.offset = 0
+    # The pieces of the current line which have no newline yet, their total
+    # length, and the length of the line so far including any bytes beyond
+    # max_line_bytes which were not kept
+    self.pending = []
+    self.pending_bytes = 0
+    self.line_length = 0
+
+
+  def write(self, data):
+    lines = data.split(b"\n")
+    last_piece = lines.pop()
+    if lines:
+      # The first line completes whatever was pending from earlier writes
+      self._add_pending(lines[0] + b"\n")
+      self._scan_pending()
+      for line in lines[1:]:
+        if self.max_line_bytes is not None and len(line) >= self.max_line_bytes:
+          self._add_pending(line + b"\n")
+          self._scan_pending()
+        else:
+          self._scan(line + b"\n", len(line) + 1)
+    if last_piece:
+      self._add_pending(last_piece)
+
+
+  def close(self):
+    if self.pending:
+      self._scan_pending()
+
+
+  def _add_pending(self, piece):
+    self.line_length += len(piece)
+    if self.max_line_bytes is not None:
+      piece = piece[:self.max_line_bytes - self.pending_bytes]
+    if piece:
+      self.pending.append(piece)
+      self.pending_bytes += len(piece)
+
+
+  def _scan_pending(self):
+    line = b"".join(self.pending)
+    length = self.line_length
+    self.pending = []
+    self.pending_bytes = 0
+    self.line_length = 0
+    self._scan(line, length)
+
+
+  def _scan(self, line, length):
+    self.line_number += 1
+    failure_count = self.results["failure"]["count"]
+    self.matcher.scan_line(line, self.line_number, self.results, self.offset,
+        length > len(line) and length or None)
+    self.offset += length
+    if self.failure_limit is not None and self.results["failure"]["count"] > failure_count:
+      self.failure_limit.add(self.results["failure"]["count"] - failure_count)
+
+
+class FailureLimit(object):
+  """
+  Counts the failure hits of one or more LiveScanSinks (e.g. those of stdout
+  and stderr) and triggers the given capture.Abort once 'limit' hits have been
+  seen, terminating the command early.
+  """
+
+  def __init__(self, limit, abort):
+    self.limit = limit
+    self.abort = abort
+    self.count = 0
+    self._lock = threading.Lock()
+
+
+  def add(self, hits):
+    self._lock.acquire()
+    try:
+      # Only the hits which cross the limit trigger the abort
+      reached = self.count < self.limit <= self.count + hits
+      self.count += hits
+    finally:
+      self._lock.release()
+    if reached:
+      self.abort.trigger("failure limit of " + str(self.limit) + " reached")
+
+
+def _split_at_newlines(filename, chunk_size):
+  # Returns a list of (start, end) byte ranges covering the file, where each
+  # range but the last ends just after a newline.
+  size = os.path.getsize(filename)
+  if size == 0:
+    return []
+  fileobj = open(filename, "rb")
+  mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+  try:
+    ranges = []
+    start = 0
+    while start < size:
+      newline = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+      if newline == -1:
+        end = size
+      else:
+        end = newline + 1
+      ranges.append((start, end))
+      start = end
+    return ranges
+  finally:
+    mapped.close()
+    fileobj.close()
+
+
+def _init_worker(word_lists, instance_mode, max_instances=None):
+  # Pool initializer which compiles the matcher once in each worker process.
+  global _worker_matcher
+  _worker_matcher = WordListMatcher(word_lists, instance_mode, max_instances)
+
+
+def _scan_chunk(task):
+  # Scans one chunk of a file in a worker process, numbering lines from 1
+  # within the chunk. Returns the results along with the chunk's line count.
+  file_index, filename, start, end = task
+  fileobj = open(filename, "rb")
+  mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+  try:
+    data = mapped[start:end]
+  finally:
+    mapped.close()
+    fileobj.close()
+
+  results = _worker_matcher.new_results()
+  lines = data.split(b"\n")
+  # Every line but the last had its newline removed by split(); the last piece
+  # is empty unless the file does not end with a newline
+  last_line = lines.pop()
+  line_number = 0
+  offset = start
+  for line in lines:
+    line_number += 1
+    _worker_matcher.scan_line(line + b"\n", line_number, results, offset)
+    offset += len(line) + 1
+  if last_line:
+    line_number += 1
+    _worker_matcher.scan_line(last_line, line_number, results, offset)
+  return file_index, results, line_number
+
+
+def _merge_results(results, chunk_results, line_offset, max_instances=None):
+  # Appends a chunk's results to those of its file, offsetting the chunk's
+  # line numbers. A line dict may be shared by several instances, so each one
+  # is only offset once. With max_instances, the chunk's stored hits beyond 
+  # the file's cap become dropped ones.
+  stored = dict()
+  for category in CATEGORIES:
+    stored[category] = results[category]["count"] - results[category].get("dropped_instances", 0)
+
+  def keep(category):
+    if max_instances is not None and stored[category] >= max_instances:
+      results[category]["dropped_instances"] += 1
+      return False
+    stored[category] += 1
+    return True
+
+  offset_ids = set()
+  for category in CATEGORIES:
+    for instance in chunk_results[category].get("instances", []):
+      if id(instance) not in offset_ids:
+        offset_ids.add(id(instance))
+        instance["line_number"] += line_offset
+      if keep(category):
+        results[category]["instances"].append(instance)
+    results[category]["count"] += chunk_results[category]["count"]
+    if max_instances is not None:
+      results[category]["dropped_instances"] += chunk_results[category]["dropped_instances"]
+
+  # In reference mode each line is recorded once, with its byte offset
+  # already global
+  for reference in chunk_results.get("lines", []):
+    reference["line_number"] += line_offset
+    kept = [(category, token) for category, token in 
+      zip(reference["categories"], reference["tokens"]) if keep(category)]
+    if kept:
+      reference["categories"] = [category for category, token in kept]
+      reference["tokens"] = [token for category, token in kept]
+      results["lines"].append(reference)
+
+
+def read_line(filename, reference):
+  """
+  <Purpose>
+    Rehydrates the text of a line recorded in reference mode by reading it back
+    from the captured file it refers to.
+
+  <Arguments>
+    filename:
+      The path of the captured file (e.g. the "output_path" in the metadata),
+      which may be a compressed blob in an artifact store.
+
+    reference:
+      A dictionary from the "lines" list of reference-mode results.
+
+  <Exceptions>
+    IOError, if the file cannot be read.
+
+  <Return>
+    The text of the line, as full mode would have recorded it.
+  """
+
+  import store
+  fileobj = store.open_blob(filename)
+  try:
+    fileobj.seek(reference["offset"])
+    return _decode_line(fileobj.read(reference["length"]))
+  finally:
+    fileobj.close()
+
+
+def expand_references(results, filename):
+  """
+  <Purpose>
+    Converts reference-mode results into the equivalent full-mode results,
+    reading every referenced line back from the captured file in one pass.
+
+  <Arguments>
+    results:
+      A results dictionary from a matcher in reference mode.
+
+    filename:
+      The path of the captured file the results refer to, which may be a
+      compressed blob in an artifact store.
+
+  <Exceptions>
+    IOError, if the file cannot be read.
+
+  <Return>
+    A results dictionary identical to what a full-mode scan would produce.
+  """
+
+  expanded = dict()
+  for category in CATEGORIES:
+    expanded[category] = dict()
+    expanded[category]["instances"] = list()
+    expanded[category]["count"] = results[category]["count"]
+
+  import store
+  fileobj = store.open_blob(filename)
+  try:
+    for reference in results["lines"]:
+      fileobj.seek(reference["offset"])
+      dict_to_add = dict()
+      dict_to_add["line"] = _decode_line(fileobj.read(reference["length"]))
+      dict_to_add["line_number"] = reference["line_number"]
+      for category in reference["categories"]:
+        expanded[category]["instances"].append(dict_to_add)
+  finally:
+    fileobj.close()
+  return expanded
+
+
+def matched_lines(results, filename=None):
+  """
+  <Purpose>
+    Returns each line recorded in the given results exactly once, in file
+    order, whichever instance mode the results were recorded in.
+
+  <Arguments>
+    results:
+      A results dictionary from a matcher in either instance mode.
+
+    filename:
+      The path of the captured file the results refer to; only needed (and
+      read, in a single pass) for reference-mode results.
+
+  <Exceptions>
+    IOError, if the file cannot be read.
+
+  <Return>
+    A list of (line_number, line) tuples.
+  """
+
+  if "lines" in results:
+    expanded = expand_references(results, filename)
+  else:
+    expanded = results
+
+  # A line with several hits is shared between instances, so it is only
+  # kept once
+  lines = dict()
+  for category in CATEGORIES:
+    for instance in expanded[category]["instances"]:
+      lines[instance["line_number"]] = instance["line"]
+  return sorted(lines.items())
+
+
+def _decode_line(line):
+  # Lines are read as bytes; under Python 3 they are decoded so that they can
+  # be stored in the metadata, while Python 2 keeps the str as read.
+  if not isinstance(line, str):
+    return line.decode("utf-8", "replace")
+  return line